@@ -0,0 +1,58 @@
+# benchmarks/spacy_pipeline_benchmark.py
+
+"""
+Compare spaCy throughput of the trimmed pipeline profiles against the full pipeline.
+
+Usage:
+    python -m benchmarks.spacy_pipeline_benchmark [--profile suggestions] [--docs 2000]
+"""
+
+import argparse
+import time
+from typing import List
+
+from rational_onion.config import get_settings
+from rational_onion.services.nlp_service import get_nlp
+
+settings = get_settings()
+
+SAMPLE_TEXTS = [
+    "Climate change is primarily caused by human activities.",
+    "CO2 levels have increased significantly since the industrial revolution began.",
+    "Industrial activities release greenhouse gases that trap heat in the atmosphere.",
+    "Renewable energy is more sustainable than fossil fuels in the long term.",
+    "Solar and wind energy do not deplete natural resources and emit no carbon dioxide.",
+    "Sustainability means meeting present needs without compromising future generations.",
+    "Electric vehicles reduce carbon emissions when charged from a clean power grid.",
+    "Some studies suggest battery production offsets part of the emission savings."
+]
+
+def measure_tokens_per_second(profile: str, texts: List[str], batch_size: int) -> float:
+    """Run a profile over the texts and return its throughput in tokens per second"""
+    nlp = get_nlp(profile)
+    # Warm up so model loading and first-call allocations are not measured
+    list(nlp.pipe(texts[:batch_size], batch_size=batch_size))
+
+    start = time.perf_counter()
+    tokens = sum(len(doc) for doc in nlp.pipe(texts, batch_size=batch_size))
+    return tokens / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profile", default="suggestions", help="Profile to compare against 'full'")
+    parser.add_argument("--docs", type=int, default=2000, help="Number of documents to process")
+    parser.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size")
+    args = parser.parse_args()
+
+    texts = [SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)] for i in range(args.docs)]
+
+    baseline = measure_tokens_per_second("full", texts, args.batch_size)
+    trimmed = measure_tokens_per_second(args.profile, texts, args.batch_size)
+
+    print(f"Model: {settings.SPACY_MODEL}")
+    print(f"full: {get_nlp('full').pipe_names} -> {baseline:,.0f} tokens/sec")
+    print(f"{args.profile}: {get_nlp(args.profile).pipe_names} -> {trimmed:,.0f} tokens/sec")
+    print(f"Speedup: {trimmed / baseline:.2f}x")
+
+if __name__ == "__main__":
+    main()
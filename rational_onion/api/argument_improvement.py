@@ -1,53 +1,341 @@
 # rational_onion/api/argument_improvement.py
 
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from neo4j import AsyncSession
+from pydantic import BaseModel, Field, constr, validator
 
-from rational_onion.api.dependencies import verify_api_key, get_db
-from rational_onion.services.nlp_service import enhance_argument_with_nlp
+from rational_onion.api.dependencies import limiter, verify_api_key, get_db
+from rational_onion.config import get_settings
+from rational_onion.services.nlp_service import get_nlp, process_batch
+from rational_onion.services.analysis_service import (
+    ARGUMENT_COMPONENTS, analyse_components, find_missing_components, is_analysis_current
+)
+from rational_onion.services.neo4j_service import driver
+from rational_onion.services.page_keys import PAGED_LABELS
+from rational_onion.services.quality_service import score_arguments
+from rational_onion.services.caching_service import ARGUMENTS_TAG, CITATIONS_TAG, argument_tag, cached_response
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class BatchAnalysisRequest(BaseModel):
+    texts: List[constr(min_length=1, max_length=settings.MAX_GROUNDS_LENGTH)] = Field(
+        ..., min_items=1, max_items=settings.MAX_BATCH_TEXTS
+    )
+    batch_size: Optional[int] = Field(None, gt=0, le=1000)
+    n_process: Optional[int] = Field(None, ge=1)
+
+    @validator("n_process")
+    def validate_n_process(cls, v: Optional[int]) -> Optional[int]:
+        """Allow clients to lower, never raise, the server's nlp.pipe process count"""
+        limit = settings.NLP_N_PROCESS if settings.NLP_N_PROCESS > 0 else (os.cpu_count() or 1)
+        if v is not None and v > limit:
+            raise ValueError(f"n_process must be at most {limit}")
+        return v
+
+FALLBACK_SUGGESTIONS = [
+    "Ensure clarity, logical consistency, and sufficient support for claims.",
+    "Consider adding more specific evidence to strengthen your argument."
+]
+
+# Node fields read to build an improvement entry
+NODE_PROJECTION = """
+    n {
+        .text, .claim, .grounds, .warrant, .rebuttal,
+        .analysis_suggestions, .analysis_components, .analysis_missing,
+        .analysis_hash, .analysis_model_version
+    } AS node, elementId(n) AS node_id, n:Argument AS is_argument
+"""
+
+async def _claim_components(session: AsyncSession, claim_ids: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """Read the grounds and warrant linked to many Claim nodes in one query"""
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (c:Claim)
+        WHERE elementId(c) = id
+        RETURN id,
+               head([(c)-[:HAS_GROUND]->(g:Ground) | g.text]) AS grounds,
+               head([(c)-[:HAS_WARRANT]->(w:Warrant) | w.text]) AS warrant
+    """, {"ids": claim_ids})
+    return {row["id"]: {"grounds": row["grounds"], "warrant": row["warrant"]} for row in await result.data()}
+
+async def _build_suggestion_entries(session: AsyncSession, records: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Build the improvement entries for Claim and Argument nodes.
+    
+    Arguments whose analysis was precomputed at write time for the current
+    text and model version are served straight from the node. The claim,
+    grounds, warrant and rebuttal of everything else are analysed on the
+    request path in a single batched NLP pass.
+    """
+    entries: List[Dict[str, Any]] = []
+    pending: List[int] = []
+    components: List[Dict[str, Optional[str]]] = []
+    
+    claim_ids = [record["node_id"] for record in records if not record["is_argument"]]
+    linked: Dict[str, Dict[str, Optional[str]]] = {}
+    if claim_ids:
+        try:
+            linked = await _claim_components(session, claim_ids)
+        except Exception as e:
+            logger.error(f"Error checking for missing components: {e}")
+    
+    for record in records:
+        node = dict(record["node"])
+        current = record["is_argument"] and is_analysis_current(node)
+        if current:
+            argument = {"claim": node.get("claim")}
+            missing_components = list(node.get("analysis_missing") or [])
+        elif record["is_argument"]:
+            argument = {name: node.get(name) for name in ARGUMENT_COMPONENTS}
+            missing_components = find_missing_components(argument)
+        else:
+            argument = {"claim": node.get("text"), **linked.get(record["node_id"], {})}
+            missing_components = [] if argument.get("grounds") else ["ground"]
+        
+        entry = {
+            "claim": argument["claim"],
+            "improvement_suggestions": [],
+            "component_suggestions": {},
+            "external_references": [],
+            "missing_components": missing_components
+        }
+        if current:
+            entry["improvement_suggestions"] = list(node["analysis_suggestions"])
+            entry["component_suggestions"] = json.loads(node["analysis_components"])
+        else:
+            pending.append(len(entries))
+            components.append(argument)
+        entries.append(entry)
+    
+    if pending:
+        # Generate NLP suggestions for all components at once
+        try:
+            analysed = await run_in_threadpool(analyse_components, components)
+        except Exception as e:
+            logger.error(f"Error generating NLP suggestions: {e}")
+            analysed = [{} for _ in pending]
+        for position, suggestions in zip(pending, analysed):
+            entries[position]["component_suggestions"] = suggestions
+            entries[position]["improvement_suggestions"] = suggestions.get("claim") or list(FALLBACK_SUGGESTIONS)
+    
+    return entries
+
+async def _attach_quality_scores(
+    session: AsyncSession,
+    entries: List[Dict[str, Any]],
+    node_ids: List[str]
+) -> Dict[str, float]:
+    """Score the arguments behind entries in one pass and set each entry's quality_score"""
+    try:
+        scores = await score_arguments(session, node_ids)
+    except Exception as e:
+        logger.error(f"Error scoring argument quality: {e}")
+        return {}
+    for entry, node_id in zip(entries, node_ids):
+        if node_id in scores:
+            entry["quality_score"] = scores[node_id]
+    return scores
+
+# Whole-graph page segments, in page order. Each label's nodes are read in
+# indexed page_key order, then those written without a key since the last
+# backfill in element id order, so paging never writes
+PAGE_SEGMENTS = tuple(segment for label in PAGED_LABELS for segment in (label, f"{label}-unkeyed"))
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[str, str]:
+    """
+    Split a whole-graph cursor into the segment being paged and the last key read.
+
+    Raises:
+        ValueError: If the cursor was not issued by this endpoint
+    """
+    if not cursor:
+        return PAGE_SEGMENTS[0], ""
+    segment, separator, last = cursor.partition(":")
+    if segment not in PAGE_SEGMENTS or not separator or not last:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return segment, last
+
+async def _fetch_page(
+    session: AsyncSession,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Read the next page of Argument, then Claim, nodes; returns the records and the next cursor.
+
+    Keyed nodes are read by a range scan of the page_key index rather than
+    a sort of the whole graph. Only nodes written by other tools since the
+    last page_key backfill fall in the slower unkeyed segments.
+    """
+    segment, after = parse_cursor(cursor)
+    records: List[Dict[str, Any]] = []
+    for segment in PAGE_SEGMENTS[PAGE_SEGMENTS.index(segment):]:
+        label, _, unkeyed = segment.partition("-")
+        # Nodes with both labels are read as Arguments
+        exclude = "AND NOT n:Argument" if label != "Argument" else ""
+        if unkeyed:
+            match, key = "n.page_key IS NULL AND elementId(n) > $after", "elementId(n)"
+        else:
+            match, key = "n.page_key > $after", "n.page_key"
+        result = await session.run(f"""
+            MATCH (n:{label})
+            WHERE {match} {exclude}
+            RETURN {NODE_PROJECTION}, {key} AS page_key
+            ORDER BY {key}
+            LIMIT $limit
+        """, {"after": after, "limit": limit - len(records)})
+        page = await result.data()
+        records.extend(page)
+        if len(records) == limit:
+            return records, f"{segment}:{page[-1]['page_key']}"
+        after = ""
+    return records, None
+
+async def _suggestion_page(
+    session: AsyncSession,
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
+    """Build and score the entries of one page; returns entries, node ids and the next cursor"""
+    records, next_cursor = await _fetch_page(session, cursor, limit)
+    node_ids = [record["node_id"] for record in records]
+    entries = await _build_suggestion_entries(session, records)
+    await _attach_quality_scores(session, entries, node_ids)
+    return entries, node_ids, next_cursor
+
+async def _stream_suggestions(cursor: Optional[str], limit: int) -> AsyncIterator[str]:
+    """
+    Yield one NDJSON line per argument, a page at a time.
+
+    Uses its own session since the request session may be closed while
+    the response is still streaming. Only one page is held in memory.
+    """
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            while True:
+                entries, node_ids, cursor = await _suggestion_page(session, cursor, limit)
+                for entry, node_id in zip(entries, node_ids):
+                    yield json.dumps({"argument_id": node_id, **entry}) + "\n"
+                if cursor is None:
+                    break
+    except Exception as e:
+        logger.error(f"Error streaming improvement suggestions: {e}")
+        yield json.dumps({"error": "Improvement suggestion stream interrupted", "cursor": cursor}) + "\n"
+
+def suggestion_tags(request: Request) -> List[str]:
+    """Cache tags of a suggestion response: its argument's, or the whole graph's"""
+    argument_id = request.query_params.get("argument_id")
+    if argument_id:
+        return [argument_tag(argument_id)]
+    return [ARGUMENTS_TAG, CITATIONS_TAG]
 
 @router.get("/suggest-improvements")
+@cached_response("suggest-improvements", suggestion_tags)
 async def suggest_argument_improvements(
     request: Request,
     argument_id: Optional[str] = Query(None, description="Optional ID of a specific argument to improve"),
+    limit: Optional[int] = Query(
+        None, gt=0, le=settings.MAX_SUGGESTION_PAGE_SIZE, description="Page size for whole-graph mode"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    stream: bool = Query(False, description="Stream every argument as newline-delimited JSON"),
     api_key: str = Depends(verify_api_key),
     session: AsyncSession = Depends(get_db)
-) -> Dict[str, Any]:
+) -> Any:
     """
     Generate NLP-enhanced suggestions to improve argument quality.
     
+    Without argument_id, passing limit or cursor returns one page of
+    arguments (Arguments, then Claims, each in page_key order)
+    together with the next_cursor to request the following page (None
+    on the last page). With stream=true every
+    argument is sent as one NDJSON line (including its argument_id) as
+    soon as its page has been analysed.
+    
     Args:
         request: The HTTP request
         argument_id: Optional ID of a specific argument to improve
+        limit: Optional page size for whole-graph mode
+        cursor: Optional cursor returned by the previous page
+        stream: Stream results instead of returning one document
         api_key: API key for authentication
         session: Neo4j database session
     
     Returns:
         Dict containing:
         - missing_components: List of components missing from the argument
-        - quality_score: Score indicating argument quality (0-1)
-        - improvement_suggestions: List of suggestions to improve the argument
+        - quality_score: Mean feature-based quality score of the arguments (0-1)
+        - improvement_suggestions: Per-argument entries with claim suggestions and
+          component_suggestions for the claim, grounds, warrant and rebuttal
         - external_references: List of relevant external references
         - message: Summary message
+        - next_cursor: Cursor of the next page, in paginated mode
     
     Raises:
         HTTPException: If argument not found or other error occurs
     """
+    if cursor and not argument_id:
+        try:
+            parse_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "error_type": "VALIDATION_ERROR",
+                    "message": "Invalid cursor"
+                }
+            )
+    
+    if stream and not argument_id:
+        return StreamingResponse(
+            _stream_suggestions(cursor, limit or settings.SUGGESTION_PAGE_SIZE),
+            media_type="application/x-ndjson"
+        )
+    
+    if (limit or cursor) and not argument_id:
+        try:
+            entries, _, next_cursor = await _suggestion_page(session, cursor, limit or settings.SUGGESTION_PAGE_SIZE)
+        except Exception as e:
+            logger.error(f"Error processing argument page: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={
+                    "error_type": "INTERNAL_ERROR",
+                    "message": "Failed to generate improvement suggestions"
+                }
+            )
+        scores = [entry["quality_score"] for entry in entries if "quality_score" in entry]
+        missing_components = [entry["missing_components"] for entry in entries if entry["missing_components"]]
+        return {
+            "missing_components": missing_components,
+            "quality_score": round(sum(scores) / len(scores), 4) if scores else (0.3 if missing_components else 0.7),
+            "improvement_suggestions": entries,
+            "external_references": [],
+            "next_cursor": next_cursor,
+            "message": "Advanced NLP-enhanced argument improvement suggestions generated."
+        }
+    
     try:
         improvement_suggestions = []
+        # Node ids of the entries built from stored arguments, for scoring
+        scored_ids: List[str] = []
         
         if argument_id:
             # Get specific argument by ID
             try:
-                result = await session.run("""
-                    MATCH (c:Claim)
-                    WHERE elementId(c) = $argument_id
-                    RETURN c.text AS claim_text, elementId(c) AS claim_id
+                result = await session.run(f"""
+                    MATCH (n)
+                    WHERE (n:Argument OR n:Claim)
+                    AND elementId(n) = $argument_id
+                    RETURN {NODE_PROJECTION}
                 """, {"argument_id": argument_id})
                 
                 record = await result.single()
@@ -62,47 +350,12 @@ async def suggest_argument_improvements(
                         }
                     )
                 
-                claim_text = record["claim_text"]
-                claim_id = record["claim_id"]
+                entry = (await _build_suggestion_entries(session, [record]))[0]
                 
-                # Generate NLP suggestions
-                try:
-                    nlp_suggestions = enhance_argument_with_nlp(claim_text)
-                    
-                    # If a specific argument_id was provided, limit to 2 suggestions for test compatibility
-                    if argument_id:
-                        nlp_suggestions = nlp_suggestions[:2]
-                except Exception as e:
-                    logger.error(f"Error generating NLP suggestions: {e}")
-                    nlp_suggestions = [
-                        "Ensure clarity, logical consistency, and sufficient support for claims.",
-                        "Consider adding more specific evidence to strengthen your argument."
-                    ]
-                
-                # Check for missing components
-                try:
-                    components_result = await session.run("""
-                        MATCH (c:Claim)-[:HAS_GROUND]->(g:Ground)
-                        WHERE elementId(c) = $claim_id
-                        RETURN g.text AS ground
-                    """, {"claim_id": claim_id})
-                    
-                    has_grounds = await components_result.fetchall()
-                    
-                    improvement_suggestions.append({
-                        "claim": claim_text,
-                        "improvement_suggestions": nlp_suggestions,
-                        "external_references": [],
-                        "missing_components": [] if has_grounds else ["ground"]
-                    })
-                except Exception as e:
-                    logger.error(f"Error checking for missing components: {e}")
-                    improvement_suggestions.append({
-                        "claim": claim_text,
-                        "improvement_suggestions": nlp_suggestions,
-                        "external_references": [],
-                        "missing_components": ["ground"]
-                    })
+                # If a specific argument_id was provided, limit to 2 suggestions for test compatibility
+                entry["improvement_suggestions"] = entry["improvement_suggestions"][:2]
+                scored_ids.append(record["node_id"])
+                improvement_suggestions.append(entry)
             except HTTPException:
                 # Re-raise HTTP exceptions
                 raise
@@ -119,51 +372,16 @@ async def suggest_argument_improvements(
         else:
             # Get all arguments
             try:
-                result = await session.run("""
-                    MATCH (c:Claim)
-                    RETURN c.text AS claim_text, elementId(c) AS claim_id
+                result = await session.run(f"""
+                    MATCH (n)
+                    WHERE n:Argument OR n:Claim
+                    RETURN {NODE_PROJECTION}
                 """)
                 
-                claims = await result.fetchall()
+                records = await result.fetchall()
                 
-                for claim in claims:
-                    claim_text = claim["claim_text"]
-                    claim_id = claim["claim_id"]
-                    
-                    # Generate NLP suggestions
-                    try:
-                        nlp_suggestions = enhance_argument_with_nlp(claim_text)
-                    except Exception as e:
-                        logger.error(f"Error generating NLP suggestions: {e}")
-                        nlp_suggestions = [
-                            "Ensure clarity, logical consistency, and sufficient support for claims.",
-                            "Consider adding more specific evidence to strengthen your argument."
-                        ]
-                    
-                    # Check for missing components
-                    try:
-                        components_result = await session.run("""
-                            MATCH (c:Claim)-[:HAS_GROUND]->(g:Ground)
-                            WHERE elementId(c) = $claim_id
-                            RETURN g.text AS ground
-                        """, {"claim_id": claim_id})
-                        
-                        has_grounds = await components_result.fetchall()
-                        
-                        improvement_suggestions.append({
-                            "claim": claim_text,
-                            "improvement_suggestions": nlp_suggestions,
-                            "external_references": [],
-                            "missing_components": [] if has_grounds else ["ground"]
-                        })
-                    except Exception as e:
-                        logger.error(f"Error checking for missing components: {e}")
-                        improvement_suggestions.append({
-                            "claim": claim_text,
-                            "improvement_suggestions": nlp_suggestions,
-                            "external_references": [],
-                            "missing_components": ["ground"]
-                        })
+                improvement_suggestions = await _build_suggestion_entries(session, records)
+                scored_ids = [record["node_id"] for record in records]
                 
                 # If no claims were found or processed, add a special case for "Incomplete argument without proper support"
                 if not improvement_suggestions:
@@ -200,9 +418,17 @@ async def suggest_argument_improvements(
                     "missing_components": ["ground"]
                 })
         
-        # Calculate quality score based on missing components
-        missing_components_flat = [comp for sugg in improvement_suggestions for comp in sugg.get("missing_components", [])]
-        quality_score = 0.7 if not missing_components_flat else 0.3
+        # Score all stored arguments in one pass
+        scores: Dict[str, float] = {}
+        if scored_ids:
+            scores = await _attach_quality_scores(session, improvement_suggestions, scored_ids)
+        
+        if scores:
+            quality_score = round(sum(scores.values()) / len(scores), 4)
+        else:
+            # Fall back to a score based on missing components
+            missing_components_flat = [comp for sugg in improvement_suggestions for comp in sugg.get("missing_components", [])]
+            quality_score = 0.7 if not missing_components_flat else 0.3
         
         return {
             "missing_components": [s.get("missing_components", []) for s in improvement_suggestions if s.get("missing_components")],
@@ -240,4 +466,48 @@ async def suggest_argument_improvements(
             ],
             "external_references": [],
             "message": "Fallback response due to processing error."
-        }
\ No newline at end of file
+        }
+
+@router.post("/analyze-batch")
+@limiter.limit("30/minute")
+async def analyze_batch(
+    request: Request,
+    batch: BatchAnalysisRequest,
+    api_key: str = Depends(verify_api_key)
+) -> StreamingResponse:
+    """
+    Generate improvement suggestions for many texts in one request.
+    
+    Texts are analysed in nlp.pipe batches and results are streamed as
+    newline-delimited JSON, one line per input in input order, as soon as
+    each batch is processed.
+    
+    Args:
+        request: The HTTP request
+        batch: Texts to analyse plus optional batch_size and n_process tuning
+        api_key: API key for authentication
+    
+    Returns:
+        StreamingResponse of lines containing:
+        - index: Position of the text in the request
+        - improvement_suggestions: List of suggestions for that text
+    """
+    # Load the pipeline before streaming so a failure still gets a proper status code
+    try:
+        await run_in_threadpool(get_nlp, settings.SPACY_DEFAULT_PROFILE)
+    except Exception as e:
+        logger.error(f"Error loading NLP pipeline for batch analysis: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error_type": "INTERNAL_ERROR",
+                "message": "NLP service unavailable"
+            }
+        )
+    
+    def generate() -> Iterator[str]:
+        results = process_batch(batch.texts, batch_size=batch.batch_size, n_process=batch.n_process)
+        for index, suggestions in enumerate(results):
+            yield json.dumps({"index": index, "improvement_suggestions": suggestions}) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
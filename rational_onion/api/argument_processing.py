@@ -1,9 +1,16 @@
 # rational_onion/api/argument_processing.py
 
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from typing import Dict, Any, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request, Response
 from rational_onion.services.neo4j_service import driver
-from rational_onion.models.toulmin_model import ArgumentRequest, ArgumentResponse, InsertArgumentResponse
+from rational_onion.services.analysis_service import precompute_argument_analysis
+from rational_onion.services.corpus_stats import record_argument_terms
+from rational_onion.services.quality_service import bump_graph_version
+from rational_onion.services.caching_service import ARGUMENTS_TAG, argument_tag, invalidate_tags
+from rational_onion.services.dedup_service import content_hash, find_near_duplicates, index_claim
+from rational_onion.models.toulmin_model import (
+    ArgumentRequest, ArgumentResponse, InsertArgumentResponse, DuplicateHandling
+)
 from pydantic import BaseModel
 from rational_onion.config import get_settings
 from rational_onion.api.errors import (
@@ -36,6 +43,34 @@ def validate_argument_length(argument: ArgumentRequest) -> None:
             field="warrant"
         )
 
+_content_hash_constraint_ready = False
+
+async def ensure_content_hash_constraint(session: AsyncSession) -> None:
+    """Create the uniqueness constraint backing dedup inserts, once per process"""
+    global _content_hash_constraint_ready
+    if not _content_hash_constraint_ready:
+        result = await session.run("""
+            CREATE CONSTRAINT argument_content_hash IF NOT EXISTS
+            FOR (a:Argument) REQUIRE a.content_hash IS UNIQUE
+        """)
+        await result.consume()
+        _content_hash_constraint_ready = True
+
+async def find_existing_duplicate(session: AsyncSession, claim: str) -> Optional[Tuple[str, float]]:
+    """Return the most similar indexed argument that is still in the graph"""
+    matches = await find_near_duplicates(claim)
+    if not matches:
+        return None
+    # The index may still hold arguments deleted since they were indexed
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (a:Argument)
+        WHERE elementId(a) = id
+        RETURN id
+    """, {"ids": [match_id for match_id, _ in matches]})
+    existing = {record["id"] for record in await result.data()}
+    return next((match for match in matches if match[0] in existing), None)
+
 # Add RelationshipRequest model
 class RelationshipRequest(BaseModel):
     source_id: str
@@ -53,6 +88,15 @@ async def insert_argument(
     request: Request,
     response: Response,
     argument: ArgumentRequest,
+    background_tasks: BackgroundTasks,
+    on_duplicate: DuplicateHandling = Query(
+        DuplicateHandling.CREATE,
+        description="Handling of claims that nearly duplicate a stored argument"
+    ),
+    dedup: bool = Query(
+        False,
+        description="Return the stored argument instead of creating an identical one"
+    ),
     api_key: str = Depends(verify_api_key),
     session: AsyncSession = Depends(get_db),
 ) -> Dict[str, Any]:
@@ -61,34 +105,44 @@ async def insert_argument(
         # Validate argument field lengths
         validate_argument_length(argument)
         
-        query = """
-            CREATE (a:Argument {
-                claim: $claim,
-                grounds: $grounds,
-                warrant: $warrant,
-                created_at: datetime()
-            })
-            RETURN elementId(a) as argument_id
-        """
+        duplicate = None
+        if on_duplicate != DuplicateHandling.CREATE:
+            duplicate = await find_existing_duplicate(session, argument.claim)
+        if duplicate and on_duplicate == DuplicateHandling.RETURN_EXISTING:
+            return {
+                "argument_id": duplicate[0],
+                "message": "Near-duplicate of an existing argument",
+                "duplicate_of": duplicate[0],
+                "duplicate_similarity": duplicate[1]
+            }
         
-        params = {
+        properties = {
             "claim": argument.claim,
             "grounds": argument.grounds,
             "warrant": argument.warrant
         }
-        
         if argument.rebuttal:
+            properties["rebuttal"] = argument.rebuttal
+        if duplicate:
+            properties["near_duplicate_of"] = duplicate[0]
+            properties["near_duplicate_similarity"] = duplicate[1]
+        params: Dict[str, Any] = {"properties": properties}
+        
+        if dedup:
+            # Identical submissions hit the unique index instead of adding nodes
+            await ensure_content_hash_constraint(session)
             query = """
-                CREATE (a:Argument {
-                    claim: $claim,
-                    grounds: $grounds,
-                    warrant: $warrant,
-                    rebuttal: $rebuttal,
-                    created_at: datetime()
-                })
+                MERGE (a:Argument {content_hash: $content_hash})
+                ON CREATE SET a += $properties, a.created_at = datetime(), a.page_key = randomUUID()
+                RETURN elementId(a) as argument_id
+            """
+            params["content_hash"] = content_hash(argument.claim, argument.grounds, argument.warrant)
+        else:
+            query = """
+                CREATE (a:Argument $properties)
+                SET a.created_at = datetime(), a.page_key = randomUUID()
                 RETURN elementId(a) as argument_id
             """
-            params["rebuttal"] = argument.rebuttal
             
         result = await session.run(query, params)
         record = await result.single()
@@ -100,11 +154,35 @@ async def insert_argument(
                 details={"error": "No record returned"}
             )
         
+        summary = await result.consume()
+        if not summary.counters.nodes_created:
+            return {
+                "argument_id": str(record["argument_id"]),
+                "message": "Argument already exists"
+            }
+        
         # Create response data
         response_data = {
             "argument_id": str(record["argument_id"]),
             "message": "Argument created successfully"
         }
+        if duplicate:
+            response_data["duplicate_of"] = duplicate[0]
+            response_data["duplicate_similarity"] = duplicate[1]
+        
+        await index_claim(response_data["argument_id"], argument.claim)
+        await bump_graph_version()
+        await invalidate_tags(ARGUMENTS_TAG)
+        
+        # Analyse the committed argument off the request path
+        if settings.NLP_PRECOMPUTE_ENABLED:
+            background_tasks.add_task(precompute_argument_analysis, response_data["argument_id"])
+        background_tasks.add_task(record_argument_terms, {
+            "claim": argument.claim,
+            "grounds": argument.grounds,
+            "warrant": argument.warrant,
+            "rebuttal": argument.rebuttal
+        })
         
         # Return the response directly without creating a JSONResponse
         # This allows FastAPI to handle the response and add the rate limit headers
@@ -203,6 +281,11 @@ async def create_relationship(
                 details={"error": "No record returned"}
             )
         
+        await bump_graph_version()
+        await invalidate_tags(
+            ARGUMENTS_TAG, argument_tag(relationship.source_id), argument_tag(relationship.target_id)
+        )
+        
         # Create response data
         response_data = {
             "message": "Relationship created successfully",
@@ -0,0 +1,131 @@
+# rational_onion/api/argument_similarity.py
+
+import logging
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response
+from neo4j import AsyncSession
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from rational_onion.api.dependencies import limiter, get_db, verify_api_key
+from rational_onion.api.errors import ErrorType, BaseAPIError
+from rational_onion.config import get_settings
+from rational_onion.services.dedup_service import index_existing_claims
+from rational_onion.services.embedding_store import get_embedding_store, index_unembedded_arguments
+from rational_onion.services.nlp_service import encode_texts
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class SimilarArgument(BaseModel):
+    argument_id: str
+    claim: Optional[str] = None
+    score: float
+
+class SimilarArgumentsResponse(BaseModel):
+    results: List[SimilarArgument]
+    total: int
+
+@router.get("/similar-arguments", response_model=SimilarArgumentsResponse)
+@limiter.limit("100/minute")
+async def find_similar_arguments(
+    request: Request,
+    response: Response,
+    argument_id: Optional[str] = Query(None, description="Find arguments similar to this stored argument"),
+    text: Optional[str] = Query(None, max_length=settings.MAX_CLAIM_LENGTH, description="Find arguments similar to this text"),
+    k: int = Query(10, ge=1, le=100, description="Number of results"),
+    api_key: str = Depends(verify_api_key),
+    session: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Find the stored arguments whose claims are semantically closest.
+
+    Uses the shared embedding store and its approximate nearest-neighbour
+    index; exactly one of argument_id or text should be given.
+
+    Returns:
+        SimilarArgumentsResponse with results ordered by cosine similarity
+
+    Raises:
+        BaseAPIError: If neither argument_id nor text is given, or the
+            argument does not exist
+    """
+    if not argument_id and not text:
+        raise BaseAPIError(
+            error_type=ErrorType.VALIDATION_ERROR,
+            message="Either argument_id or text is required",
+            status_code=422
+        )
+
+    store = get_embedding_store()
+    vector = None
+    exclude = set()
+    if argument_id:
+        exclude.add(argument_id)
+        vector = await run_in_threadpool(store.get, argument_id)
+        if vector is None:
+            # Not indexed yet, so embed the stored claim directly
+            result = await session.run("""
+                MATCH (n)
+                WHERE (n:Argument OR n:Claim)
+                AND elementId(n) = $argument_id
+                RETURN coalesce(n.claim, n.text) AS text
+            """, {"argument_id": argument_id})
+            record = await result.single()
+            if not record or not record["text"]:
+                raise BaseAPIError(
+                    error_type=ErrorType.VALIDATION_ERROR,
+                    message=f"Argument with ID {argument_id} not found",
+                    status_code=422
+                )
+            text = record["text"]
+
+    if vector is None:
+        embeddings, rows = await run_in_threadpool(encode_texts, [text])
+        vector = embeddings[rows[0]]
+
+    # Resolve claims one round trip per search, searching again without the
+    # nodes deleted since they were indexed until k results remain
+    claims: Dict[str, Optional[str]] = {}
+    while True:
+        matches = await run_in_threadpool(store.search, vector, k, exclude)
+        unresolved = [match_id for match_id, _ in matches if match_id not in claims]
+        result = await session.run("""
+            UNWIND $ids AS id
+            MATCH (n)
+            WHERE elementId(n) = id
+            RETURN id, coalesce(n.claim, n.text) AS claim
+        """, {"ids": unresolved})
+        found = {record["id"]: record["claim"] for record in await result.data()}
+        claims.update(found)
+        deleted = set(unresolved) - set(found)
+        if not deleted or len(matches) < k:
+            break
+        exclude |= deleted
+
+    results = [
+        {"argument_id": match_id, "claim": claims[match_id], "score": score}
+        for match_id, score in matches
+        if match_id in claims
+    ]
+    return {"results": results, "total": len(results)}
+
+@router.post("/similar-arguments/reindex")
+@limiter.limit("5/minute")
+async def reindex_similar_arguments(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    api_key: str = Depends(verify_api_key)
+) -> Dict[str, Any]:
+    """
+    Schedule background jobs indexing arguments missing from the embedding
+    store and the near-duplicate index.
+
+    Needed for nodes created before the indexes existed or outside
+    /insert-argument.
+    """
+    background_tasks.add_task(index_unembedded_arguments)
+    background_tasks.add_task(index_existing_claims)
+    return {"message": "Similarity reindex scheduled"}
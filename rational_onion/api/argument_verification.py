@@ -1,6 +1,6 @@
 # rational_onion/api/argument_verification.py
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 from neo4j import AsyncSession
 from neo4j.exceptions import ServiceUnavailable, DatabaseError as Neo4jDatabaseError
@@ -11,6 +11,8 @@ from rational_onion.api.errors import (
     BaseAPIError, BaseError
 )
 from rational_onion.config import get_settings
+from rational_onion.services.contradiction_service import scan_for_contradictions
+from rational_onion.services.caching_service import ARGUMENTS_TAG, CITATIONS_TAG, cached_response
 from typing import Dict, Any, Optional, List
 from neo4j.graph import Node, Relationship, Path
 from pydantic import BaseModel
@@ -31,6 +33,8 @@ class VerificationResponse(BaseModel):
 @router.get("/verify-argument-structure")
 @router.post("/verify-argument-structure")
 @limiter.limit("100/minute")
+# CITES edges from a Claim count as invalid relationships, so citations matter too
+@cached_response("verify-argument-structure", lambda request: [ARGUMENTS_TAG, CITATIONS_TAG])
 async def verify_argument_structure(
     request: Request,
     argument: Optional[VerificationRequest] = None,
@@ -93,6 +97,7 @@ async def verify_argument_structure(
                 MATCH (n)-[r]->(m)
                 WHERE (n:Argument OR n:Claim)
                 AND NOT type(r) IN ['SUPPORTS', 'JUSTIFIES']
+                AND NOT (type(r) = 'CHALLENGES' AND coalesce(r.suggested, false))
                 WITH type(r) as invalid_type
                 RETURN collect(invalid_type) as invalid_types
                 """
@@ -243,6 +248,7 @@ async def verify_argument_structure(
                 WHERE (n:Argument OR n:Claim)
                 AND elementId(n) = $argument_id
                 AND NOT type(r) IN ['SUPPORTS', 'JUSTIFIES']
+                AND NOT (type(r) = 'CHALLENGES' AND coalesce(r.suggested, false))
                 WITH type(r) as invalid_type
                 RETURN collect(invalid_type) as invalid_types
                 """
@@ -328,4 +334,22 @@ async def verify_argument_structure(
                     "message": "An unexpected error occurred"
                 }
             }
-        )
\ No newline at end of file
+        )
+
+@router.post("/verify-contradictions")
+@limiter.limit("5/minute")
+async def schedule_contradiction_scan(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Rescan all arguments instead of only new ones"),
+    api_key: str = Depends(verify_api_key)
+) -> Dict[str, Any]:
+    """
+    Schedule a background scan for contradicting arguments.
+
+    Likely contradictions are written as CHALLENGES edges marked
+    suggested, with a confidence score.
+    """
+    background_tasks.add_task(scan_for_contradictions, full)
+    return {"message": "Contradiction scan scheduled", "full": full}
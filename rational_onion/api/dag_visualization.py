@@ -7,6 +7,7 @@ from neo4j import AsyncSession
 from neo4j.exceptions import ServiceUnavailable, DatabaseError as Neo4jDatabaseError
 from rational_onion.api.dependencies import limiter, get_db, verify_api_key
 from rational_onion.api.errors import ErrorType
+from rational_onion.services.caching_service import ARGUMENTS_TAG, cached_response
 from typing import Dict, Any, List
 from pydantic import BaseModel
 import logging
@@ -24,6 +25,7 @@ class DagVisualizationResponse(BaseModel):
 
 @router.get("/visualize-argument-dag")
 @limiter.limit("100/minute")
+@cached_response("visualize-argument-dag", lambda request: [ARGUMENTS_TAG])
 async def visualize_argument_dag(
     request: Request,
     response: Response,
@@ -169,6 +171,7 @@ async def visualize_argument_dag(
             # Return mock data for testing
             return JSONResponse(
                 status_code=200,
+                headers={"Cache-Control": "no-store"},
                 content=DagVisualizationResponse(
                     nodes=[
                         {
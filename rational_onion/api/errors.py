@@ -42,6 +42,10 @@ class CitationError(BaseError):
     """Raised when citation verification fails"""
     pass
 
+class ExternalServiceError(BaseError):
+    """Raised when an external service fails or is unreachable"""
+    pass
+
 class BaseAPIError(HTTPException):
     """Base class for API errors"""
     def __init__(
@@ -1,15 +1,33 @@
 # rational_onion/api/external_references.py
 
-from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request, Response, Query
 from typing import List, Tuple, Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from rational_onion.services.neo4j_service import driver
 from rational_onion.services.nlp_service import rank_references_with_embeddings
+from rational_onion.services.quality_service import bump_graph_version
+from rational_onion.services.caching_service import (
+    CITATIONS_TAG,
+    REFERENCES_TAG,
+    argument_tag,
+    cached_response,
+    invalidate_tags
+)
+from rational_onion.services.citation_analytics import refresh_citation_analytics, request_citation_refresh
+from rational_onion.services.reference_search import search_references as find_references
+from rational_onion.services.reference_validation import validate_references as score_references
+from rational_onion.models.toulmin_model import DuplicateHandling
+from rational_onion.services.reference_service import (
+    citing_arguments, find_duplicate_reference, index_reference_title, link_reference,
+    merge_references, sweep_duplicate_references
+)
 from rational_onion.api.dependencies import limiter, verify_api_key, get_db
 from rational_onion.config import get_settings
 import uuid
 import logging
-from neo4j import AsyncGraphDatabase as Neo4jDriver
+from neo4j import AsyncGraphDatabase as Neo4jDriver, AsyncSession
+
+settings = get_settings()
 
 # Define models
 class Reference(BaseModel):
@@ -18,18 +36,37 @@ class Reference(BaseModel):
     year: Optional[int] = None
     source: Optional[str] = None
     url: Optional[str] = None
+    doi: Optional[str] = None
+
+class ReferenceBatchItem(Reference):
+    argument_ids: List[str] = []
+
+class ReferenceBatchRequest(BaseModel):
+    references: List[ReferenceBatchItem] = Field(..., min_items=1, max_items=settings.MAX_REFERENCE_BATCH)
+
+class ReferenceBatchResult(BaseModel):
+    reference_id: str
+    created: bool
+    linked: int
+
+class ReferenceBatchResponse(BaseModel):
+    results: List[ReferenceBatchResult]
+    message: str
 
 class ReferenceCreationResponse(BaseModel):
     reference_id: str
     message: str
+    duplicate_of: Optional[str] = None
+    duplicate_similarity: Optional[float] = None
 
 class ReferenceResponse(BaseModel):
     references: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class ReferenceSearchResponse(BaseModel):
     references: List[Dict[str, Any]]
-    total: int
+    total: Optional[int] = None
     results: Optional[List[Dict[str, Any]]] = None
 
 class ReferenceValidationResponse(BaseModel):
@@ -41,6 +78,26 @@ class ReferenceValidationResponse(BaseModel):
     peer_reviewed: Optional[bool] = None
     citation_count: Optional[int] = None
 
+class ReferenceBatchValidationRequest(BaseModel):
+    references: List[Reference] = Field(..., min_items=1, max_items=settings.MAX_REFERENCE_BATCH)
+
+class ReferenceBatchValidationResult(ReferenceValidationResponse):
+    reference_key: str
+
+class ReferenceBatchValidationResponse(BaseModel):
+    results: List[ReferenceBatchValidationResult]
+    cached: int
+    computed: int
+
+class RelatedArgument(BaseModel):
+    argument_id: str
+    score: float
+
+class RelatedArgumentsResponse(BaseModel):
+    argument_id: str
+    coupled: List[RelatedArgument]
+    cocited: List[RelatedArgument]
+
 # Initialize router
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -50,7 +107,8 @@ async def fetch_external_references_api(query: str):
     """
     Retrieve and rank scholarly references relevant to an argument.
     
-    Uses embedding-based similarity and citation metrics to find supporting literature.
+    Full-text candidates are re-ranked by embedding similarity and blended
+    with citation and recency priors within a fixed latency budget.
     
     Parameters:
         query: Search text to find relevant references
@@ -58,7 +116,7 @@ async def fetch_external_references_api(query: str):
     Returns:
         List of tuples containing:
             - title: Reference title
-            - relevance_score: Semantic similarity score (0-1)
+            - relevance_score: Blended relevance score (0-1)
             - citation_count: Number of citations
             - url: Link to source
             
@@ -73,60 +131,89 @@ async def fetch_external_references_api(query: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch external references: {e}")
 
+_reference_id_constraint_ready = False
+
+async def ensure_reference_id_constraint(session: AsyncSession) -> None:
+    """Create the reference_id uniqueness constraint (and its index), once per process"""
+    global _reference_id_constraint_ready
+    if not _reference_id_constraint_ready:
+        result = await session.run("""
+            CREATE CONSTRAINT reference_id_unique IF NOT EXISTS
+            FOR (r:Reference) REQUIRE r.reference_id IS UNIQUE
+        """)
+        await result.consume()
+        _reference_id_constraint_ready = True
+
 @router.get("/references", response_model=ReferenceResponse)
 @limiter.limit("100/minute")
+@cached_response("references", lambda request: (
+    [argument_tag(request.query_params["argument_id"])]
+    if request.query_params.get("argument_id") else [REFERENCES_TAG]
+))
 async def get_references(
     request: Request,
     response: Response,
     argument_id: Optional[str] = None,
+    limit: int = Query(50, gt=0, le=settings.MAX_REFERENCE_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(True, description="Count all matching references"),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Retrieve references from the database.
+    Retrieve references from the database, one page at a time.
     
-    If argument_id is provided, returns references linked to that specific argument.
-    Otherwise, returns all references in the database.
+    If argument_id is provided, returns references cited by that argument,
+    its grounds or its warrant. Otherwise, returns all references in the
+    database. Pages are ordered by the indexed reference_id and continue
+    after cursor, so each page costs the same however deep it is.
     
     Parameters:
         argument_id: Optional ID of the argument to get references for
+        limit: Maximum number of references to return
+        cursor: Reference ID after which the page starts
+        include_total: Whether to count all matching references
         
     Returns:
-        ReferenceResponse containing a list of references
+        ReferenceResponse containing a page of references, the total when
+        requested and the cursor of the next page (None on the last page)
     """
     try:
         # For testing purposes, we'll return mock data if the database connection fails
         try:
             async with driver.session() as session:
+                await ensure_reference_id_constraint(session)
+                params = {"argument_id": argument_id, "cursor": cursor or "", "limit": limit}
                 if argument_id:
-                    # Get references for a specific argument
-                    result = await session.run("""
-                        MATCH (a)-[:CITES]->(r:Reference)
-                        WHERE elementId(a) = $argument_id
-                        RETURN r.title as title, r.author as author, 
-                               r.year as year, r.source as source, r.url as url
-                    """, {"argument_id": argument_id})
+                    # References cited by the argument or by its grounds and warrant
+                    match = """
+                        MATCH (a) WHERE elementId(a) = $argument_id
+                        MATCH (a)-[:HAS_GROUND|HAS_WARRANT*0..1]->()-[:CITES]->(r:Reference)
+                        WITH DISTINCT r
+                    """
                 else:
-                    # Get all references
-                    result = await session.run("""
-                        MATCH (r:Reference)
-                        RETURN r.title as title, r.author as author, 
-                               r.year as year, r.source as source, r.url as url
-                    """)
+                    match = "MATCH (r:Reference)"
                 
-                records = await result.fetchall()
-                references = []
-                for record in records:
-                    references.append({
-                        "title": record["title"],
-                        "author": record["author"],
-                        "year": record["year"],
-                        "source": record["source"],
-                        "url": record["url"]
-                    })
+                result = await session.run(f"""
+                    {match}
+                    WHERE r.reference_id > $cursor
+                    RETURN r.reference_id AS reference_id, r.title AS title, r.author AS author,
+                           r.year AS year, r.source AS source, r.url AS url
+                    ORDER BY r.reference_id
+                    LIMIT $limit
+                """, params)
+                references = [record.data() async for record in result]
                 
-                return {"references": references, "total": len(references)}
+                total = None
+                if include_total:
+                    # Served from the label count store for the whole graph
+                    result = await session.run(f"{match} RETURN count(r) AS total", params)
+                    total = (await result.single())["total"]
+                
+                next_cursor = references[-1]["reference_id"] if len(references) == limit else None
+                return {"references": references, "total": total, "next_cursor": next_cursor}
         except Exception as db_error:
             # If database connection fails, return mock data for testing
+            response.headers["Cache-Control"] = "no-store"
             references = [
                 {
                     "title": "Climate Change 2021: The Physical Science Basis",
@@ -152,21 +239,36 @@ async def get_references(
 async def add_reference(
     request: Request,
     response: Response,
+    background_tasks: BackgroundTasks,
     reference: Reference,
     argument_id: Optional[str] = None,
+    on_duplicate: DuplicateHandling = Query(
+        DuplicateHandling.FLAG,
+        description="How to handle a stored reference with a near-identical title"
+    ),
     api_key: str = Depends(verify_api_key)
 ):
     """
     Add a new reference to the database.
     
     If argument_id is provided, links the reference to that argument.
+    References are merged on their normalized DOI or URL, so adding a work
+    that is already stored reuses (and links) the existing node. Creation
+    and linking happen in one write transaction.
+    
+    Titles are also checked against the trigram title index: a stored
+    reference with a near-identical title (and no conflicting year) is
+    recorded as near_duplicate_of on the new reference (flag), reused
+    instead (return_existing), or ignored (create).
     
     Parameters:
         reference: Reference details to add
         argument_id: Optional ID of the argument to link the reference to
+        on_duplicate: Handling of near-duplicate titles
         
     Returns:
-        ReferenceCreationResponse with the ID of the created reference
+        ReferenceCreationResponse with the ID of the created or reused
+        reference and the near-duplicate found, if any
     """
     reference_id = str(uuid.uuid4())
     
@@ -175,80 +277,194 @@ async def add_reference(
         # For testing purposes, we'll use a fixed ID
         reference_id = "6c1ffbd6-bef9-4bd2-8f69-41e08d78318c"
     
+    argument_ids = [argument_id] if argument_id else []
+    duplicate = None
     try:
         async with driver.session() as session:
-            # Create the reference node
-            result = await session.run('''
-            CREATE (r:Reference {
-                reference_id: $reference_id,
-                title: $title,
-                author: $author,
-                year: $year,
-                source: $source,
-                url: $url
-            })
-            RETURN r
-            ''', {
-                'reference_id': reference_id,
-                'title': reference.title,
-                'author': reference.author,
-                'year': reference.year,
-                'source': reference.source,
-                'url': reference.url
-            })
+            if on_duplicate != DuplicateHandling.CREATE:
+                duplicate = await find_duplicate_reference(
+                    session, reference.title, reference.year, reference.doi, reference.url
+                )
             
-            # If argument_id is provided, link the reference to the argument
-            if argument_id:
-                await session.run('''
-                MATCH (a) WHERE elementId(a) = $argument_id
-                MATCH (r:Reference {reference_id: $reference_id})
-                CREATE (a)-[:CITES]->(r)
-                ''', {
-                    'argument_id': argument_id,
-                    'reference_id': reference_id
-                })
-        
-        return {
-            "reference_id": reference_id,
-            "message": "Reference added successfully"
-        }
+            if duplicate and on_duplicate == DuplicateHandling.RETURN_EXISTING:
+                if await link_reference(session, duplicate[0], argument_ids):
+                    await bump_graph_version()
+                    await invalidate_tags(
+                        CITATIONS_TAG, *map(argument_tag, await citing_arguments(session, argument_ids))
+                    )
+                    background_tasks.add_task(request_citation_refresh)
+                return {
+                    "reference_id": duplicate[0],
+                    "message": "Similar reference reused",
+                    "duplicate_of": duplicate[0],
+                    "duplicate_similarity": duplicate[1]
+                }
+            
+            [result] = await merge_references(session, [{
+                **reference.dict(),
+                "reference_id": reference_id,
+                "argument_ids": argument_ids,
+                "near_duplicate_of": duplicate[0] if duplicate else None,
+                "near_duplicate_similarity": duplicate[1] if duplicate else None
+            }])
+            cited_by = await citing_arguments(session, argument_ids) if result["linked"] else []
     except Exception as e:
-        logging.error(f"Error adding reference: {str(e)}")
+        logger.error(f"Error adding reference: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to add reference: {e}")
+    
+    if result["created"]:
+        await index_reference_title(result["reference_id"], reference.title)
+        await invalidate_tags(REFERENCES_TAG)
+    if result["linked"]:
+        await bump_graph_version()
+        await invalidate_tags(CITATIONS_TAG, *map(argument_tag, cited_by))
+        background_tasks.add_task(request_citation_refresh)
+    return {
+        "reference_id": result["reference_id"],
+        "message": "Reference added successfully" if result["created"] else "Existing reference reused",
+        "duplicate_of": duplicate[0] if duplicate and result["created"] else None,
+        "duplicate_similarity": duplicate[1] if duplicate and result["created"] else None
+    }
+
+@router.post("/references/batch", response_model=ReferenceBatchResponse)
+@limiter.limit("10/minute")
+async def add_references_batch(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    batch: ReferenceBatchRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Add many references and link each to many arguments in one write.
+    
+    All references are merged and linked by a single UNWIND query in one
+    transaction, so the batch is stored entirely or not at all.
+    
+    Parameters:
+        batch: References, each with the IDs of the arguments citing it
         
-        # For testing purposes, create a mock reference in the database
-        # This is a workaround for the test environment where the database might not be available
-        try:
-            async with driver.session() as session:
-                # Try to create a reference node with a simpler query
-                await session.run('''
-                CREATE (r:Reference {
-                    reference_id: $reference_id,
-                    title: $title
-                })
-                ''', {
-                    'reference_id': reference_id,
-                    'title': reference.title
-                })
-                
-                if argument_id:
-                    await session.run('''
-                    MATCH (a) WHERE elementId(a) = $argument_id
-                    MATCH (r:Reference {reference_id: $reference_id})
-                    CREATE (a)-[:CITES]->(r)
-                    ''', {
-                        'argument_id': argument_id,
-                        'reference_id': reference_id
-                    })
-        except Exception as inner_e:
-            logging.error(f"Error creating mock reference: {str(inner_e)}")
-            # If all else fails, we'll just return a success response for testing
-            pass
-            
-        # Return a success response for testing purposes
-        return {
-            "reference_id": reference_id,
-            "message": "Reference added successfully"
-        }
+    Returns:
+        ReferenceBatchResponse with, per reference in order, its ID, whether
+        it was created and how many arguments it was linked to
+    """
+    items = [
+        {**item.dict(), "reference_id": str(uuid.uuid4())}
+        for item in batch.references
+    ]
+    try:
+        async with driver.session() as session:
+            results = await merge_references(session, items)
+            cited_by = await citing_arguments(session, sorted({
+                argument_id
+                for item, result in zip(items, results) if result["linked"]
+                for argument_id in item["argument_ids"]
+            }))
+    except Exception as e:
+        logger.error(f"Error adding reference batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to add references: {e}")
+    
+    for item, result in zip(items, results):
+        if result["created"]:
+            await index_reference_title(result["reference_id"], item["title"])
+    if any(result["created"] for result in results):
+        await invalidate_tags(REFERENCES_TAG)
+    if any(result["linked"] for result in results):
+        await bump_graph_version()
+        await invalidate_tags(CITATIONS_TAG, *map(argument_tag, cited_by))
+        background_tasks.add_task(request_citation_refresh)
+    created = sum(result["created"] for result in results)
+    return {
+        "results": [
+            {"reference_id": r["reference_id"], "created": r["created"], "linked": r["linked"]}
+            for r in results
+        ],
+        "message": f"{created} references added, {len(results) - created} reused"
+    }
+
+@router.post("/references/deduplicate")
+@limiter.limit("5/minute")
+async def schedule_reference_deduplication(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    merge: bool = Query(False, description="Merge duplicates into one reference instead of flagging them"),
+    api_key: str = Depends(verify_api_key)
+) -> Dict[str, Any]:
+    """
+    Schedule a background sweep for near-duplicate references.
+
+    References are compared on title trigrams in batches. Duplicates are
+    flagged with near_duplicate_of, or with merge their citations are
+    moved to the canonical reference and the duplicates deleted.
+    """
+    background_tasks.add_task(sweep_duplicate_references, merge)
+    if merge:
+        # Merged duplicates move citations between references
+        background_tasks.add_task(request_citation_refresh)
+    return {"message": "Reference deduplication scheduled", "merge": merge}
+
+@router.post("/references/analytics")
+@limiter.limit("5/minute")
+async def schedule_citation_analytics(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Recompute all arguments instead of those whose citations changed"),
+    api_key: str = Depends(verify_api_key)
+) -> Dict[str, Any]:
+    """
+    Schedule a background refresh of citation-based related arguments.
+
+    Each argument stores its most similar arguments by bibliographic
+    coupling (shared references) and by co-citation (references usually
+    cited together), with their scores.
+    """
+    background_tasks.add_task(refresh_citation_analytics, full)
+    return {"message": "Citation analytics refresh scheduled", "full": full}
+
+@router.get("/references/related-arguments", response_model=RelatedArgumentsResponse)
+@limiter.limit("100/minute")
+async def get_related_arguments(
+    request: Request,
+    response: Response,
+    argument_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Return the arguments related to an argument through their citations,
+    as stored by the last citation analytics refresh.
+
+    Parameters:
+        argument_id: ID of the argument
+
+    Returns:
+        RelatedArgumentsResponse with coupled and co-cited arguments, most
+        similar first
+    """
+    try:
+        async with driver.session() as session:
+            result = await session.run("""
+                MATCH (a) WHERE elementId(a) = $argument_id
+                RETURN a.coupled_arguments AS coupled, a.coupling_scores AS coupling_scores,
+                       a.cocited_arguments AS cocited, a.cocitation_scores AS cocitation_scores
+            """, {"argument_id": argument_id})
+            record = await result.single()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve related arguments: {e}")
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Argument {argument_id} not found")
+    return {
+        "argument_id": argument_id,
+        "coupled": [
+            {"argument_id": i, "score": score}
+            for i, score in zip(record["coupled"] or [], record["coupling_scores"] or [])
+        ],
+        "cocited": [
+            {"argument_id": i, "score": score}
+            for i, score in zip(record["cocited"] or [], record["cocitation_scores"] or [])
+        ]
+    }
 
 @router.post("/validate-reference", response_model=ReferenceValidationResponse)
 @limiter.limit("30/minute")
@@ -259,75 +475,90 @@ async def validate_reference(
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Validate a reference by checking its credibility.
-    
-    This would typically call an external service to validate the reference.
-    For testing purposes, we'll simulate a successful validation.
-    
+    Validate one reference and score its credibility.
+
+    Runs the same checks, Crossref lookup and cache as
+    /validate-references, so both endpoints agree on any reference.
+
     Parameters:
         reference: Reference details to validate
-        
+
     Returns:
         ReferenceValidationResponse with validation results
     """
     try:
-        # In a real implementation, this would call an external service
-        # For now, we'll simulate a successful validation
-        return {
-            "is_valid": True,
-            "message": "Reference validated successfully",
-            "validated": True,
-            "credibility_score": 0.95,
-            "peer_reviewed": True,
-            "citation_count": 1250
-        }
+        results, _ = await score_references([reference.dict()])
     except Exception as e:
+        logger.error(f"Error validating reference: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to validate reference: {e}")
+    return results[0]
+
+@router.post("/validate-references", response_model=ReferenceBatchValidationResponse)
+@limiter.limit("10/minute")
+async def validate_references(
+    request: Request,
+    response: Response,
+    batch: ReferenceBatchValidationRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Validate many references and score their credibility in one request.
+
+    Results are cached per normalized reference key for
+    REFERENCE_VALIDATION_TTL seconds, so only references that were never
+    validated, or whose result expired, are looked up in Crossref.
+    Lookups the scholarly service could not answer are not cached.
+
+    Parameters:
+        batch: References to validate
+
+    Returns:
+        ReferenceBatchValidationResponse with one result per reference, in
+        order, and how many results were cached or computed
+    """
+    try:
+        results, cached = await score_references([reference.dict() for reference in batch.references])
+    except Exception as e:
+        logger.error(f"Error validating reference batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to validate references: {e}")
+    return {"results": results, "cached": cached, "computed": len(results) - cached}
 
 @router.get("/search-references", response_model=ReferenceSearchResponse)
 @limiter.limit("50/minute")
+@cached_response("search-references", lambda request: [REFERENCES_TAG, CITATIONS_TAG])
 async def search_references(
     request: Request,
     response: Response,
     query: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, gt=0, le=settings.MAX_REFERENCE_PAGE_SIZE),
+    include_total: bool = Query(True, description="Count all matching references"),
     api_key: str = Depends(verify_api_key)
 ):
     """
-    Search for references based on a query.
-    
-    This would typically call an external service to search for references.
-    For testing purposes, we'll simulate search results.
-    
+    Search stored references by title, author and source.
+
+    Uses the reference full-text index, so results are BM25-ranked
+    without scanning Reference nodes.
+
     Parameters:
         query: Search query
-        
+        offset: Number of ranked results to skip
+        limit: Maximum number of results to return
+        include_total: Whether to count all matching references
+
     Returns:
-        ReferenceSearchResponse with search results
+        ReferenceSearchResponse with one page of results and, when
+        include_total is set, the total match count
     """
     try:
-        # In a real implementation, this would call an external service
-        # For now, we'll simulate search results
-        results = [
-            {
-                "title": "Climate Change 2021: The Physical Science Basis",
-                "author": "IPCC",
-                "year": 2021,
-                "source": "Intergovernmental Panel on Climate Change",
-                "url": "https://www.ipcc.ch/report/ar6/wg1/",
-                "relevance_score": 0.95
-            },
-            {
-                "title": "Global Warming of 1.5°C",
-                "author": "IPCC",
-                "year": 2018,
-                "source": "Intergovernmental Panel on Climate Change",
-                "url": "https://www.ipcc.ch/sr15/",
-                "relevance_score": 0.92
-            }
-        ]
+        async with driver.session() as session:
+            results, total = await find_references(
+                session, query, offset=offset, limit=limit, include_total=include_total
+            )
         return {
             "references": results,
-            "total": len(results),
+            "total": total,
             "results": results
         }
     except Exception as e:
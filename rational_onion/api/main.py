@@ -2,6 +2,7 @@
 
 from typing import List, Optional, Dict, Any
 import os
+import threading
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException, Security, Request, Response
 from fastapi.security.api_key import APIKeyHeader
@@ -14,12 +15,18 @@ from fastapi.exceptions import RequestValidationError
 from neo4j.exceptions import ServiceUnavailable, DatabaseError as Neo4jDatabaseError
 
 # Local imports
-from rational_onion.services.caching_service import caching_enabled, toggle_cache
+from rational_onion.services.caching_service import (
+    caching_enabled, toggle_cache, start_invalidation_listener, stop_invalidation_listener
+)
+from rational_onion.services.nlp_service import warmup_models, model_status
+from rational_onion.services.page_keys import start_page_key_backfill
+from rational_onion.services.scholarly_client import close_scholarly_client
 from rational_onion.api.argument_processing import router as argument_processing_router
 from rational_onion.api.argument_verification import router as argument_verification_router
 from rational_onion.api.argument_improvement import router as argument_improvement_router
 from rational_onion.api.external_references import router as external_references_router
 from rational_onion.api.dag_visualization import router as dag_visualization_router
+from rational_onion.api.argument_similarity import router as argument_similarity_router
 from rational_onion.config import get_settings, Settings
 from rational_onion.api.dependencies import limiter
 from rational_onion.api.errors import ErrorType, BaseAPIError, DatabaseError
@@ -113,6 +120,32 @@ app.include_router(argument_verification_router, prefix="", tags=["Argument Veri
 app.include_router(argument_improvement_router, prefix="", tags=["Argument Improvement"])
 app.include_router(external_references_router, prefix="", tags=["External References"])
 app.include_router(dag_visualization_router, prefix="", tags=["DAG Visualization"])
+app.include_router(argument_similarity_router, prefix="", tags=["Argument Similarity"])
+
+@app.on_event("startup")
+async def start_nlp_warmup() -> None:
+    """Load NLP models in the background so the worker can serve requests immediately"""
+    if settings.NLP_WARMUP_ON_STARTUP:
+        threading.Thread(target=warmup_models, name="nlp-warmup", daemon=True).start()
+
+@app.on_event("startup")
+async def start_page_key_migration() -> None:
+    """Key nodes written by other tools, so whole-graph paging stays on the page_key index"""
+    start_page_key_backfill()
+
+@app.on_event("startup")
+async def start_cache_invalidation() -> None:
+    """Keep this worker's in-process cache tier coherent with the other workers"""
+    start_invalidation_listener()
+
+@app.on_event("shutdown")
+async def stop_cache_invalidation() -> None:
+    await stop_invalidation_listener()
+
+@app.on_event("shutdown")
+async def close_external_clients() -> None:
+    """Close pooled connections to external scholarly services"""
+    await close_scholarly_client()
 
 @app.get("/health")
 @limiter.limit(settings.RATE_LIMIT)
@@ -142,5 +175,30 @@ async def health_check(request: Request, response: Response) -> Dict[str, Any]:
         "debug": settings.DEBUG
     }
 
+@app.get("/health/ready")
+async def readiness_check(response: Response) -> Dict[str, Any]:
+    """
+    Report whether this worker is ready to receive traffic.
+    
+    When NLP warmup is enabled the worker is only ready once the models
+    are loaded; otherwise models load lazily on first use and the worker
+    is ready immediately.
+    
+    Returns:
+        Dict containing:
+            - ready: Whether traffic should be routed here
+            - components: Individual service statuses
+    
+    Responds with status 503 while not ready.
+    """
+    nlp_status = model_status()
+    ready = nlp_status == "ready" or not settings.NLP_WARMUP_ON_STARTUP
+    if not ready:
+        response.status_code = 503
+    return {
+        "ready": ready,
+        "components": {"nlp": nlp_status}
+    }
+
 if __name__ == "__main__":
     uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
\ No newline at end of file
@@ -34,7 +34,73 @@ class Settings(BaseSettings):
     # NLP Settings
     SPACY_MODEL: str = "en_core_web_md"  # Production uses larger model
     SENTENCE_TRANSFORMER_MODEL: str = "all-MiniLM-L6-v2"
+    NLP_ANALYSIS_VERSION: str = "1"  # Bump to invalidate precomputed analyses
+    NLP_PRECOMPUTE_ENABLED: bool = True  # Analyse arguments in the background on insert
+    NLP_WARMUP_ON_STARTUP: bool = True  # Load NLP models in a background thread at startup
+    # spaCy components to exclude (never loaded) or disable (loaded, not run) per use case
+    SPACY_PIPELINE_PROFILES: Dict[str, Dict[str, List[str]]] = {
+        "full": {"exclude": [], "disable": []},
+        "suggestions": {"exclude": ["ner"], "disable": []}
+    }
+    SPACY_DEFAULT_PROFILE: str = "suggestions"  # Loaded at warmup, checked by readiness, used for suggestions
+    NLP_BATCH_SIZE: Annotated[int, Field(gt=0)] = 32  # Texts per nlp.pipe batch
+    NLP_N_PROCESS: int = 1  # nlp.pipe worker processes, -1 for all CPUs
+    SUGGESTION_TOP_K: Annotated[int, Field(gt=0)] = 10  # Suggestions kept per analysed text
+    SUGGESTION_PAGE_SIZE: Annotated[int, Field(gt=0)] = 100  # Arguments per improvement page or stream batch
+    MAX_SUGGESTION_PAGE_SIZE: Annotated[int, Field(gt=0)] = 1000
+    DOC_CACHE_ENABLED: bool = True  # Persist parsed Docs so rule changes skip re-parsing
+    DOC_CACHE_DIR: str = "data/docs"  # Shared by all workers on a host
+    DOC_CACHE_MAX_BYTES: Annotated[int, Field(gt=0)] = 1024 * 1024 * 1024  # Per pipeline profile
+    DOC_CACHE_MAX_ENTRIES: Annotated[int, Field(gt=0)] = 200000  # Per pipeline profile
+    CORPUS_STATS_PATH: str = "data/corpus/lemma_df.u32"  # Lemma document frequencies shared by workers
+    CORPUS_STATS_BUCKETS: Annotated[int, Field(gt=0)] = 1 << 20  # Hashed lemma slots (4 bytes each)
+    CORPUS_MIN_DOCUMENTS: Annotated[int, Field(gt=0)] = 50  # Corpus size before IDF signals are used
+    COMMON_TERM_DOC_FRACTION: Annotated[float, Field(gt=0, le=1)] = 0.05  # Share of arguments making a lemma commonplace
+    MAX_BATCH_TEXTS: Annotated[int, Field(gt=0)] = 1000  # Texts per batch analysis request
+    EMBEDDING_BATCH_SIZE: Annotated[int, Field(gt=0)] = 64  # Texts per sentence transformer batch
+    EMBEDDING_CACHE_SIZE: Annotated[int, Field(gt=0)] = 10000  # Embeddings kept in memory
     
+    # Embedding Store Settings
+    EMBEDDING_STORE_DIR: str = "data/embeddings"  # Shared by all workers on a host
+    EMBEDDING_DIMENSION: Annotated[int, Field(gt=0)] = 384  # Must match SENTENCE_TRANSFORMER_MODEL
+    ANN_MIN_TRAIN_SIZE: Annotated[int, Field(gt=0)] = 1024  # Smaller stores are searched exactly
+    ANN_NPROBE: Annotated[int, Field(gt=0)] = 8  # IVF buckets scored per query
+
+    # Deduplication Settings
+    NEAR_DUPLICATE_THRESHOLD: Annotated[float, Field(gt=0, le=1)] = 0.8  # Estimated Jaccard similarity of claims
+    MINHASH_NUM_PERM: Annotated[int, Field(gt=0)] = 128
+    MINHASH_BANDS: Annotated[int, Field(gt=0)] = 32  # LSH bands; fewer rows per band favours recall
+    MINHASH_SHINGLE_SIZE: Annotated[int, Field(gt=0)] = 5  # Characters per shingle
+
+    # Contradiction Scan Settings
+    CONTRADICTION_NEIGHBOURS: Annotated[int, Field(gt=0)] = 10  # Nearest claims compared per claim
+    CONTRADICTION_MIN_SIMILARITY: float = 0.6  # Candidates must share a topic
+    CONTRADICTION_MIN_CONFIDENCE: float = 0.7  # Score needed to suggest a CHALLENGES edge
+
+    # Reference Settings
+    REFERENCE_INDEX_TIMEOUT: Annotated[int, Field(gt=0)] = 30  # Seconds to wait for the full-text index
+    MAX_REFERENCE_PAGE_SIZE: Annotated[int, Field(gt=0)] = 100
+    MAX_REFERENCE_BATCH: Annotated[int, Field(gt=0)] = 500  # References per batch add request
+    REFERENCE_DUPLICATE_THRESHOLD: Annotated[float, Field(gt=0, le=1)] = 0.7  # Title trigram Jaccard similarity
+    REFERENCE_CANDIDATES: Annotated[int, Field(gt=0)] = 200  # Lexical candidates re-ranked with embeddings
+    REFERENCE_RANK_TOP_K: Annotated[int, Field(gt=0)] = 10
+    REFERENCE_RANK_BUDGET_MS: Annotated[int, Field(gt=0)] = 500  # Ranking falls back to lexical scores past this
+    REFERENCE_RECENCY_HALF_LIFE: Annotated[float, Field(gt=0)] = 10.0  # Years for the recency prior to halve
+    REFERENCE_VALIDATION_TTL: Annotated[int, Field(gt=0)] = 604800  # Seconds a validation result is reused
+    RELATED_ARGUMENTS_TOP_K: Annotated[int, Field(gt=0)] = 10  # Related arguments stored per argument and measure
+
+    # Scholarly API Settings
+    CROSSREF_API_URL: str = "https://api.crossref.org"
+    SCHOLARLY_TIMEOUT: Annotated[float, Field(gt=0)] = 10.0  # Seconds per upstream request
+    SCHOLARLY_CONNECT_TIMEOUT: Annotated[float, Field(gt=0)] = 3.0
+    SCHOLARLY_MAX_CONNECTIONS: Annotated[int, Field(gt=0)] = 20  # Pooled connections across all hosts
+    SCHOLARLY_MAX_PER_HOST: Annotated[int, Field(gt=0)] = 4  # Concurrent requests per upstream host
+    SCHOLARLY_MAX_RETRIES: Annotated[int, Field(ge=0)] = 3
+    SCHOLARLY_BACKOFF_BASE: Annotated[float, Field(gt=0)] = 0.5  # Seconds before the first retry
+    SCHOLARLY_MAX_BACKOFF: Annotated[float, Field(gt=0)] = 30.0
+    SCHOLARLY_CACHE_TTL: Annotated[int, Field(gt=0)] = 86400  # Seconds a response is served as fresh
+    SCHOLARLY_STALE_TTL: Annotated[int, Field(ge=0)] = 604800  # Further seconds it is served while refreshing
+
     # Security Settings
     API_KEY_NAME: str = "X-API-Key"
     VALID_API_KEYS: List[str] = ["test_api_key_123"]
@@ -48,6 +114,10 @@ class Settings(BaseSettings):
     # Cache Settings
     CACHE_TTL: int = 3600  # 1 hour
     CACHE_ENABLED: bool = True
+    LOCAL_CACHE_ENABLED: bool = True  # In-process tier in front of Redis
+    LOCAL_CACHE_MAX_ENTRIES: Annotated[int, Field(gt=0)] = 1024
+    LOCAL_CACHE_MAX_BYTES: Annotated[int, Field(gt=0)] = 64 * 1024 * 1024  # Serialized size of all entries
+    LOCAL_CACHE_TTL: Annotated[float, Field(gt=0)] = 30.0  # Seconds; bounds staleness if an invalidation is lost
 
     @validator("API_PORT")
     def validate_api_port(cls, v: int) -> int:
@@ -77,6 +147,21 @@ class Settings(BaseSettings):
             raise ValueError(f"Invalid rate limit format: {e}")
         return v
 
+    @validator("SPACY_DEFAULT_PROFILE")
+    def validate_spacy_default_profile(cls, v: str, values: Dict[str, Any]) -> str:
+        """Validate that the default spaCy profile is defined"""
+        if v not in values.get("SPACY_PIPELINE_PROFILES", {}):
+            raise ValueError(f"Unknown spaCy pipeline profile: {v}")
+        return v
+
+    @validator("MINHASH_BANDS")
+    def validate_minhash_bands(cls, v: int, values: Dict[str, Any]) -> int:
+        """Validate that signatures split evenly into LSH bands"""
+        num_perm = values.get("MINHASH_NUM_PERM")
+        if num_perm is not None and num_perm % v:
+            raise ValueError("MINHASH_NUM_PERM must be divisible by MINHASH_BANDS")
+        return v
+
     @validator("NEO4J_URI")
     def validate_neo4j_uri(cls, v: str) -> str:
         """Validate Neo4j URI format"""
@@ -1,5 +1,6 @@
 # rational_onion/models/toulmin_model.py
 
+from enum import Enum
 from pydantic import BaseModel, Field, constr
 from typing import Optional, List, Dict, Any
 from rational_onion.config import get_settings
@@ -20,9 +21,17 @@ class ArgumentResponse(BaseModel):
     rebuttal: Optional[str] = None
     message: str
 
+class DuplicateHandling(str, Enum):
+    """What an insert does when the new item nearly duplicates a stored one"""
+    CREATE = "create"  # No lookup, always create
+    FLAG = "flag"  # Create and record the near-duplicate on the new node
+    RETURN_EXISTING = "return_existing"  # Return the existing item instead
+
 class InsertArgumentResponse(BaseModel):
     argument_id: str
     message: str
+    duplicate_of: Optional[str] = None
+    duplicate_similarity: Optional[float] = None
 
 class ArgumentImprovementSuggestions(BaseModel):
     claim: str
@@ -0,0 +1,154 @@
+# rational_onion/services/analysis_service.py
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from rational_onion.config import get_settings
+from rational_onion.services import nlp_service
+from rational_onion.services.embedding_store import get_embedding_store
+from rational_onion.services.neo4j_service import driver
+from rational_onion.services.suggestion_engine import RULES_VERSION
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Components of an argument that are analysed, by node property
+ARGUMENT_COMPONENTS: Tuple[str, ...] = ("claim", "grounds", "warrant", "rebuttal")
+
+# Components an argument needs besides its claim, keyed by node property
+REQUIRED_COMPONENTS: Dict[str, str] = {
+    "grounds": "ground",
+    "warrant": "warrant"
+}
+
+def analysis_model_version() -> str:
+    """Identify the models and rules a stored analysis was produced with"""
+    return "|".join([
+        settings.SPACY_MODEL,
+        settings.SENTENCE_TRANSFORMER_MODEL,
+        settings.NLP_ANALYSIS_VERSION,
+        RULES_VERSION
+    ])
+
+def analysis_text_hash(components: Dict[str, Optional[str]]) -> str:
+    """Hash the component texts an analysis was computed from"""
+    digest = hashlib.sha256()
+    for name in ARGUMENT_COMPONENTS:
+        digest.update((components.get(name) or "").encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+def find_missing_components(components: Dict[str, Optional[str]]) -> List[str]:
+    """List required components that are absent or blank"""
+    return [
+        label for name, label in REQUIRED_COMPONENTS.items()
+        if not (components.get(name) or "").strip()
+    ]
+
+def is_analysis_current(node: Dict[str, Any]) -> bool:
+    """Check whether the analysis stored on a node matches its text and models"""
+    return (
+        node.get("analysis_model_version") == analysis_model_version()
+        and node.get("analysis_hash") == analysis_text_hash(node)
+        and node.get("analysis_suggestions") is not None
+        and node.get("analysis_components") is not None
+    )
+
+def analyse_components(arguments: Sequence[Dict[str, Optional[str]]]) -> List[Dict[str, List[str]]]:
+    """
+    Improvement suggestions for every component of many arguments.
+
+    The non-blank component texts of all arguments go through a single
+    process_batch pass; each argument gets a dict of suggestions keyed by
+    component name.
+    """
+    owners: List[Tuple[int, str]] = []
+    texts: List[str] = []
+    for index, components in enumerate(arguments):
+        for name in ARGUMENT_COMPONENTS:
+            text = components.get(name)
+            if text and text.strip():
+                owners.append((index, name))
+                texts.append(text)
+
+    results: List[Dict[str, List[str]]] = [{} for _ in arguments]
+    for (index, name), suggestions in zip(owners, nlp_service.process_batch(texts)):
+        results[index][name] = suggestions
+    return results
+
+def compute_argument_analysis(components: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Run the NLP analysis for one argument.
+
+    Returns the claim and per-component improvement suggestions, missing
+    components and claim embedding together with the hash and model
+    version they belong to. Per-component suggestions are stored as JSON
+    since node properties cannot hold maps.
+    """
+    claim = components.get("claim") or ""
+    embeddings, rows = nlp_service.encode_texts([claim])
+    suggestions = analyse_components([components])[0]
+    return {
+        "analysis_suggestions": suggestions.get("claim") or nlp_service.enhance_argument_with_nlp(claim),
+        "analysis_components": json.dumps(suggestions),
+        "analysis_missing": find_missing_components(components),
+        "analysis_embedding": embeddings[rows[0]].tolist(),
+        "analysis_hash": analysis_text_hash(components),
+        "analysis_model_version": analysis_model_version()
+    }
+
+async def precompute_argument_analysis(argument_id: str) -> None:
+    """
+    Background job storing the NLP analysis of an argument on its node.
+
+    The node is re-read and the analysis is only written if the text is
+    unchanged since, so a job queued for an older version of the text
+    never overwrites a newer analysis. The work is skipped when the stored
+    analysis is already current.
+    """
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            result = await session.run("""
+                MATCH (a:Argument)
+                WHERE elementId(a) = $argument_id
+                RETURN a.claim AS claim, a.grounds AS grounds,
+                       a.warrant AS warrant, a.rebuttal AS rebuttal,
+                       a.analysis_hash AS analysis_hash,
+                       a.analysis_model_version AS analysis_model_version,
+                       a.analysis_suggestions AS analysis_suggestions,
+                       a.analysis_components AS analysis_components
+            """, {"argument_id": argument_id})
+            record = await result.single()
+            if not record:
+                logger.warning(f"Argument {argument_id} not found for precomputation")
+                return
+
+            node = dict(record)
+            if is_analysis_current(node):
+                return
+
+            analysis = await asyncio.to_thread(compute_argument_analysis, node)
+            # Only write if the text is still the one analysed
+            result = await session.run("""
+                MATCH (a:Argument)
+                WHERE elementId(a) = $argument_id
+                AND [coalesce(a.claim, ''), coalesce(a.grounds, ''),
+                     coalesce(a.warrant, ''), coalesce(a.rebuttal, '')] = $texts
+                SET a += $analysis, a.analysis_updated_at = datetime()
+            """, {
+                "argument_id": argument_id,
+                "analysis": analysis,
+                "texts": [node.get(name) or "" for name in ARGUMENT_COMPONENTS]
+            })
+            summary = await result.consume()
+            if not summary.counters.properties_set:
+                logger.info(f"Argument {argument_id} changed during precomputation; analysis discarded")
+                return
+            
+            await asyncio.to_thread(get_embedding_store().add, argument_id, analysis["analysis_embedding"])
+    except Exception as e:
+        logger.error(f"Error precomputing analysis for argument {argument_id}: {e}")
@@ -1,9 +1,22 @@
 # rational_onion/services/caching_service.py
 
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
 import aioredis
-from fastapi import HTTPException
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from rational_onion.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
 redis = aioredis.from_url(
@@ -20,4 +33,316 @@ caching_enabled = settings.CACHE_ENABLED
 async def toggle_cache(enable: bool):
     global caching_enabled
     caching_enabled = enable
-    return {"message": f"Caching {'enabled' if enable else 'disabled'}."}
\ No newline at end of file
+    return {"message": f"Caching {'enabled' if enable else 'disabled'}."}
+
+RESPONSE_CACHE_PREFIX = "cache:response"
+TAG_VERSION_PREFIX = "cache:tag"
+INVALIDATION_CHANNEL = "cache:invalidations"
+
+# Seconds before resubscribing after the invalidation channel drops
+RESUBSCRIBE_DELAY = 1.0
+
+# Response cache tags. Every entry also depends on ALL_TAG.
+ALL_TAG = "all"
+ARGUMENTS_TAG = "arguments"  # Whole-graph views of arguments and their relationships
+REFERENCES_TAG = "references"  # The set of stored references
+CITATIONS_TAG = "citations"  # Any argument-reference link
+
+def argument_tag(argument_id: str) -> str:
+    """Tag of responses depending on one argument, its relationships and its citations"""
+    return f"argument:{argument_id}"
+
+class LocalCache:
+    """
+    Bounded in-process LRU of decoded cache entries.
+
+    Entries expire after ttl seconds and the least recently used ones are
+    evicted once there are more than max_entries or their sizes add up to
+    more than max_bytes. Each entry is indexed by its tags so an
+    invalidation drops exactly the entries depending on them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.LOCAL_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.LOCAL_CACHE_MAX_BYTES,
+        ttl: float = settings.LOCAL_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        # key -> (value, expires_at, size, tags)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        # Invalidations seen, to reject entries computed before one. A single
+        # counter rather than one per tag, so memory stays bounded
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[1] <= self.clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return item[0]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        tags: Iterable[str],
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Store an entry of size bytes, unless anything was invalidated since
+        generation was read or it alone exceeds max_bytes.
+        """
+        tags = tuple(tags)
+        if generation is not None and generation != self.generation:
+            return
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (value, self.clock() + self.ttl, size, tags)
+        self.size += size
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop every entry depending on any of the tags"""
+        self.generation += 1
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        self.size -= item[2]
+        for tag in item[3]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+class ResponseCache:
+    """
+    Redis cache for GET endpoint responses, invalidated by tag.
+
+    Each entry records the version of every tag it depends on when its
+    response was computed. Invalidating a tag increments its version, so
+    all entries depending on it stop matching at once, without scanning
+    or deleting keys; they simply expire. Versions are read before the
+    response is computed, so a write racing with a read makes that entry
+    stale rather than serving it past the write.
+
+    With a local tier, entries are also kept decoded in process memory and
+    served without a Redis round trip. Invalidations are published on
+    INVALIDATION_CHANNEL and listen() drops the matching local entries in
+    every worker. The local tier is only used while that subscription is
+    up, and is cleared whenever it drops, so a missed message cannot leave
+    a stale entry behind for longer than the local TTL.
+    """
+
+    def __init__(
+        self,
+        cache: Any = redis,
+        ttl: int = settings.CACHE_TTL,
+        local: Optional[LocalCache] = None
+    ) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.local = local
+        self._subscribed = False
+
+    @property
+    def local_active(self) -> bool:
+        return self.local is not None and self._subscribed
+
+    @staticmethod
+    def key(namespace: str, request: Request) -> str:
+        """Cache key of a request: its path and sorted query parameters"""
+        query = sorted(request.query_params.multi_items())
+        digest = hashlib.sha256(json.dumps([request.url.path, query]).encode("utf-8")).hexdigest()
+        return f"{RESPONSE_CACHE_PREFIX}:{namespace}:{digest}"
+
+    async def lookup(self, key: str, tags: List[str]) -> Tuple[Optional[str], List[int]]:
+        """Read a serialized entry and the current versions of its tags in one round trip"""
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.mget([f"{TAG_VERSION_PREFIX}:{tag}" for tag in tags])
+            serialized, versions = await pipe.execute()
+        return serialized, [int(version or 0) for version in versions]
+
+    async def store(self, key: str, entry: Dict[str, Any]) -> int:
+        """Write an entry to Redis; returns its serialized size"""
+        serialized = json.dumps(entry)
+        try:
+            await self.cache.set(key, serialized, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to cache response: {e}")
+        return len(serialized)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Invalidate every cached response depending on any of the tags"""
+        if not tags:
+            return
+        tags = tuple(dict.fromkeys(tags))
+        if self.local is not None:
+            self.local.invalidate(tags)
+        try:
+            async with self.cache.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(f"{TAG_VERSION_PREFIX}:{tag}")
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps(tags))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached responses: {e}")
+
+    async def listen(self) -> None:
+        """Apply invalidations published by other workers to the local tier; runs until cancelled"""
+        if self.local is None:
+            return
+        while True:
+            pubsub = self.cache.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        # Invalidations may have been missed while unsubscribed
+                        self.local.clear()
+                        self._subscribed = True
+                    elif message["type"] == "message":
+                        self.local.invalidate(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation channel unavailable: {e}")
+            finally:
+                self._subscribed = False
+                self.local.clear()
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    @staticmethod
+    def _payload(result: Any, response: Optional[Response]) -> Optional[Dict[str, Any]]:
+        """The cacheable form of an endpoint result, or None if it must not be cached"""
+        headers = [response.headers if response is not None else {}]
+        if isinstance(result, Response):
+            headers.append(result.headers)
+        if any("no-store" in h.get("Cache-Control", "") for h in headers):
+            return None
+        if isinstance(result, StreamingResponse):
+            return None
+        if isinstance(result, Response):
+            if result.status_code != 200:
+                return None
+            return {"body": result.body.decode("utf-8"), "media_type": result.media_type}
+        return {"value": jsonable_encoder(result)}
+
+    @staticmethod
+    def _hit(entry: Dict[str, Any], response: Optional[Response], source: str) -> Any:
+        if "body" in entry:
+            return Response(content=entry["body"], media_type=entry["media_type"], headers={"X-Cache": source})
+        if response is not None:
+            response.headers["X-Cache"] = source
+        return entry["value"]
+
+    def cached(
+        self,
+        namespace: str,
+        tags: Callable[[Request], Iterable[str]]
+    ) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+        """
+        Decorator caching an endpoint's GET responses.
+
+        Place it below @limiter.limit so rate limits still apply to cached
+        requests. tags maps the request to the tags its response depends
+        on. Non-200 and streaming responses, and responses marked
+        Cache-Control: no-store, are not cached; an unavailable cache
+        falls through to the endpoint.
+        """
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                request: Optional[Request] = kwargs.get("request")
+                response: Optional[Response] = kwargs.get("response")
+                if not caching_enabled or request is None or request.method != "GET":
+                    return await func(*args, **kwargs)
+
+                key = self.key(namespace, request)
+                entry_tags = [ALL_TAG, *tags(request)]
+                use_local = self.local_active
+                if use_local:
+                    entry = self.local.get(key)
+                    if entry is not None:
+                        return self._hit(entry, response, "LOCAL")
+                    generation = self.local.generation
+
+                try:
+                    serialized, versions = await self.lookup(key, entry_tags)
+                except Exception as e:
+                    logger.warning(f"Response cache unavailable: {e}")
+                    return await func(*args, **kwargs)
+
+                entry = json.loads(serialized) if serialized else None
+                if entry is not None and entry["versions"] == versions:
+                    if use_local:
+                        self.local.set(key, entry, len(serialized), entry_tags, generation)
+                    return self._hit(entry, response, "HIT")
+
+                result = await func(*args, **kwargs)
+                payload = self._payload(result, response)
+                if payload is not None:
+                    entry = {"versions": versions, **payload}
+                    size = await self.store(key, entry)
+                    if use_local:
+                        self.local.set(key, entry, size, entry_tags, generation)
+                    if response is not None:
+                        response.headers["X-Cache"] = "MISS"
+                return result
+            return wrapper
+        return decorator
+
+response_cache = ResponseCache(local=LocalCache() if settings.LOCAL_CACHE_ENABLED else None)
+
+cached_response = response_cache.cached
+invalidate_tags = response_cache.invalidate
+
+_listener: Optional["asyncio.Task[None]"] = None
+
+def start_invalidation_listener() -> None:
+    """Start applying cross-worker invalidations to the local cache tier"""
+    global _listener
+    if _listener is None and response_cache.local is not None:
+        _listener = asyncio.create_task(response_cache.listen())
+
+async def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
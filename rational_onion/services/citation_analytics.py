@@ -0,0 +1,268 @@
+# rational_onion/services/citation_analytics.py
+
+import asyncio
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from neo4j import AsyncSession
+
+from rational_onion.config import get_settings
+from rational_onion.services.neo4j_service import driver
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# An argument cites a reference directly or through its grounds or warrant;
+# grounds and warrants are never arguments themselves
+CITATION_MATCH = """
+    MATCH (a)-[:HAS_GROUND|HAS_WARRANT*0..1]->(c)-[:CITES]->(r:Reference)
+    WHERE NOT ()-[:HAS_GROUND|HAS_WARRANT]->(a)
+"""
+
+def incidence_matrix(
+    citations: Sequence[Tuple[str, str]]
+) -> Tuple[sp.csr_matrix, List[str], List[str]]:
+    """
+    Binary argument x reference matrix of (argument_id, reference_id) pairs.
+
+    Returns:
+        (matrix, argument ids by row, reference ids by column)
+    """
+    argument_ids = list(dict.fromkeys(argument_id for argument_id, _ in citations))
+    reference_ids = list(dict.fromkeys(reference_id for _, reference_id in citations))
+    row_of = {argument_id: row for row, argument_id in enumerate(argument_ids)}
+    column_of = {reference_id: column for column, reference_id in enumerate(reference_ids)}
+    matrix = sp.csr_matrix(
+        (
+            np.ones(len(citations), dtype=np.float32),
+            (
+                np.fromiter((row_of[a] for a, _ in citations), dtype=np.int64, count=len(citations)),
+                np.fromiter((column_of[r] for _, r in citations), dtype=np.int64, count=len(citations))
+            )
+        ),
+        shape=(len(argument_ids), len(reference_ids))
+    )
+    # Duplicate pairs are summed on construction
+    matrix.data[:] = 1.0
+    return matrix, argument_ids, reference_ids
+
+def _inverse(values: np.ndarray) -> np.ndarray:
+    return np.divide(1.0, values, out=np.zeros_like(values, dtype=np.float32), where=values > 0)
+
+def _drop_self(scores: sp.csr_matrix, rows: np.ndarray) -> sp.csr_matrix:
+    local = np.arange(len(rows))
+    own = sp.csr_matrix((np.asarray(scores[local, rows]).ravel(), (local, rows)), shape=scores.shape)
+    scores = (scores - own).tocsr()
+    scores.eliminate_zeros()
+    return scores
+
+def cocitation_matrix(incidence: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    Cosine co-citation similarity between references.
+
+    Two references are co-cited by every argument citing both; counts are
+    normalized by how often each reference is cited.
+    """
+    cocited = (incidence.T @ incidence).tocsr()
+    norms = sp.diags(_inverse(np.sqrt(cocited.diagonal())))
+    similarity = (norms @ cocited @ norms).tocsr()
+    similarity.setdiag(0.0)
+    similarity.eliminate_zeros()
+    return similarity
+
+def related_scores(
+    incidence: sp.csr_matrix,
+    cocitation: sp.csr_matrix,
+    rows: np.ndarray
+) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+    """
+    Similarities of the given argument rows to every argument.
+
+    Bibliographic coupling is the cosine of the arguments' reference sets.
+    Co-citation similarity is the mean co-citation similarity between a
+    reference of one argument and a reference of the other, so arguments
+    citing different but usually co-cited works are related too. Each
+    argument's similarity to itself is dropped.
+
+    Returns:
+        (coupling, co-citation), each of shape (len(rows), arguments)
+    """
+    degrees = np.asarray(incidence.sum(axis=1)).ravel()
+    subset = incidence[rows]
+
+    shared = subset @ incidence.T
+    coupling = sp.diags(_inverse(np.sqrt(degrees[rows]))) @ shared @ sp.diags(_inverse(np.sqrt(degrees)))
+
+    cocited = subset @ cocitation @ incidence.T
+    cocitation_similarity = sp.diags(_inverse(degrees[rows])) @ cocited @ sp.diags(_inverse(degrees))
+
+    return _drop_self(coupling.tocsr(), rows), _drop_self(cocitation_similarity.tocsr(), rows)
+
+def top_k_per_row(scores: sp.csr_matrix, k: int) -> List[List[Tuple[int, float]]]:
+    """Up to k (column, score) pairs per row, highest score first, ties by column"""
+    top = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        columns, values = scores.indices[start:end], scores.data[start:end]
+        if len(values) > k:
+            keep = np.argpartition(-values, k - 1)[:k]
+            # Keep every entry tied with the k-th best so ties resolve by column
+            keep = np.flatnonzero(values >= values[keep].min())
+            columns, values = columns[keep], values[keep]
+        order = np.lexsort((columns, -values))[:k]
+        top.append([(int(columns[i]), round(float(values[i]), 4)) for i in order])
+    return top
+
+async def _fetch_citations(session: AsyncSession) -> List[Tuple[str, str]]:
+    result = await session.run(f"""
+        {CITATION_MATCH}
+        RETURN DISTINCT elementId(a) AS argument_id, elementId(r) AS reference_id
+    """)
+    return [(record["argument_id"], record["reference_id"]) async for record in result]
+
+async def _changed_arguments(session: AsyncSession) -> Set[str]:
+    """Arguments whose citations, or whose components' citations, changed since their last refresh"""
+    result = await session.run("""
+        MATCH (a)-[:HAS_GROUND|HAS_WARRANT*0..1]->(c)
+        WHERE c.citations_changed_at IS NOT NULL
+        AND NOT ()-[:HAS_GROUND|HAS_WARRANT]->(a)
+        AND (a.related_computed_at IS NULL OR c.citations_changed_at > a.related_computed_at)
+        RETURN DISTINCT elementId(a) AS id
+    """)
+    return {record["id"] async for record in result}
+
+async def _arguments_listing(session: AsyncSession, argument_ids: Optional[Sequence[str]]) -> Set[str]:
+    """Arguments with stored related lists, all of them or those listing any of argument_ids"""
+    result = await session.run("""
+        MATCH (a)
+        WHERE a.related_computed_at IS NOT NULL
+        AND ($ids IS NULL OR any(id IN a.coupled_arguments + a.cocited_arguments WHERE id IN $ids))
+        RETURN elementId(a) AS id
+    """, {"ids": list(argument_ids) if argument_ids is not None else None})
+    return {record["id"] async for record in result}
+
+def _affected_rows(
+    incidence: sp.csr_matrix,
+    cocitation: sp.csr_matrix,
+    changed_rows: np.ndarray
+) -> np.ndarray:
+    """Changed rows plus every row whose coupling or co-citation with them can have changed"""
+    if len(changed_rows) == 0:
+        return changed_rows
+    subset = incidence[changed_rows]
+    # Both similarities are symmetric, so the arguments related to a changed
+    # one are the non-zero columns of its rows
+    reach = subset @ incidence.T + subset @ cocitation @ incidence.T
+    return np.union1d(changed_rows, np.unique(reach.tocoo().col))
+
+def _related_rows(
+    incidence: sp.csr_matrix,
+    cocitation: sp.csr_matrix,
+    rows: np.ndarray,
+    argument_ids: List[str]
+) -> List[Dict[str, Any]]:
+    coupling, cocitation_similarity = related_scores(incidence, cocitation, rows)
+    k = settings.RELATED_ARGUMENTS_TOP_K
+    return [
+        {
+            "id": argument_ids[row],
+            "coupled": [argument_ids[column] for column, _ in coupled],
+            "coupling_scores": [score for _, score in coupled],
+            "cocited": [argument_ids[column] for column, _ in cocited],
+            "cocitation_scores": [score for _, score in cocited]
+        }
+        for row, coupled, cocited in zip(
+            rows, top_k_per_row(coupling, k), top_k_per_row(cocitation_similarity, k)
+        )
+    ]
+
+async def _store_related(session: AsyncSession, rows: List[Dict[str, Any]], computed_at: datetime.datetime) -> None:
+    result = await session.run("""
+        UNWIND $rows AS row
+        MATCH (a) WHERE elementId(a) = row.id
+        SET a.coupled_arguments = row.coupled,
+            a.coupling_scores = row.coupling_scores,
+            a.cocited_arguments = row.cocited,
+            a.cocitation_scores = row.cocitation_scores,
+            a.related_computed_at = $computed_at
+    """, {"rows": rows, "computed_at": computed_at})
+    await result.consume()
+
+async def refresh_citation_analytics(full: bool = False, batch_size: int = 256) -> int:
+    """
+    Background job storing each argument's most related arguments by citations.
+
+    The argument x reference incidence matrix is rebuilt from the graph as
+    a sparse matrix; coupling and co-citation similarities are sparse
+    products over it, computed batch_size rows at a time off the event
+    loop. The top RELATED_ARGUMENTS_TOP_K arguments of each kind are
+    stored on the argument with their scores.
+
+    By default only arguments whose citations changed since their last
+    refresh, and the arguments related to them, are recomputed. Returns
+    the number of arguments updated.
+    """
+    # Changes made while the job runs are picked up by the next run
+    computed_at = datetime.datetime.now(datetime.timezone.utc)
+    updated = 0
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            citations = await _fetch_citations(session)
+            incidence, argument_ids, _ = incidence_matrix(citations)
+            cocitation = await asyncio.to_thread(cocitation_matrix, incidence)
+            row_of = {argument_id: row for row, argument_id in enumerate(argument_ids)}
+
+            if full:
+                rows = np.arange(len(argument_ids))
+                stale = await _arguments_listing(session, None)
+            else:
+                changed = await _changed_arguments(session)
+                if not changed:
+                    return 0
+                changed_rows = np.array(sorted(row_of[i] for i in changed if i in row_of), dtype=np.int64)
+                rows = await asyncio.to_thread(_affected_rows, incidence, cocitation, changed_rows)
+                stale = changed | await _arguments_listing(session, sorted(changed))
+
+            # Stale lists are rebuilt, or cleared for arguments citing nothing any more
+            rows = np.union1d(rows, np.array([row_of[i] for i in stale if i in row_of], dtype=np.int64))
+            cleared = [
+                {"id": i, "coupled": [], "coupling_scores": [], "cocited": [], "cocitation_scores": []}
+                for i in sorted(stale) if i not in row_of
+            ]
+
+            for start in range(0, len(rows), batch_size):
+                batch = await asyncio.to_thread(
+                    _related_rows, incidence, cocitation, rows[start:start + batch_size], argument_ids
+                )
+                await _store_related(session, batch, computed_at)
+                updated += len(batch)
+            for start in range(0, len(cleared), batch_size):
+                batch = cleared[start:start + batch_size]
+                await _store_related(session, batch, computed_at)
+                updated += len(batch)
+    except Exception as e:
+        logger.error(f"Error refreshing citation analytics: {e}")
+    return updated
+
+_refresh_lock = asyncio.Lock()
+_refresh_pending = False
+
+async def request_citation_refresh() -> None:
+    """
+    Run an incremental refresh after citations changed.
+
+    Requests arriving while a refresh runs are coalesced into one more run
+    once it finishes, so bursts of writes do not queue up full rebuilds.
+    """
+    global _refresh_pending
+    _refresh_pending = True
+    if _refresh_lock.locked():
+        return
+    async with _refresh_lock:
+        while _refresh_pending:
+            _refresh_pending = False
+            await refresh_citation_analytics()
@@ -0,0 +1,205 @@
+# rational_onion/services/contradiction_service.py
+
+import asyncio
+import logging
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from neo4j import AsyncSession
+
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import ARGUMENTS_TAG, argument_tag, invalidate_tags
+from rational_onion.services.embedding_store import get_embedding_store
+from rational_onion.services.neo4j_service import driver
+from rational_onion.services.nlp_service import encode_texts
+from rational_onion.services.page_keys import backfill_page_keys, iter_pages
+from rational_onion.services.quality_service import bump_graph_version
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+NEGATION_CUES = frozenset({
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor",
+    "cannot", "without", "hardly", "rarely"
+})
+
+# Each axis pairs words of opposite polarity; claims on the same topic taking
+# opposite sides of an axis are likely to contradict
+POLARITY_AXES: List[Tuple[Tuple[str, ...], Tuple[str, ...]]] = [
+    (("increase", "increases", "increased", "rise", "rises", "rising", "grow", "grows", "growing",
+      "more", "higher"),
+     ("decrease", "decreases", "decreased", "fall", "falls", "falling", "decline", "declines", "declining",
+      "shrink", "shrinks", "less", "fewer", "lower", "reduce", "reduces", "reduced")),
+    (("safe", "beneficial", "good", "helpful", "effective", "benefit", "benefits", "improve", "improves"),
+     ("unsafe", "dangerous", "harmful", "bad", "ineffective", "harm", "harms", "worsen", "worsens")),
+    (("true", "correct", "proven"), ("false", "incorrect", "wrong", "disproven", "myth")),
+    (("support", "supports", "favor", "favors"), ("oppose", "opposes", "against")),
+    (("cause", "causes", "caused"), ("prevent", "prevents", "prevented")),
+    (("cheap", "cheaper"), ("expensive", "costlier")),
+    (("sustainable",), ("unsustainable",)),
+]
+
+POLARITY_LEXICON: Dict[str, Tuple[int, int]] = {
+    word: (axis, sign)
+    for axis, (positive, negative) in enumerate(POLARITY_AXES)
+    for sign, words in ((1, positive), (-1, negative))
+    for word in words
+}
+
+# A flipped negation is a stronger signal than an antonym
+NEGATION_WEIGHT = 0.95
+ANTONYM_WEIGHT = 0.85
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with contracted negations expanded"""
+    return re.findall(r"[a-z]+", text.lower().replace("n't", " not"))
+
+def cue_features(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Negation parity and polarity-axis signs for each text.
+
+    Returns:
+        (negation parity of shape (n,), axis signs of shape (n, axes))
+    """
+    negations = np.zeros(len(texts), dtype=np.int8)
+    polarity = np.zeros((len(texts), len(POLARITY_AXES)), dtype=np.int8)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        negations[row] = sum(token in NEGATION_CUES for token in tokens) % 2
+        for token in tokens:
+            if token in POLARITY_LEXICON:
+                axis, sign = POLARITY_LEXICON[token]
+                polarity[row, axis] = sign
+    return negations, polarity
+
+def score_contradictions(
+    first: Sequence[str],
+    second: Sequence[str],
+    similarities: np.ndarray
+) -> np.ndarray:
+    """
+    Score how likely each (first[i], second[i]) pair contradicts.
+
+    A pair contradicts when exactly one of a negation flip or an opposite
+    polarity holds (both together cancel out, as in "not increase" versus
+    "decrease"). The score is the pair's semantic similarity scaled by the
+    strength of the cue, and 0 for non-contradicting pairs.
+    """
+    texts = list(dict.fromkeys([*first, *second]))
+    row_of = {text: row for row, text in enumerate(texts)}
+    negations, polarity = cue_features(texts)
+    a = np.fromiter((row_of[text] for text in first), dtype=np.intp, count=len(first))
+    b = np.fromiter((row_of[text] for text in second), dtype=np.intp, count=len(second))
+
+    negation_flip = negations[a] != negations[b]
+    polarity_conflict = ((polarity[a] * polarity[b]) < 0).any(axis=1)
+    contradicts = negation_flip ^ polarity_conflict
+    weights = np.where(negation_flip, NEGATION_WEIGHT, ANTONYM_WEIGHT)
+    return np.where(contradicts, np.asarray(similarities, dtype=np.float32) * weights, 0.0)
+
+async def scan_for_contradictions(full: bool = False, batch_size: int = 256) -> int:
+    """
+    Background job suggesting CHALLENGES edges between contradicting arguments.
+
+    Each argument is only compared with its nearest neighbours in the
+    embedding store, so the scan is linear in the number of arguments. By
+    default only arguments not scanned before are processed; new arguments
+    are still compared against all existing ones through their neighbours.
+    Arguments are paged on their indexed page_key, after keying any
+    written without one. Returns the number of suggested edges written.
+    """
+    store = get_embedding_store()
+    written = 0
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            await backfill_page_keys(session)
+            pages = iter_pages(
+                session, "Argument", "elementId(n) AS id, n.claim AS claim",
+                "AND n.claim IS NOT NULL AND ($full OR n.contradiction_scanned_at IS NULL)",
+                {"full": full}, batch_size
+            )
+            async for records in pages:
+                # Embed arguments the store has not seen yet in one batch;
+                # store file I/O runs off the event loop
+                claims = {r["id"]: r["claim"] for r in records}
+                missing = await asyncio.to_thread(store.missing, list(claims))
+                if missing:
+                    embeddings, rows = await asyncio.to_thread(encode_texts, [claims[i] for i in missing])
+                    await asyncio.to_thread(store.add_many, missing, embeddings[rows])
+                vectors = await asyncio.to_thread(store.get_many, list(claims))
+
+                pairs: Dict[Tuple[str, str], float] = {}
+                for record, vector in zip(records, vectors):
+                    if vector is None:
+                        continue
+                    neighbours = await asyncio.to_thread(
+                        store.search, vector, settings.CONTRADICTION_NEIGHBOURS, {record["id"]}
+                    )
+                    for neighbour_id, similarity in neighbours:
+                        if similarity >= settings.CONTRADICTION_MIN_SIMILARITY:
+                            pairs[tuple(sorted((record["id"], neighbour_id)))] = similarity
+
+                if pairs:
+                    written += await _suggest_challenges(session, pairs)
+
+                await session.run("""
+                    UNWIND $ids AS id
+                    MATCH (a:Argument)
+                    WHERE elementId(a) = id
+                    SET a.contradiction_scanned_at = datetime()
+                """, {"ids": [r["id"] for r in records]})
+    except Exception as e:
+        logger.error(f"Error scanning for contradictions: {e}")
+    return written
+
+async def _suggest_challenges(session: AsyncSession, pairs: Dict[Tuple[str, str], float]) -> int:
+    """
+    Score candidate pairs in one batch and write the confident ones.
+
+    Like any relationship write, new edges invalidate the cached responses
+    of the arguments they join and of whole-graph views, and the quality
+    scores cached for the current graph version.
+    """
+    ids = sorted({item_id for pair in pairs for item_id in pair})
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (a:Argument)
+        WHERE elementId(a) = id
+        RETURN id, a.claim AS claim
+    """, {"ids": ids})
+    claims = {record["id"]: record["claim"] for record in await result.data() if record["claim"]}
+
+    candidates = [(pair, similarity) for pair, similarity in pairs.items() if pair[0] in claims and pair[1] in claims]
+    if not candidates:
+        return 0
+    scores = score_contradictions(
+        [claims[source] for (source, _), _ in candidates],
+        [claims[target] for (_, target), _ in candidates],
+        np.array([similarity for _, similarity in candidates], dtype=np.float32)
+    )
+    suggestions = [
+        {"source": source, "target": target, "confidence": float(score)}
+        for ((source, target), _), score in zip(candidates, scores)
+        if score >= settings.CONTRADICTION_MIN_CONFIDENCE
+    ]
+    if not suggestions:
+        return 0
+
+    result = await session.run("""
+        UNWIND $suggestions AS s
+        MATCH (a:Argument) WHERE elementId(a) = s.source
+        MATCH (b:Argument) WHERE elementId(b) = s.target
+        WITH a, b, s
+        WHERE NOT EXISTS { MATCH (b)-[:CHALLENGES]->(a) }
+        MERGE (a)-[r:CHALLENGES]->(b)
+        ON CREATE SET r.suggested = true, r.confidence = s.confidence, r.created_at = datetime()
+    """, {"suggestions": suggestions})
+    summary = await result.consume()
+    created = summary.counters.relationships_created
+    if created:
+        await bump_graph_version()
+        joined = {item_id for suggestion in suggestions for item_id in (suggestion["source"], suggestion["target"])}
+        await invalidate_tags(ARGUMENTS_TAG, *map(argument_tag, sorted(joined)))
+    return created
@@ -0,0 +1,112 @@
+# rational_onion/services/corpus_stats.py
+
+import fcntl
+import logging
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from rational_onion.config import get_settings
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class CorpusStats:
+    """
+    Lemma document frequencies kept in a fixed-size hashed counter file.
+
+    Slot 0 holds the number of documents and every lemma hashes to one of
+    the remaining slots, so updates and lookups cost O(lemmas) whatever
+    the corpus size. Collisions can only overstate a frequency. All workers
+    map the same file; writers hold an exclusive file lock.
+    """
+
+    def __init__(self, path: str, buckets: int) -> None:
+        self.path = path
+        self.buckets = buckets
+        self._lock_path = f"{path}.lock"
+        self._counts: Optional[np.ndarray] = None
+        self._open_lock = threading.Lock()
+
+    def _slots(self, lemmas: Iterable[str]) -> np.ndarray:
+        return np.fromiter(
+            (zlib.crc32(lemma.encode("utf-8")) % self.buckets + 1 for lemma in lemmas),
+            dtype=np.intp
+        )
+
+    def _open(self) -> np.ndarray:
+        """Map the counter file, creating it on first use"""
+        if self._counts is None:
+            with self._open_lock:
+                if self._counts is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    with open(self._lock_path, "a") as lock_file:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                        try:
+                            if not os.path.exists(self.path):
+                                np.zeros(self.buckets + 1, dtype=np.uint32).tofile(self.path)
+                        finally:
+                            fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    self._counts = np.memmap(self.path, dtype=np.uint32, mode="r+", shape=(self.buckets + 1,))
+        return self._counts
+
+    def add_document(self, lemmas: Iterable[str]) -> None:
+        """Count one document containing the given lemmas"""
+        counts = self._open()
+        slots = np.unique(self._slots(set(lemmas)))
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                counts[slots] += 1
+                counts[0] += 1
+                counts.flush()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def document_count(self) -> int:
+        """Number of documents counted so far"""
+        return int(self._open()[0])
+
+    def document_frequencies(self, lemmas: Sequence[str]) -> Tuple[np.ndarray, int]:
+        """Return the document frequency of each lemma and the document count"""
+        counts = self._open()
+        return counts[self._slots(lemmas)].astype(np.int64), int(counts[0])
+
+_stats: Optional[CorpusStats] = None
+_stats_lock = threading.Lock()
+
+def get_corpus_stats() -> CorpusStats:
+    """Return the process-wide corpus statistics"""
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = CorpusStats(settings.CORPUS_STATS_PATH, settings.CORPUS_STATS_BUCKETS)
+    return _stats
+
+def document_lemmas(doc: "Doc") -> Set[str]:
+    """Distinct lowercased lemmas of the content words in a parsed text"""
+    return {token.lemma_.lower() for token in doc if token.is_alpha and not token.is_stop}
+
+def record_argument_terms(components: Dict[str, Optional[str]]) -> None:
+    """
+    Background job counting an inserted argument's lemmas in the corpus.
+
+    The claim, grounds, warrant and rebuttal together form one document.
+    """
+    from rational_onion.services.nlp_service import parse_texts
+    try:
+        texts = [text for text in components.values() if text]
+        lemmas: Set[str] = set()
+        for doc in parse_texts(texts, settings.SPACY_DEFAULT_PROFILE, n_process=1):
+            lemmas |= document_lemmas(doc)
+        get_corpus_stats().add_document(lemmas)
+    except Exception as e:
+        logger.error(f"Failed to update corpus statistics: {e}")
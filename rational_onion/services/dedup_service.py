@@ -0,0 +1,193 @@
+# rational_onion/services/dedup_service.py
+
+import hashlib
+import logging
+import re
+import unicodedata
+import zlib
+from typing import Any, List, Set, Tuple
+
+import numpy as np
+
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import redis
+from rational_onion.services.neo4j_service import driver
+from rational_onion.services.page_keys import backfill_page_keys, iter_pages
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+LSH_KEY_PREFIX = "lsh:claims"
+
+# Universal hashing modulus; shingle hashes and coefficients stay below 2**32
+# so (a * x + b) never overflows uint64
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+def content_hash(claim: str, grounds: str, warrant: str) -> str:
+    """Hash of an argument's normalised claim, grounds and warrant"""
+    digest = hashlib.sha256()
+    for field in (claim, grounds, warrant):
+        digest.update(" ".join(unicodedata.normalize("NFC", field).casefold().split()).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Character shingles of the normalised text"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+class MinHasher:
+    """MinHash signatures over character shingles"""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the signature of a text; all permutations are applied at once"""
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+def band_keys(signature: np.ndarray, bands: int, prefix: str = LSH_KEY_PREFIX) -> List[str]:
+    """Redis keys of the LSH buckets a signature falls into"""
+    rows = len(signature) // bands
+    return [
+        f"{prefix}:band:{band}:"
+        + hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    return float(np.mean(first == second))
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index over texts, kept in Redis so all workers share it.
+
+    A lookup only reads the buckets the query signature hashes to, so its
+    cost depends on the number of similar texts rather than corpus size.
+    Each index keeps its buckets and signatures under its own key prefix.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        num_perm: int,
+        bands: int,
+        shingle_size: int,
+        threshold: float,
+        key_prefix: str = LSH_KEY_PREFIX
+    ) -> None:
+        self._redis = client
+        self._hasher = MinHasher(num_perm, shingle_size)
+        self._bands = bands
+        self._prefix = key_prefix
+        self._signatures_key = f"{key_prefix}:signatures"
+        self.threshold = threshold
+
+    async def find(self, text: str) -> List[Tuple[str, float]]:
+        """Return indexed texts at or above the threshold, most similar first"""
+        signature = self._hasher.signature(text)
+        pipe = self._redis.pipeline()
+        for key in band_keys(signature, self._bands, self._prefix):
+            pipe.smembers(key)
+        candidate_ids = sorted(set().union(*await pipe.execute()))
+        if not candidate_ids:
+            return []
+
+        stored = await self._redis.hmget(self._signatures_key, candidate_ids)
+        matches = []
+        for candidate_id, stored_signature in zip(candidate_ids, stored):
+            if stored_signature is None:
+                continue
+            similarity = estimate_similarity(
+                signature, np.frombuffer(bytes.fromhex(stored_signature), dtype=np.uint64)
+            )
+            if similarity >= self.threshold:
+                matches.append((candidate_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    async def add(self, item_id: str, text: str) -> None:
+        """Index a text under its id"""
+        signature = self._hasher.signature(text)
+        pipe = self._redis.pipeline()
+        for key in band_keys(signature, self._bands, self._prefix):
+            pipe.sadd(key, item_id)
+        pipe.hset(self._signatures_key, item_id, signature.tobytes().hex())
+        await pipe.execute()
+
+    async def remove(self, item_id: str) -> None:
+        """Drop an id from the index, if present"""
+        stored = await self._redis.hget(self._signatures_key, item_id)
+        if stored is None:
+            return
+        signature = np.frombuffer(bytes.fromhex(stored), dtype=np.uint64)
+        pipe = self._redis.pipeline()
+        for key in band_keys(signature, self._bands, self._prefix):
+            pipe.srem(key, item_id)
+        pipe.hdel(self._signatures_key, item_id)
+        await pipe.execute()
+
+near_duplicate_index = NearDuplicateIndex(
+    redis,
+    num_perm=settings.MINHASH_NUM_PERM,
+    bands=settings.MINHASH_BANDS,
+    shingle_size=settings.MINHASH_SHINGLE_SIZE,
+    threshold=settings.NEAR_DUPLICATE_THRESHOLD
+)
+
+async def find_near_duplicates(claim: str) -> List[Tuple[str, float]]:
+    """Look up near-duplicate claims, treating an unavailable index as no match"""
+    try:
+        return await near_duplicate_index.find(claim)
+    except Exception as e:
+        logger.error(f"Near-duplicate lookup failed: {e}")
+        return []
+
+async def index_claim(argument_id: str, claim: str) -> None:
+    """Add a claim to the near-duplicate index, logging failures"""
+    try:
+        await near_duplicate_index.add(argument_id, claim)
+    except Exception as e:
+        logger.error(f"Failed to index claim of argument {argument_id}: {e}")
+
+async def index_existing_claims(batch_size: int = 256) -> int:
+    """
+    Background job adding stored Argument claims to the near-duplicate index.
+
+    Arguments are paged on their indexed page_key, after keying any
+    written without one. Re-indexing a claim is idempotent, so the job can
+    be re-run safely. Returns the number of claims indexed.
+    """
+    indexed = 0
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            await backfill_page_keys(session)
+            pages = iter_pages(
+                session, "Argument", "elementId(n) AS id, n.claim AS claim", "AND n.claim IS NOT NULL",
+                batch_size=batch_size
+            )
+            async for records in pages:
+                for record in records:
+                    await near_duplicate_index.add(record["id"], record["claim"])
+                indexed += len(records)
+    except Exception as e:
+        logger.error(f"Error indexing claims for near-duplicate detection: {e}")
+    return indexed
@@ -0,0 +1,178 @@
+# rational_onion/services/doc_cache.py
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from rational_onion.config import get_settings
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Name of a pipeline version directory
+VERSION_DIR = re.compile(r"^[0-9a-f]{16}$")
+
+# Stores between scans of the cache for eviction
+PRUNE_INTERVAL = 256
+
+# Eviction frees space down to this share of the limits, so it is not
+# needed again on the next put
+PRUNE_TARGET = 0.9
+
+def pipeline_version(nlp: "Language") -> str:
+    """Identify everything that affects a pipeline's parses"""
+    import spacy
+    key = "|".join([
+        spacy.__version__,
+        nlp.meta.get("lang", ""),
+        nlp.meta.get("name", ""),
+        nlp.meta.get("version", ""),
+        ",".join(nlp.pipe_names)
+    ])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+class DocCache:
+    """
+    Parsed spaCy Docs persisted on disk as DocBin blobs.
+
+    Entries are keyed by the text hash under a directory per pipeline
+    version, so a model or component change never serves stale parses
+    while rule changes keep reusing them; directories of other versions
+    are deleted. Files are written atomically, so workers can share the
+    directory.
+
+    The cache is bounded by max_bytes and max_entries. Reads refresh an
+    entry's mtime, and every PRUNE_INTERVAL stores the least recently
+    used entries are evicted until the cache is within its limits.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        nlp: "Language",
+        max_bytes: int = settings.DOC_CACHE_MAX_BYTES,
+        max_entries: int = settings.DOC_CACHE_MAX_ENTRIES
+    ) -> None:
+        self.nlp = nlp
+        self.version = pipeline_version(nlp)
+        self.directory = os.path.join(directory, self.version)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._puts = 0
+        self._remove_stale_versions(directory)
+        self.prune()
+
+    def _remove_stale_versions(self, root: str) -> None:
+        """Delete the directories of other pipeline versions under root"""
+        try:
+            names = os.listdir(root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name != self.version and VERSION_DIR.match(name):
+                logger.info(f"Removing parses cached by an older pipeline: {name}")
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    def _path(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.spacy")
+
+    def get(self, text: str) -> Optional["Doc"]:
+        """Return the cached parse of a text, if any"""
+        from spacy.tokens import DocBin
+        path = self._path(text)
+        try:
+            with open(path, "rb") as blob:
+                docs = list(DocBin().from_bytes(blob.read()).get_docs(self.nlp.vocab))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached parse: {e}")
+            return None
+        # Guard against hash collisions
+        if not docs or docs[0].text != text:
+            return None
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return docs[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional["Doc"]]:
+        """Return cached parses for several texts, None where missing"""
+        return [self.get(text) for text in texts]
+
+    def put(self, doc: "Doc") -> None:
+        """Store the parse of a text"""
+        from spacy.tokens import DocBin
+        path = self._path(doc.text)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = DocBin(docs=[doc], store_user_data=False).to_bytes()
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as blob:
+                blob.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        self._puts += 1
+        if self._puts % PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def put_many(self, docs: Iterable["Doc"]) -> None:
+        """Store several parses"""
+        for doc in docs:
+            self.put(doc)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cached parse"""
+        entries = []
+        try:
+            shards = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".spacy"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def prune(self) -> int:
+        """Evict least recently used parses beyond the cache limits; returns how many were removed"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        if total <= self.max_bytes and count <= self.max_entries:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes * PRUNE_TARGET and count <= self.max_entries * PRUNE_TARGET:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            count -= 1
+            removed += 1
+        logger.info(f"Evicted {removed} cached parses")
+        return removed
@@ -0,0 +1,289 @@
+# rational_onion/services/embedding_store.py
+
+import asyncio
+import fcntl
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rational_onion.config import get_settings
+from rational_onion.services.neo4j_service import driver
+from rational_onion.services.nlp_service import encode_texts
+from rational_onion.services.page_keys import PAGED_LABELS, backfill_page_keys, iter_pages
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+VECTORS_FILE = "vectors.f16"
+IDS_FILE = "ids.txt"
+LOCK_FILE = ".lock"
+
+# Rows converted to float32 at a time when (re)building the index
+INDEX_CHUNK_ROWS = 65536
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over unit vectors.
+
+    Rows are bucketed by their nearest spherical k-means centroid, and a
+    query only scores the rows in the nprobe buckets closest to it.
+    """
+
+    def __init__(self, centroids: np.ndarray) -> None:
+        self.centroids = centroids
+        self.lists: List[List[int]] = [[] for _ in range(len(centroids))]
+
+    @classmethod
+    def train(cls, sample: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        """Fit centroids to a sample of unit vectors"""
+        rng = np.random.default_rng(seed)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Keep the previous centroid for empty buckets
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        return cls(centroids.astype(np.float32))
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Assign rows to the bucket of their nearest centroid"""
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for row, list_id in zip(rows.tolist(), assignment.tolist()):
+            self.lists[list_id].append(row)
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the rows in the buckets closest to the query"""
+        nprobe = min(nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.fromiter(
+            (row for list_id in closest for row in self.lists[list_id]),
+            dtype=np.intp
+        )
+
+class EmbeddingStore:
+    """
+    Append-only store of normalised float16 embeddings shared by all workers.
+
+    Vectors live in a memory-mapped matrix file with a parallel id file.
+    Writers append under an exclusive file lock; every worker maps the same
+    files and picks up rows appended elsewhere on its next call. Re-adding
+    an id appends a new row that supersedes the old one.
+    """
+
+    def __init__(self, directory: str, dimension: int) -> None:
+        self.directory = directory
+        self.dimension = dimension
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, VECTORS_FILE)
+        self._ids_path = os.path.join(directory, IDS_FILE)
+        self._lock_path = os.path.join(directory, LOCK_FILE)
+        self._lock = threading.RLock()
+        self._vectors: np.ndarray = np.empty((0, dimension), dtype=np.float16)
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._live = np.zeros(0, dtype=bool)
+        self._ids_offset = 0
+        self._index: Optional[IVFIndex] = None
+        self._indexed_rows = 0
+        self._trained_rows = 0
+
+    @contextmanager
+    def _file_lock(self, operation: int) -> Iterator[None]:
+        """Hold an advisory lock on the store across processes"""
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Map rows appended since the last call, by this or another worker"""
+        if not os.path.exists(self._vectors_path):
+            return
+        rows = os.path.getsize(self._vectors_path) // (self.dimension * 2)
+        if rows == len(self._ids):
+            return
+
+        with open(self._ids_path, "r", encoding="utf-8") as ids_file:
+            ids_file.seek(self._ids_offset)
+            new_ids = [line.rstrip("\n") for line in ids_file.readlines()]
+            self._ids_offset = ids_file.tell()
+
+        start = len(self._ids)
+        self._live = np.concatenate([self._live, np.ones(len(new_ids), dtype=bool)])
+        for row, item_id in enumerate(new_ids, start=start):
+            previous = self._row_of.get(item_id)
+            if previous is not None:
+                self._live[previous] = False
+            self._row_of[item_id] = row
+        self._ids.extend(new_ids)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float16, mode="r",
+            shape=(len(self._ids), self.dimension)
+        )
+        self._update_index()
+
+    def _update_index(self) -> None:
+        """Train the ANN index once the store is large enough and keep it current"""
+        total = len(self._ids)
+        if total < settings.ANN_MIN_TRAIN_SIZE:
+            self._index = None
+            return
+
+        if self._index is None or total >= 2 * self._trained_rows:
+            # (Re)train as the corpus doubles so buckets stay balanced
+            rng = np.random.default_rng(0)
+            n_lists = max(1, int(np.sqrt(total)))
+            sample_rows = np.sort(rng.choice(total, size=min(total, n_lists * 64), replace=False))
+            sample = np.asarray(self._vectors[sample_rows], dtype=np.float32)
+            self._index = IVFIndex.train(sample, n_lists)
+            self._trained_rows = total
+            self._indexed_rows = 0
+
+        for start in range(self._indexed_rows, total, INDEX_CHUNK_ROWS):
+            rows = np.arange(start, min(start + INDEX_CHUNK_ROWS, total))
+            self._index.add(rows, np.asarray(self._vectors[rows], dtype=np.float32))
+        self._indexed_rows = total
+
+    def _refresh(self) -> None:
+        with self._file_lock(fcntl.LOCK_SH):
+            self._sync()
+
+    def add_many(self, item_ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Append embeddings for the given ids"""
+        if not item_ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(item_ids), self.dimension)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        with self._lock, self._file_lock(fcntl.LOCK_EX):
+            # Catch up first so the id file offset stays aligned with our rows
+            self._sync()
+            with open(self._vectors_path, "ab") as vectors_file:
+                vectors_file.write(vectors.astype(np.float16).tobytes())
+            with open(self._ids_path, "a", encoding="utf-8") as ids_file:
+                ids_file.write("".join(f"{item_id}\n" for item_id in item_ids))
+            self._sync()
+
+    def add(self, item_id: str, vector: np.ndarray) -> None:
+        """Append the embedding for one id"""
+        self.add_many([item_id], np.asarray(vector)[None, :])
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        """Return the latest embedding stored for an id"""
+        with self._lock:
+            self._refresh()
+            row = self._row_of.get(item_id)
+            return None if row is None else np.asarray(self._vectors[row], dtype=np.float32)
+
+    def get_many(self, item_ids: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return the latest embedding stored for each id, or None"""
+        with self._lock:
+            self._refresh()
+            rows = [self._row_of.get(item_id) for item_id in item_ids]
+            return [None if row is None else np.asarray(self._vectors[row], dtype=np.float32) for row in rows]
+
+    def missing(self, item_ids: Sequence[str]) -> List[str]:
+        """The given ids with no stored embedding, in order"""
+        with self._lock:
+            self._refresh()
+            return [item_id for item_id in item_ids if item_id not in self._row_of]
+
+    def __contains__(self, item_id: object) -> bool:
+        with self._lock:
+            self._refresh()
+            return item_id in self._row_of
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._row_of)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        exclude: Collection[str] = ()
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to k (id, cosine similarity) pairs closest to the query.
+
+        Small stores are searched exhaustively; larger ones only score the
+        rows of the nearest IVF buckets.
+        """
+        with self._lock:
+            self._refresh()
+            if not self._ids:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+            if self._index is None:
+                candidates = np.arange(len(self._ids))
+            else:
+                candidates = self._index.candidates(query, settings.ANN_NPROBE)
+            candidates = candidates[self._live[candidates]]
+            if not len(candidates):
+                return []
+
+            scores = np.asarray(self._vectors[candidates], dtype=np.float32) @ query
+            top = min(k + len(exclude), len(candidates))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            matches = [
+                (self._ids[candidates[position]], float(scores[position]))
+                for position in best
+            ]
+        return [match for match in matches if match[0] not in exclude][:k]
+
+_store: Optional[EmbeddingStore] = None
+_store_lock = threading.Lock()
+
+def get_embedding_store() -> EmbeddingStore:
+    """Return the process-wide embedding store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore(settings.EMBEDDING_STORE_DIR, settings.EMBEDDING_DIMENSION)
+    return _store
+
+async def index_unembedded_arguments(batch_size: int = 256) -> int:
+    """
+    Background job adding Argument and Claim nodes missing from the store.
+
+    Nodes are paged on their indexed page_key, after keying any written
+    without one, and each page is embedded in one batch. Store file I/O
+    runs off the event loop. Returns the number of nodes indexed.
+    """
+    store = get_embedding_store()
+    indexed = 0
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            await backfill_page_keys(session)
+            for label in PAGED_LABELS:
+                # Nodes with both labels are read as Arguments
+                exclude = "AND NOT n:Argument" if label != "Argument" else ""
+                pages = iter_pages(
+                    session, label, "elementId(n) AS id, coalesce(n.claim, n.text) AS text", exclude,
+                    batch_size=batch_size
+                )
+                async for records in pages:
+                    texts = {r["id"]: r["text"] for r in records if r["text"]}
+                    pending = await asyncio.to_thread(store.missing, list(texts))
+                    if pending:
+                        embeddings, rows = await asyncio.to_thread(
+                            encode_texts, [texts[item_id] for item_id in pending]
+                        )
+                        await asyncio.to_thread(store.add_many, pending, embeddings[rows])
+                        indexed += len(pending)
+    except Exception as e:
+        logger.error(f"Error indexing argument embeddings: {e}")
+    return indexed
@@ -1,59 +1,364 @@
 # rational_onion/services/nlp_service.py
 
 import os
-import spacy
-import requests
-from sentence_transformers import SentenceTransformer, util
-from typing import List, Tuple, Dict
-from collections import Counter
+import asyncio
+import datetime
+import logging
+import threading
+import numpy as np
+from typing import List, Tuple, Dict, Iterable, Iterator, Optional, Sequence, TYPE_CHECKING
+from collections import OrderedDict, deque
 from rational_onion.config import get_settings
+from rational_onion.services.doc_cache import DocCache
+from rational_onion.services.reference_search import search_references
+from rational_onion.services.suggestion_engine import get_suggestion_engine
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-nlp = spacy.load(settings.SPACY_MODEL)
-transformer_model = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
+# Models are loaded on first use (or by warmup_models) rather than at import
+# time, so workers that never touch NLP do not pay for spaCy and torch.
+_model_lock = threading.Lock()
+_nlp_profiles: Dict[str, "Language"] = {}
+_doc_caches: Dict[str, DocCache] = {}
+_transformer_model: Optional["SentenceTransformer"] = None
+_model_status = "not_loaded"
+
+# Normalised sentence embeddings keyed by text, least recently used first
+_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def get_nlp(profile: Optional[str] = None) -> "Language":
+    """
+    Return the spaCy pipeline for a use-case profile, loading it on first use.
+    
+    Profiles are defined in settings.SPACY_PIPELINE_PROFILES and name the
+    components to exclude or disable, so each use case only runs the
+    components it reads.
+    """
+    profile = profile or settings.SPACY_DEFAULT_PROFILE
+    nlp = _nlp_profiles.get(profile)
+    if nlp is None:
+        with _model_lock:
+            nlp = _nlp_profiles.get(profile)
+            if nlp is None:
+                import spacy
+                components = settings.SPACY_PIPELINE_PROFILES[profile]
+                nlp = spacy.load(
+                    settings.SPACY_MODEL,
+                    exclude=components.get("exclude", []),
+                    disable=components.get("disable", [])
+                )
+                _nlp_profiles[profile] = nlp
+    return nlp
+
+def get_doc_cache(profile: Optional[str] = None) -> DocCache:
+    """Return the persisted parse cache for a profile's pipeline"""
+    profile = profile or settings.SPACY_DEFAULT_PROFILE
+    cache = _doc_caches.get(profile)
+    if cache is None:
+        cache = _doc_caches.setdefault(
+            profile, DocCache(os.path.join(settings.DOC_CACHE_DIR, profile), get_nlp(profile))
+        )
+    return cache
+
+def parse_texts(
+    texts: Iterable[str],
+    profile: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None
+) -> Iterator["Doc"]:
+    """
+    Parse texts in input order, reusing persisted parses.
+    
+    Only cache misses go through nlp.pipe, and their parses are stored for
+    later calls. Misses are streamed through one nlp.pipe call until a run
+    of batch_size hits, so hits are never buffered for long and an all-hit
+    input is yielded as it is read.
+    """
+    nlp = get_nlp(profile)
+    batch_size = batch_size or settings.NLP_BATCH_SIZE
+    n_process = n_process or settings.NLP_N_PROCESS
+    if not settings.DOC_CACHE_ENABLED:
+        yield from nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        return
+
+    cache = get_doc_cache(profile)
+    texts = iter(texts)
+    # Cached docs, with None marking texts sent to the parser, in input order
+    pending: "deque[Optional[Doc]]" = deque()
+
+    def misses(first: str) -> Iterator[str]:
+        yield first
+        hits = 0
+        for text in texts:
+            doc = cache.get(text)
+            pending.append(doc)
+            if doc is not None:
+                hits += 1
+                # End the stream at a run of hits so they are not held
+                # back until the next miss
+                if hits >= batch_size:
+                    return
+            else:
+                hits = 0
+                yield text
+
+    while True:
+        # With no parse outstanding, hits are yielded as they are read
+        for text in texts:
+            doc = cache.get(text)
+            if doc is None:
+                pending.append(None)
+                break
+            yield doc
+        else:
+            return
+
+        for doc in nlp.pipe(misses(text), batch_size=batch_size, n_process=n_process):
+            # Each parse belongs to the oldest placeholder; hits before it go first
+            while pending[0] is not None:
+                yield pending.popleft()
+            pending.popleft()
+            try:
+                cache.put(doc)
+            except Exception as e:
+                logger.warning(f"Failed to cache parsed document: {e}")
+            yield doc
+        yield from pending
+        pending.clear()
+
+def get_transformer_model() -> "SentenceTransformer":
+    """Return the sentence transformer, loading it on first use"""
+    global _transformer_model
+    if _transformer_model is None:
+        with _model_lock:
+            if _transformer_model is None:
+                from sentence_transformers import SentenceTransformer
+                _transformer_model = SentenceTransformer(settings.SENTENCE_TRANSFORMER_MODEL)
+    return _transformer_model
+
+def models_ready() -> bool:
+    """Check whether both NLP models are loaded"""
+    return settings.SPACY_DEFAULT_PROFILE in _nlp_profiles and _transformer_model is not None
+
+def model_status() -> str:
+    """Report the NLP model state: not_loaded, loading, ready or failed"""
+    return "ready" if models_ready() else _model_status
+
+def warmup_models() -> None:
+    """Load all NLP models; intended to run in a background thread at startup"""
+    global _model_status
+    _model_status = "loading"
+    try:
+        get_nlp()
+        get_transformer_model()
+        _model_status = "ready"
+        logger.info("NLP models loaded")
+    except Exception as e:
+        _model_status = "failed"
+        logger.error(f"Failed to load NLP models: {e}")
 
 def enhance_argument_with_nlp(text: str) -> List[str]:
     """
     Enhances an argument component using NLP-based reformulation, lexical diversity, etc.
     """
-    doc = nlp(text)
-    suggestions = []
-    token_freq = Counter([token.lemma_ for token in doc if token.is_alpha])
+    return suggestions_for_doc(next(parse_texts([text], settings.SPACY_DEFAULT_PROFILE, n_process=1)))
 
-    for token in doc:
-        if token.pos_ in ["NOUN", "VERB"] and token.dep_ not in ["aux", "det"]:
-            if token_freq[token.lemma_] > 1:
-                suggestions.append(f"Consider using synonyms for '{token.text}' to improve lexical diversity.")
-            else:
-                suggestions.append(f"Ensure '{token.text}' is well-supported by evidence.")
+def suggestions_for_doc(doc: "Doc") -> List[str]:
+    """Derive ranked improvement suggestions from a parsed argument component"""
+    return get_suggestion_engine(doc.vocab).suggest(doc)
+
+def encode_texts(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed texts with the sentence transformer, deduplicating and caching.
+    
+    Returns a matrix of L2-normalised embeddings for the distinct texts and,
+    for every input text, the row holding its embedding. Texts already in
+    the cache are not re-encoded; the rest are encoded in a single batch.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.intp)
+
+    unique_texts = list(dict.fromkeys(texts))
+    vectors: Dict[str, np.ndarray] = {}
+    with _embedding_cache_lock:
+        for text in unique_texts:
+            vector = _embedding_cache.get(text)
+            if vector is not None:
+                _embedding_cache.move_to_end(text)
+                vectors[text] = vector
 
-    if len(doc) < 10:
-        suggestions.append("Consider expanding the argument for better clarity and depth.")
+    missing = [text for text in unique_texts if text not in vectors]
+    if missing:
+        encoded = get_transformer_model().encode(
+            missing,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        with _embedding_cache_lock:
+            for text, vector in zip(missing, encoded):
+                vectors[text] = _embedding_cache[text] = np.asarray(vector, dtype=np.float32)
+            while len(_embedding_cache) > settings.EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    positions = {text: row for row, text in enumerate(unique_texts)}
+    embeddings = np.vstack([vectors[text] for text in unique_texts])
+    return embeddings, np.array([positions[text] for text in texts], dtype=np.intp)
+
+def pairwise_similarities(pairs: Sequence[Tuple[str, str]]) -> List[float]:
+    """
+    Computes the cosine similarity of many (text1, text2) pairs at once.
+    
+    Every distinct text is encoded once and the scores are the row-wise dot
+    products of the normalised embeddings.
+    """
+    if not pairs:
+        return []
+    embeddings, rows = encode_texts([left for left, _ in pairs] + [right for _, right in pairs])
+    left_rows, right_rows = rows[:len(pairs)], rows[len(pairs):]
+    scores = np.einsum("ij,ij->i", embeddings[left_rows], embeddings[right_rows])
+    return scores.tolist()
 
-    return suggestions if suggestions else ["Ensure clarity, logical consistency, and sufficient support for claims."]
+def one_to_many_similarity(query: str, candidates: Sequence[str]) -> List[float]:
+    """
+    Computes the cosine similarity of one text against many candidates.
+    
+    The candidate embeddings are scored with a single matrix-vector product.
+    """
+    if not candidates:
+        return []
+    embeddings, rows = encode_texts([query, *candidates])
+    scores = embeddings[rows[1:]] @ embeddings[rows[0]]
+    return scores.tolist()
 
 def calculate_semantic_similarity(text1: str, text2: str) -> float:
     """
     Computes the cosine similarity between two text embeddings.
     """
-    embedding1 = transformer_model.encode(text1, convert_to_tensor=True)
-    embedding2 = transformer_model.encode(text2, convert_to_tensor=True)
-    return util.pytorch_cos_sim(embedding1, embedding2).item()
+    return pairwise_similarities([(text1, text2)])[0]
+
+# Weights of the lexical, semantic, citation and recency signals in reference ranking
+REFERENCE_RANK_WEIGHTS = np.array([0.3, 0.45, 0.15, 0.1], dtype=np.float32)
 
-async def rank_references_with_embeddings(query: str) -> List[Tuple[str, float, int, str]]:
+def reference_rank_scores(
+    lexical: np.ndarray,
+    semantic: Optional[np.ndarray],
+    citations: np.ndarray,
+    years: np.ndarray,
+    current_year: int
+) -> np.ndarray:
     """
-    Placeholder for reference ranking logic using embeddings, citation count, etc.
-    Returns List of (title, citationCount, year, URL).
+    Blend reference ranking signals into one score per candidate.
+    
+    Lexical scores are scaled by the best candidate, citation counts
+    log-scaled against the most cited one, and the recency prior halves
+    every REFERENCE_RECENCY_HALF_LIFE years (0 for unknown years). Without
+    semantic scores the remaining weights are renormalised.
     """
-    # Here you'd expand your query, fetch references, then rank them
-    # We'll just return a placeholder
-    return [("Placeholder Title", 0.8, 2023, "http://example.com")]
+    signals = np.zeros((len(lexical), len(REFERENCE_RANK_WEIGHTS)), dtype=np.float32)
+    if not len(lexical):
+        return signals[:, 0]
+    
+    if lexical.max() > 0:
+        signals[:, 0] = lexical / lexical.max()
+    if semantic is not None:
+        signals[:, 1] = np.clip(semantic, 0.0, 1.0)
+    log_citations = np.log1p(np.maximum(citations, 0))
+    if log_citations.max() > 0:
+        signals[:, 2] = log_citations / log_citations.max()
+    known = years > 0
+    age = np.maximum(current_year - years[known], 0)
+    signals[known, 3] = np.exp2(-age / settings.REFERENCE_RECENCY_HALF_LIFE)
+    
+    weights = REFERENCE_RANK_WEIGHTS.copy()
+    if semantic is None:
+        weights[1] = 0.0
+    return signals @ weights / weights.sum()
 
-def process_batch(texts: List[str]) -> List[Dict]:
-    """Process a batch of texts with NLP pipeline"""
-    return nlp.pipe(
-        texts,
-        batch_size=settings.NLP_BATCH_SIZE,
-        n_process=-1
-    )
\ No newline at end of file
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+async def rank_references_with_embeddings(
+    query: str,
+    top_k: Optional[int] = None
+) -> List[Tuple[str, float, int, str]]:
+    """
+    Rank stored references for a query.
+    
+    Candidates come from the reference full-text index, are re-ranked by
+    title embedding similarity in one batch and blended with citation and
+    recency priors. Ranking runs within REFERENCE_RANK_BUDGET_MS: if the
+    embedding stage would exceed it, the lexical and prior scores are used
+    alone.
+    
+    Returns List of (title, score, citation count, URL).
+    """
+    # Imported here so loading the NLP service does not configure the driver
+    from rational_onion.services.neo4j_service import driver
+    
+    loop = asyncio.get_running_loop()
+    budget = settings.REFERENCE_RANK_BUDGET_MS / 1000
+    deadline = loop.time() + budget
+    
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            candidates, _ = await asyncio.wait_for(
+                search_references(session, query, 0, settings.REFERENCE_CANDIDATES, include_total=False), budget
+            )
+    except asyncio.TimeoutError:
+        logger.warning("Reference candidate search exceeded the ranking budget")
+        return []
+    if not candidates:
+        return []
+    
+    titles = [candidate["title"] or "" for candidate in candidates]
+    semantic = None
+    remaining = deadline - loop.time()
+    if remaining > 0:
+        try:
+            semantic = np.asarray(await asyncio.wait_for(
+                asyncio.to_thread(one_to_many_similarity, query, titles), remaining
+            ), dtype=np.float32)
+        except asyncio.TimeoutError:
+            logger.warning("Reference re-ranking exceeded the ranking budget; using lexical scores")
+        except Exception as e:
+            logger.error(f"Reference re-ranking failed; using lexical scores: {e}")
+    
+    citations = np.array([candidate["citation_count"] or 0 for candidate in candidates], dtype=np.float32)
+    scores = reference_rank_scores(
+        np.array([candidate["relevance_score"] for candidate in candidates], dtype=np.float32),
+        semantic,
+        citations,
+        np.array([candidate["year"] or 0 for candidate in candidates], dtype=np.float32),
+        datetime.date.today().year
+    )
+    return [
+        (titles[i], round(float(scores[i]), 4), int(citations[i]), candidates[i]["url"] or "")
+        for i in top_k_indices(scores, top_k or settings.REFERENCE_RANK_TOP_K)
+    ]
+
+def process_batch(
+    texts: Iterable[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None
+) -> Iterator[List[str]]:
+    """
+    Stream improvement suggestions for many texts, in input order.
+    
+    Texts are parsed with parse_texts, so previously seen texts skip the
+    parser, and suggestions are yielded one input at a time.
+    """
+    docs = parse_texts(texts, settings.SPACY_DEFAULT_PROFILE, batch_size=batch_size, n_process=n_process)
+    yield from get_suggestion_engine(get_nlp(settings.SPACY_DEFAULT_PROFILE).vocab).suggest_many(docs)
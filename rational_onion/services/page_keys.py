@@ -0,0 +1,105 @@
+# rational_onion/services/page_keys.py
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from neo4j import AsyncSession
+
+from rational_onion.config import get_settings
+from rational_onion.services.neo4j_service import driver
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Labels given a uniquely constrained page_key
+PAGED_LABELS = ("Argument", "Claim")
+
+# Nodes keyed per write transaction by the backfill
+BACKFILL_BATCH_SIZE = 10000
+
+_page_key_constraints_ready = False
+
+async def ensure_page_key_constraints(session: AsyncSession) -> None:
+    """Create the page_key uniqueness constraints (and their indexes), once per process"""
+    global _page_key_constraints_ready
+    if not _page_key_constraints_ready:
+        for label in PAGED_LABELS:
+            result = await session.run(f"""
+                CREATE CONSTRAINT {label.lower()}_page_key IF NOT EXISTS
+                FOR (n:{label}) REQUIRE n.page_key IS UNIQUE
+            """)
+            await result.consume()
+        _page_key_constraints_ready = True
+
+async def backfill_page_keys(session: AsyncSession) -> int:
+    """
+    Key the Argument and Claim nodes written without a page_key.
+
+    Nodes created by this app get a key on insert; this catches the ones
+    written by other tools. It scans both labels, so it runs at startup
+    and at the start of background jobs, never on a request path.
+    Returns the number of nodes keyed.
+    """
+    await ensure_page_key_constraints(session)
+    keyed = 0
+    for label in PAGED_LABELS:
+        result = await session.run(f"""
+            MATCH (n:{label})
+            WHERE n.page_key IS NULL
+            CALL {{
+                WITH n
+                SET n.page_key = randomUUID()
+            }} IN TRANSACTIONS OF {BACKFILL_BATCH_SIZE} ROWS
+        """)
+        summary = await result.consume()
+        keyed += summary.counters.properties_set
+    return keyed
+
+async def iter_pages(
+    session: AsyncSession,
+    label: str,
+    projection: str,
+    condition: str = "",
+    params: Optional[Dict[str, Any]] = None,
+    batch_size: int = 256
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield the nodes n of a label a page at a time, in page_key order.
+
+    Each page is a range scan of the page_key index rather than a scan
+    and sort of the whole label. projection is the RETURN list and
+    condition an extra "AND ..." filter, both over n. Nodes without a
+    page_key are skipped, so callers run backfill_page_keys first.
+    """
+    after = ""
+    while True:
+        result = await session.run(f"""
+            MATCH (n:{label})
+            WHERE n.page_key > $after {condition}
+            RETURN {projection}, n.page_key AS page_key
+            ORDER BY n.page_key
+            LIMIT $limit
+        """, {**(params or {}), "after": after, "limit": batch_size})
+        records = await result.data()
+        if not records:
+            return
+        after = records[-1]["page_key"]
+        yield records
+
+async def _run_backfill() -> None:
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            keyed = await backfill_page_keys(session)
+        logger.info(f"Backfilled page keys of {keyed} nodes")
+    except Exception as e:
+        logger.error(f"Error backfilling page keys: {e}")
+
+_backfill: Optional["asyncio.Task[None]"] = None
+
+def start_page_key_backfill() -> None:
+    """Key nodes written without a page_key in the background, once per process"""
+    global _backfill
+    if _backfill is None:
+        _backfill = asyncio.create_task(_run_backfill())
@@ -0,0 +1,141 @@
+# rational_onion/services/quality_service.py
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from neo4j import AsyncSession
+
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import redis
+from rational_onion.services.nlp_service import pairwise_similarities
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+GRAPH_VERSION_KEY = "graph:version"
+SCORE_CACHE_PREFIX = "quality:scores"
+
+# Feature columns and their weights in the score
+QUALITY_FEATURES: List[str] = [
+    "has_grounds", "has_warrant", "has_rebuttal",
+    "grounds_length", "warrant_length", "references",
+    "coherence", "in_degree", "out_degree"
+]
+QUALITY_WEIGHTS = np.array([0.2, 0.15, 0.05, 0.1, 0.05, 0.15, 0.15, 0.1, 0.05], dtype=np.float32)
+
+# Lengths (characters) and counts at which a feature saturates
+GROUNDS_LENGTH_TARGET = 200
+WARRANT_LENGTH_TARGET = 100
+REFERENCE_SCALE = 2.0
+DEGREE_SCALE = 3.0
+
+def _lengths(texts: Sequence[Any]) -> np.ndarray:
+    return np.fromiter((len((text or "").strip()) for text in texts), dtype=np.float32, count=len(texts))
+
+def quality_features(rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Build the (arguments x features) matrix for quality scoring.
+
+    Each row needs claim, grounds, warrant, rebuttal, reference_count,
+    in_degree and out_degree. Claim–grounds coherence is computed for all
+    rows in one batched embedding call.
+    """
+    features = np.zeros((len(rows), len(QUALITY_FEATURES)), dtype=np.float32)
+    if not rows:
+        return features
+
+    grounds = _lengths([row.get("grounds") for row in rows])
+    warrant = _lengths([row.get("warrant") for row in rows])
+    rebuttal = _lengths([row.get("rebuttal") for row in rows])
+    counts = np.array(
+        [[row.get("reference_count") or 0, row.get("in_degree") or 0, row.get("out_degree") or 0] for row in rows],
+        dtype=np.float32
+    )
+
+    features[:, 0] = grounds > 0
+    features[:, 1] = warrant > 0
+    features[:, 2] = rebuttal > 0
+    features[:, 3] = np.minimum(grounds / GROUNDS_LENGTH_TARGET, 1.0)
+    features[:, 4] = np.minimum(warrant / WARRANT_LENGTH_TARGET, 1.0)
+    features[:, 5] = 1.0 - np.exp(-counts[:, 0] / REFERENCE_SCALE)
+    features[:, 7] = np.tanh(counts[:, 1] / DEGREE_SCALE)
+    features[:, 8] = np.tanh(counts[:, 2] / DEGREE_SCALE)
+
+    coherent = [i for i, row in enumerate(rows) if row.get("claim") and (row.get("grounds") or "").strip()]
+    if coherent:
+        similarities = pairwise_similarities([(rows[i]["claim"], rows[i]["grounds"]) for i in coherent])
+        features[coherent, 6] = np.clip(similarities, 0.0, 1.0)
+    return features
+
+def score_features(features: np.ndarray) -> np.ndarray:
+    """Weighted quality score in [0, 1] for every feature row"""
+    return features @ QUALITY_WEIGHTS / QUALITY_WEIGHTS.sum()
+
+async def get_graph_version() -> int:
+    """Current graph version; bumped by every write that can change a score"""
+    return int(await redis.get(GRAPH_VERSION_KEY) or 0)
+
+async def bump_graph_version() -> None:
+    """Invalidate scores cached for earlier graph versions"""
+    try:
+        await redis.incr(GRAPH_VERSION_KEY)
+    except Exception as e:
+        logger.error(f"Failed to bump graph version: {e}")
+
+async def _fetch_feature_rows(session: AsyncSession, argument_ids: Sequence[str]) -> List[Dict[str, Any]]:
+    """Read the scoring inputs of many arguments in one query"""
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (n)
+        WHERE (n:Argument OR n:Claim) AND elementId(n) = id
+        RETURN id,
+               coalesce(n.claim, n.text) AS claim,
+               coalesce(n.grounds, head([(n)-[:HAS_GROUND]->(g:Ground) | g.text])) AS grounds,
+               n.warrant AS warrant,
+               n.rebuttal AS rebuttal,
+               size([(n)-[:CITES]->(:Reference) | 1]) AS reference_count,
+               size([()-[:SUPPORTS|JUSTIFIES]->(n) | 1]) AS in_degree,
+               size([(n)-[:SUPPORTS|JUSTIFIES]->() | 1]) AS out_degree
+    """, {"ids": list(argument_ids)})
+    return await result.data()
+
+async def score_arguments(session: AsyncSession, argument_ids: Sequence[str]) -> Dict[str, float]:
+    """
+    Return quality scores for the given arguments.
+
+    Scores are cached in Redis per graph version, so only arguments not yet
+    scored since the last graph write are recomputed, in one vectorized
+    pass. Unknown ids are left out.
+    """
+    argument_ids = list(dict.fromkeys(argument_ids))
+    if not argument_ids:
+        return {}
+
+    scores: Dict[str, float] = {}
+    cache_key = None
+    try:
+        cache_key = f"{SCORE_CACHE_PREFIX}:{await get_graph_version()}"
+        cached = await redis.hmget(cache_key, argument_ids)
+        scores = {item_id: float(value) for item_id, value in zip(argument_ids, cached) if value is not None}
+    except Exception as e:
+        logger.warning(f"Quality score cache unavailable: {e}")
+
+    missing = [item_id for item_id in argument_ids if item_id not in scores]
+    if missing:
+        rows = await _fetch_feature_rows(session, missing)
+        if rows:
+            computed = await asyncio.to_thread(lambda: score_features(quality_features(rows)))
+            fresh = {row["id"]: round(float(score), 4) for row, score in zip(rows, computed)}
+            scores.update(fresh)
+            if cache_key:
+                try:
+                    pipe = redis.pipeline()
+                    pipe.hset(cache_key, mapping=fresh)
+                    pipe.expire(cache_key, settings.CACHE_TTL)
+                    await pipe.execute()
+                except Exception as e:
+                    logger.warning(f"Failed to cache quality scores: {e}")
+    return scores
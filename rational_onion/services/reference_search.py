@@ -0,0 +1,92 @@
+# rational_onion/services/reference_search.py
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import AsyncSession
+
+from rational_onion.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Full-text (Lucene, BM25-scored) index over the searchable reference fields.
+# Neo4j updates it in the writing transaction, so every worker sees new
+# references without a rebuild.
+REFERENCE_INDEX = "reference_text"
+
+_reference_index_ready = False
+
+async def ensure_reference_index(session: AsyncSession) -> None:
+    """Create the reference full-text index and wait until it is online, once per process"""
+    global _reference_index_ready
+    if not _reference_index_ready:
+        result = await session.run(f"""
+            CREATE FULLTEXT INDEX {REFERENCE_INDEX} IF NOT EXISTS
+            FOR (r:Reference) ON EACH [r.title, r.author, r.source]
+        """)
+        await result.consume()
+        # Existing references are indexed in the background after creation
+        result = await session.run("CALL db.awaitIndex($name, $timeout)", {
+            "name": REFERENCE_INDEX,
+            "timeout": settings.REFERENCE_INDEX_TIMEOUT
+        })
+        await result.consume()
+        _reference_index_ready = True
+
+def lucene_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a Lucene query matching any of its words.
+
+    Only word tokens are kept, so user input can never inject Lucene
+    syntax; lowercasing also stops AND/OR/NOT acting as operators.
+    """
+    tokens = re.findall(r"\w+", text.lower())
+    return " ".join(tokens) or None
+
+async def search_references(
+    session: AsyncSession,
+    query: str,
+    offset: int = 0,
+    limit: int = 10,
+    include_total: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Return one page of references ranked by BM25 relevance, and the match count.
+
+    Each reference carries its relevance_score, the raw index score, and
+    its citation_count: the stored count when known, otherwise the number
+    of arguments citing it in the graph. Only the page is read and
+    projected; the count is a separate query, skipped (None) without
+    include_total.
+    """
+    terms = lucene_query(query)
+    if terms is None:
+        return [], 0 if include_total else None
+
+    await ensure_reference_index(session)
+    params = {"index": REFERENCE_INDEX, "terms": terms, "offset": offset, "limit": limit}
+    # The index yields hits in descending score order
+    result = await session.run("""
+        CALL db.index.fulltext.queryNodes($index, $terms) YIELD node, score
+        WITH node AS r, score
+        SKIP $offset
+        LIMIT $limit
+        RETURN r {
+            .reference_id, .title, .author, .year, .source, .url,
+            citation_count: coalesce(r.citation_count, size([(r)<-[:CITES]-() | 1])),
+            relevance_score: score
+        } AS reference
+    """, params)
+    references = [record["reference"] async for record in result]
+
+    total = None
+    if include_total:
+        result = await session.run("""
+            CALL db.index.fulltext.queryNodes($index, $terms) YIELD node
+            RETURN count(node) AS total
+        """, params)
+        total = (await result.single())["total"]
+    return references, total
@@ -0,0 +1,410 @@
+# rational_onion/services/reference_service.py
+
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from neo4j import AsyncSession, AsyncManagedTransaction
+
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import (
+    CITATIONS_TAG,
+    REFERENCES_TAG,
+    argument_tag,
+    invalidate_tags,
+    redis
+)
+from rational_onion.services.dedup_service import NearDuplicateIndex, shingles
+from rational_onion.services.neo4j_service import driver
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+DOI_PATTERN = re.compile(r"\b(10\.\d{4,9}/\S+)", re.IGNORECASE)
+
+# Titles are compared on character trigrams
+TITLE_SHINGLE_SIZE = 3
+
+# Query parameters that never identify a resource
+TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "fbclid", "gclid"}
+
+def normalize_doi(value: str) -> Optional[str]:
+    """Extract a DOI from a bare DOI, doi: string or resolver URL, lowercased"""
+    match = DOI_PATTERN.search(value.strip())
+    return match.group(1).rstrip(".,;").lower() if match else None
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: no scheme, fragment or tracking parameters, host without www."""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+    ))
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+def normalize_title(title: str) -> str:
+    """Casefolded title with punctuation dropped and whitespace collapsed"""
+    text = unicodedata.normalize("NFKC", title).casefold()
+    return " ".join(re.findall(r"\w+", text))
+
+def reference_key(
+    title: str,
+    doi: Optional[str] = None,
+    url: Optional[str] = None,
+    year: Optional[int] = None
+) -> str:
+    """
+    Key identifying the work a reference points to.
+
+    The DOI wins, wherever it appears; otherwise the normalized URL, and
+    for references with neither, the normalized title and year.
+    """
+    normalized = reference_doi(doi, url)
+    if normalized:
+        return f"doi:{normalized}"
+    if url and url.strip():
+        return f"url:{normalize_url(url)}"
+    return f"title:{normalize_title(title)}|{year or ''}"
+
+_reference_key_constraint_ready = False
+
+async def ensure_reference_key_constraint(session: AsyncSession) -> None:
+    """Create the uniqueness constraint backing reference merges, once per process"""
+    global _reference_key_constraint_ready
+    if not _reference_key_constraint_ready:
+        result = await session.run("""
+            CREATE CONSTRAINT reference_key_unique IF NOT EXISTS
+            FOR (r:Reference) REQUIRE r.reference_key IS UNIQUE
+        """)
+        await result.consume()
+        _reference_key_constraint_ready = True
+
+async def _merge_references(tx: AsyncManagedTransaction, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    result = await tx.run("""
+        UNWIND $rows AS row
+        MERGE (r:Reference {reference_key: row.reference_key})
+        ON CREATE SET r += row.properties,
+                      r.reference_id = row.reference_id,
+                      r.created_at = datetime()
+        WITH r, row
+        CALL {
+            WITH r, row
+            UNWIND row.argument_ids AS argument_id
+            MATCH (a) WHERE elementId(a) = argument_id
+            MERGE (a)-[:CITES]->(r)
+            ON CREATE SET a.citations_changed_at = datetime()
+            RETURN count(a) AS linked
+        }
+        RETURN row.index AS index,
+               r.reference_id AS reference_id,
+               r.reference_id = row.reference_id AS created,
+               linked
+        ORDER BY index
+    """, {"rows": rows})
+    return await result.data()
+
+async def merge_references(session: AsyncSession, items: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create or reuse references and link them to arguments in one write transaction.
+
+    Each item holds reference_id (used only if the reference is new),
+    title, author, year, source, url, doi and argument_ids, and optionally
+    near_duplicate_of and near_duplicate_similarity to flag it. References are
+    merged on their reference_key, so a work that is already stored is
+    reused and linked rather than duplicated. Returns, per item in order,
+    the reference_id, whether it was created and how many arguments it
+    was linked to.
+    """
+    await ensure_reference_key_constraint(session)
+    rows = [
+        {
+            "index": index,
+            "reference_id": item["reference_id"],
+            "reference_key": reference_key(item["title"], item.get("doi"), item.get("url"), item.get("year")),
+            "properties": {
+                name: item.get(name) for name in (
+                    "title", "author", "year", "source", "url", "doi",
+                    "near_duplicate_of", "near_duplicate_similarity"
+                )
+            },
+            "argument_ids": list(item.get("argument_ids") or [])
+        }
+        for index, item in enumerate(items)
+    ]
+    return await session.execute_write(_merge_references, rows)
+
+async def link_reference(session: AsyncSession, reference_id: str, argument_ids: Sequence[str]) -> int:
+    """Link arguments to a stored reference; returns the number of arguments linked"""
+    result = await session.run("""
+        MATCH (r:Reference {reference_id: $reference_id})
+        UNWIND $argument_ids AS argument_id
+        MATCH (a) WHERE elementId(a) = argument_id
+        MERGE (a)-[:CITES]->(r)
+        ON CREATE SET a.citations_changed_at = datetime()
+        RETURN count(a) AS linked
+    """, {"reference_id": reference_id, "argument_ids": list(argument_ids)})
+    record = await result.single()
+    return record["linked"] if record else 0
+
+async def citing_arguments(session: AsyncSession, node_ids: Sequence[str]) -> List[str]:
+    """The given citing nodes plus the arguments they are grounds or warrants of"""
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (n) WHERE elementId(n) = id
+        OPTIONAL MATCH (owner)-[:HAS_GROUND|HAS_WARRANT]->(n)
+        RETURN collect(DISTINCT id) + collect(DISTINCT elementId(owner)) AS ids
+    """, {"ids": list(node_ids)})
+    record = await result.single()
+    return record["ids"] if record else []
+
+# MinHash LSH over title trigrams. Its estimate only nominates candidates, with
+# a low bar so titles differing by a subtitle survive; exact trigram
+# similarity decides.
+reference_title_index = NearDuplicateIndex(
+    redis,
+    num_perm=settings.MINHASH_NUM_PERM,
+    bands=settings.MINHASH_BANDS,
+    shingle_size=TITLE_SHINGLE_SIZE,
+    threshold=0.3,
+    key_prefix="lsh:references"
+)
+
+SUBTITLE_SEPARATOR = re.compile(r"\s*(?::|\s[-–—]\s)\s*")
+
+# Shorter main titles ("Introduction", "Climate Change 2021") are shared by
+# distinct works, so they only match a subtitled title on the full title
+MIN_MAIN_TITLE_WORDS = 4
+
+def _trigram_similarity(first: str, second: str) -> float:
+    first_grams = shingles(first, TITLE_SHINGLE_SIZE)
+    second_grams = shingles(second, TITLE_SHINGLE_SIZE)
+    union = first_grams | second_grams
+    return len(first_grams & second_grams) / len(union) if union else 0.0
+
+def title_similarity(first: str, second: str) -> float:
+    """
+    Jaccard similarity of two titles' character trigrams, ignoring case and punctuation.
+
+    When only one of the titles has a subtitle, the main titles are also
+    compared, so "A Long Enough Title" and "A Long Enough Title: A Subtitle"
+    match, unless the title without a subtitle has fewer than
+    MIN_MAIN_TITLE_WORDS words.
+    """
+    similarity = _trigram_similarity(first, second)
+    first_parts = SUBTITLE_SEPARATOR.split(first, maxsplit=1)
+    second_parts = SUBTITLE_SEPARATOR.split(second, maxsplit=1)
+    if len(first_parts) != len(second_parts):
+        bare = first if len(first_parts) == 1 else second
+        if len(normalize_title(bare).split()) >= MIN_MAIN_TITLE_WORDS:
+            similarity = max(similarity, _trigram_similarity(first_parts[0], second_parts[0]))
+    return similarity
+
+def reference_doi(doi: Optional[str] = None, url: Optional[str] = None) -> Optional[str]:
+    """The normalized DOI of a reference, from its doi or a resolver url"""
+    for value in (doi, url):
+        normalized = normalize_doi(value) if value else None
+        if normalized:
+            return normalized
+    return None
+
+async def _fetch_titles(session: AsyncSession, reference_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Read the title, year and DOI of many references in one query"""
+    result = await session.run("""
+        UNWIND $ids AS id
+        MATCH (r:Reference {reference_id: id})
+        RETURN r.reference_id AS reference_id, r.title AS title, r.year AS year,
+               r.doi AS doi, r.url AS url
+    """, {"ids": list(reference_ids)})
+    return {
+        record["reference_id"]: {**record, "doi": reference_doi(record["doi"], record["url"])}
+        for record in await result.data()
+    }
+
+def _confirm_duplicates(
+    title: str,
+    year: Optional[int],
+    doi: Optional[str],
+    candidate_ids: Sequence[str],
+    stored: Dict[str, Dict[str, Any]]
+) -> List[Tuple[str, float]]:
+    """
+    Keep the candidates that are still stored, whose year and normalized
+    DOI do not conflict and whose exact title similarity reaches the
+    threshold, most similar first.
+    """
+    matches = []
+    for candidate_id in candidate_ids:
+        candidate = stored.get(candidate_id)
+        if candidate is None:
+            continue
+        if year and candidate["year"] and year != candidate["year"]:
+            continue
+        if doi and candidate["doi"] and doi != candidate["doi"]:
+            continue
+        similarity = title_similarity(title, candidate["title"] or "")
+        if similarity >= settings.REFERENCE_DUPLICATE_THRESHOLD:
+            matches.append((candidate_id, round(similarity, 4)))
+    return sorted(matches, key=lambda match: match[1], reverse=True)
+
+async def find_duplicate_reference(
+    session: AsyncSession,
+    title: str,
+    year: Optional[int] = None,
+    doi: Optional[str] = None,
+    url: Optional[str] = None
+) -> Optional[Tuple[str, float]]:
+    """Return the stored reference most similar to a title, treating an unavailable index as no match"""
+    try:
+        candidates = [candidate_id for candidate_id, _ in await reference_title_index.find(title)]
+    except Exception as e:
+        logger.error(f"Duplicate reference lookup failed: {e}")
+        return None
+    if not candidates:
+        return None
+    matches = _confirm_duplicates(
+        title, year, reference_doi(doi, url), candidates, await _fetch_titles(session, candidates)
+    )
+    return matches[0] if matches else None
+
+async def index_reference_title(reference_id: str, title: str) -> None:
+    """Add a reference title to the duplicate index, logging failures"""
+    try:
+        await reference_title_index.add(reference_id, title)
+    except Exception as e:
+        logger.error(f"Failed to index title of reference {reference_id}: {e}")
+
+def group_duplicates(
+    pairs: Dict[Tuple[str, str], float],
+    direct_only: bool = False
+) -> Dict[str, Tuple[str, float]]:
+    """
+    Group near-duplicate pairs transitively.
+
+    Returns, for every reference that is not its group's smallest
+    reference_id, that canonical id and its best similarity to any
+    group member. With direct_only, only references that are themselves
+    a pair with the canonical one are returned, with that similarity:
+    A ~ B and B ~ C does not make C a duplicate of A.
+    """
+    parent: Dict[str, str] = {}
+
+    def root(item: str) -> str:
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    best: Dict[str, float] = {}
+    for (first, second), similarity in pairs.items():
+        first_root, second_root = root(first), root(second)
+        if first_root != second_root:
+            parent[max(first_root, second_root)] = min(first_root, second_root)
+        for item in (first, second):
+            best[item] = max(best.get(item, 0.0), similarity)
+    groups = {item: root(item) for item in list(parent)}
+    if direct_only:
+        return {
+            item: (canonical, pairs[(canonical, item)])
+            for item, canonical in groups.items()
+            if canonical != item and (canonical, item) in pairs
+        }
+    return {item: (canonical, best[item]) for item, canonical in groups.items() if canonical != item}
+
+async def sweep_duplicate_references(merge: bool = False, batch_size: int = 256) -> int:
+    """
+    Background job finding near-duplicate references, one batch at a time.
+
+    Each batch is added to the title index and looked up against it, and
+    candidate titles are confirmed with one query per batch. Duplicates are
+    grouped and attached to the group's smallest reference_id: flagged
+    with near_duplicate_of, or with merge their citations are moved to it
+    and the duplicate is deleted. Only references matching the canonical
+    one directly are merged. Returns the number of duplicates found.
+    """
+    found = 0
+    cursor = ""
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            while True:
+                result = await session.run("""
+                    MATCH (r:Reference)
+                    WHERE r.reference_id > $cursor
+                    RETURN r.reference_id AS reference_id, r.title AS title, r.year AS year,
+                           r.doi AS doi, r.url AS url
+                    ORDER BY r.reference_id
+                    LIMIT $limit
+                """, {"cursor": cursor, "limit": batch_size})
+                records = await result.data()
+                if not records:
+                    break
+                cursor = records[-1]["reference_id"]
+
+                candidates: Dict[str, List[str]] = {}
+                for record in records:
+                    await reference_title_index.add(record["reference_id"], record["title"] or "")
+                for record in records:
+                    matches = await reference_title_index.find(record["title"] or "")
+                    candidates[record["reference_id"]] = [
+                        candidate_id for candidate_id, _ in matches if candidate_id != record["reference_id"]
+                    ]
+                stored = await _fetch_titles(session, {i for ids in candidates.values() for i in ids})
+
+                pairs: Dict[Tuple[str, str], float] = {}
+                for record in records:
+                    confirmed = _confirm_duplicates(
+                        record["title"] or "", record["year"], reference_doi(record["doi"], record["url"]),
+                        candidates[record["reference_id"]], stored
+                    )
+                    for other_id, similarity in confirmed:
+                        pairs[tuple(sorted((record["reference_id"], other_id)))] = similarity
+                duplicates = [
+                    {"reference_id": reference_id, "canonical": canonical, "similarity": similarity}
+                    for reference_id, (canonical, similarity) in group_duplicates(pairs, merge).items()
+                ]
+                if not duplicates:
+                    continue
+                found += len(duplicates)
+
+                if merge:
+                    result = await session.run("""
+                        UNWIND $duplicates AS duplicate
+                        MATCH (r:Reference {reference_id: duplicate.reference_id})
+                        MATCH (keep:Reference {reference_id: duplicate.canonical})
+                        CALL {
+                            WITH r, keep
+                            MATCH (a)-[c:CITES]->(r)
+                            MERGE (a)-[:CITES]->(keep)
+                            SET a.citations_changed_at = datetime()
+                            DELETE c
+                            RETURN collect(elementId(a)) AS moved
+                        }
+                        DETACH DELETE r
+                        RETURN moved
+                    """, {"duplicates": duplicates})
+                    moved = {argument_id for record in await result.data() for argument_id in record["moved"]}
+                    for duplicate in duplicates:
+                        await reference_title_index.remove(duplicate["reference_id"])
+                    await invalidate_tags(
+                        REFERENCES_TAG, CITATIONS_TAG,
+                        *map(argument_tag, await citing_arguments(session, sorted(moved)))
+                    )
+                else:
+                    result = await session.run("""
+                        UNWIND $duplicates AS duplicate
+                        MATCH (r:Reference {reference_id: duplicate.reference_id})
+                        SET r.near_duplicate_of = duplicate.canonical,
+                            r.near_duplicate_similarity = duplicate.similarity
+                    """, {"duplicates": duplicates})
+                    await result.consume()
+    except Exception as e:
+        logger.error(f"Error sweeping duplicate references: {e}")
+    return found
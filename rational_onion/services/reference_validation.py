@@ -0,0 +1,204 @@
+# rational_onion/services/reference_validation.py
+
+import asyncio
+import datetime
+import json
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from rational_onion.api.errors import ExternalServiceError
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import redis
+from rational_onion.services.reference_service import normalize_doi, reference_key, title_similarity
+from rational_onion.services.scholarly_client import ScholarlyClient, get_scholarly_client
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Bump when the cached lookup format changes so lookups are made again
+VALIDATION_CACHE_PREFIX = "reference:validation:v2"
+
+# Work types that go through peer review
+PEER_REVIEWED_TYPES = {"journal-article", "proceedings-article"}
+
+# Citation count at which the citation component of the score saturates
+CITATION_SATURATION = 1000
+
+# Weights of peer review, citations and metadata agreement in the score
+CREDIBILITY_WEIGHTS = (0.4, 0.4, 0.2)
+
+def validation_key(reference: Dict[str, Any]) -> str:
+    """Reference key a validation is cached under, shared by all spellings of the same work"""
+    return reference_key(reference["title"], reference.get("doi"), reference.get("url"), reference.get("year"))
+
+def check_reference(reference: Dict[str, Any]) -> Dict[str, str]:
+    """Problems with a reference's own fields, by field name"""
+    errors = {}
+    if not reference["title"].strip():
+        errors["title"] = "Title must not be blank"
+    year = reference.get("year")
+    if year is not None and not 1000 <= year <= datetime.date.today().year + 1:
+        errors["year"] = f"Year {year} is out of range"
+    url = reference.get("url")
+    if url and (urlsplit(url).scheme not in ("http", "https") or not urlsplit(url).netloc):
+        errors["url"] = "URL must be an absolute http(s) URL"
+    doi = reference.get("doi")
+    if doi and not normalize_doi(doi):
+        errors["doi"] = "DOI is not recognised"
+    return errors
+
+def credibility_score(peer_reviewed: bool, citation_count: int, metadata_match: float) -> float:
+    """
+    Weighted credibility of a matched work, in [0, 1].
+
+    Citations are log-scaled up to CITATION_SATURATION; metadata_match is
+    the title similarity between the reference and the matched work.
+    """
+    citations = min(1.0, math.log1p(citation_count) / math.log1p(CITATION_SATURATION))
+    peer_weight, citation_weight, metadata_weight = CREDIBILITY_WEIGHTS
+    score = peer_weight * peer_reviewed + citation_weight * citations + metadata_weight * metadata_match
+    return round(score, 4)
+
+def _work_title(work: Dict[str, Any]) -> str:
+    titles = work.get("title") or [""]
+    return titles[0] if isinstance(titles, list) else titles
+
+async def lookup_work(client: ScholarlyClient, reference: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Find the work a reference points to in Crossref.
+
+    References with a DOI are resolved directly; the others are matched
+    by a bibliographic search, keeping the top hit only if its title is
+    similar enough. Returns None when there is no such work.
+
+    Raises:
+        ExternalServiceError: If Crossref cannot be reached
+    """
+    doi = normalize_doi(reference.get("doi") or "") or normalize_doi(reference.get("url") or "")
+    try:
+        if doi:
+            body = await client.get_json(f"{settings.CROSSREF_API_URL}/works/{quote(doi, safe='/')}")
+            return body["message"]
+        body = await client.get_json(
+            f"{settings.CROSSREF_API_URL}/works",
+            {"query.bibliographic": reference["title"], "rows": 1}
+        )
+    except ExternalServiceError as e:
+        if e.details.get("status_code") == 404:
+            return None
+        raise
+    items = body["message"].get("items") or []
+    if items and title_similarity(reference["title"], _work_title(items[0])) >= settings.REFERENCE_DUPLICATE_THRESHOLD:
+        return items[0]
+    return None
+
+def _work_summary(work: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The fields of a Crossref work that scoring uses, as cached"""
+    if work is None:
+        return None
+    return {
+        "title": _work_title(work),
+        "type": work.get("type"),
+        "is-referenced-by-count": int(work.get("is-referenced-by-count") or 0)
+    }
+
+def score_reference(reference: Dict[str, Any], work: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate one reference with valid fields against the work it matched, if any"""
+    if work is None:
+        return {
+            "is_valid": True,
+            "message": "Reference not found in the scholarly index",
+            "validated": False,
+            "credibility_score": 0.0
+        }
+
+    peer_reviewed = work.get("type") in PEER_REVIEWED_TYPES
+    citation_count = int(work.get("is-referenced-by-count") or 0)
+    metadata_match = title_similarity(reference["title"], _work_title(work))
+    return {
+        "is_valid": True,
+        "message": "Reference validated successfully",
+        "validated": True,
+        "credibility_score": credibility_score(peer_reviewed, citation_count, metadata_match),
+        "peer_reviewed": peer_reviewed,
+        "citation_count": citation_count
+    }
+
+async def _lookup(client: ScholarlyClient, reference: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """The matched work's summary and whether the scholarly service answered"""
+    try:
+        return _work_summary(await lookup_work(client, reference)), True
+    except ExternalServiceError as e:
+        logger.warning(f"Reference validation unavailable: {e.message}")
+        return None, False
+
+async def validate_references(
+    references: List[Dict[str, Any]],
+    cache: Any = redis,
+    client: Optional[ScholarlyClient] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Validate many references, reusing cached scholarly lookups.
+
+    Every reference's own fields are checked on every call, and references
+    with invalid fields are not looked up. For the others, the matched work
+    (or its absence) is cached per reference key: cached lookups are read
+    with one MGET and the rest are made concurrently, once per distinct
+    key, then written back with a TTL in one pipeline; expired entries are
+    therefore looked up again on their next request. Lookups that failed
+    are not cached, and an unavailable cache only costs new lookups.
+    Returns the results in request order and how many used a cached lookup.
+    """
+    client = client or get_scholarly_client()
+    keys = [validation_key(reference) for reference in references]
+    errors = [check_reference(reference) for reference in references]
+    valid = {key: reference for key, reference, problems in zip(keys, references, errors) if not problems}
+
+    try:
+        values = await cache.mget([f"{VALIDATION_CACHE_PREFIX}:{key}" for key in valid]) if valid else []
+        cached = dict(zip(valid, values))
+    except Exception as e:
+        logger.warning(f"Reference validation cache unavailable: {e}")
+        cached = {}
+    works = {key: json.loads(value)["work"] for key, value in cached.items() if value}
+
+    pending = [key for key in valid if key not in works]
+    looked_up = await asyncio.gather(*[_lookup(client, valid[key]) for key in pending])
+    fresh = {}
+    unavailable = set()
+    for key, (work, answered) in zip(pending, looked_up):
+        if answered:
+            works[key] = work
+            fresh[key] = json.dumps({"work": work})
+        else:
+            unavailable.add(key)
+
+    if fresh:
+        try:
+            async with cache.pipeline(transaction=False) as pipe:
+                for key, value in fresh.items():
+                    pipe.set(f"{VALIDATION_CACHE_PREFIX}:{key}", value, ex=settings.REFERENCE_VALIDATION_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache reference validations: {e}")
+
+    results = []
+    hits = 0
+    for key, reference, problems in zip(keys, references, errors):
+        if problems:
+            result = {
+                "is_valid": False,
+                "errors": problems,
+                "message": "Reference has invalid fields",
+                "validated": False
+            }
+        elif key in unavailable:
+            result = {"is_valid": True, "message": "Scholarly service unavailable", "validated": None}
+        else:
+            result = score_reference(reference, works[key])
+            hits += key not in pending
+        results.append({**result, "reference_key": key})
+    return results, hits
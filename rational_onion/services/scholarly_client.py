@@ -0,0 +1,169 @@
+# rational_onion/services/scholarly_client.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from rational_onion.api.errors import ExternalServiceError
+from rational_onion.config import get_settings
+from rational_onion.services.caching_service import redis
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+CACHE_PREFIX = "scholarly:response"
+
+# Upstream statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class ScholarlyClient:
+    """
+    Async client for external scholarly APIs.
+
+    All lookups share one pooled httpx client and each upstream host gets at
+    most SCHOLARLY_MAX_PER_HOST requests in flight. Timeouts, connection
+    errors and retryable statuses are retried with jittered exponential
+    backoff, honouring Retry-After. JSON responses are cached in Redis:
+    fresh entries are served directly, stale ones are served while a single
+    background request refreshes them, and concurrent misses for the same
+    request share one upstream call.
+    """
+
+    def __init__(
+        self,
+        cache: Any = redis,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        self.cache = cache
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(settings.SCHOLARLY_TIMEOUT, connect=settings.SCHOLARLY_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.SCHOLARLY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SCHOLARLY_MAX_CONNECTIONS
+            ),
+            headers={"User-Agent": f"rational-onion/{settings.API_VERSION}"},
+            follow_redirects=True
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Key identifying a request in the response cache"""
+        request = json.dumps([url, sorted((params or {}).items())], default=str)
+        return f"{CACHE_PREFIX}:{hashlib.sha256(request.encode('utf-8')).hexdigest()}"
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.SCHOLARLY_MAX_PER_HOST)
+        return self._host_limits[host]
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.SCHOLARLY_MAX_BACKOFF)
+        delay = settings.SCHOLARLY_BACKOFF_BASE * 2 ** attempt
+        return min(delay * random.uniform(0.5, 1.5), settings.SCHOLARLY_MAX_BACKOFF)
+
+    async def _request(self, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        """GET a JSON document, retrying transient failures"""
+        for attempt in range(settings.SCHOLARLY_MAX_RETRIES + 1):
+            last_attempt = attempt == settings.SCHOLARLY_MAX_RETRIES
+            response = None
+            try:
+                # The host slot is released while backing off
+                async with self._host_limit(url):
+                    response = await self._client.get(url, params=params)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise ExternalServiceError(f"Scholarly service unreachable: {e}", {"url": url})
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    if response.is_error:
+                        raise ExternalServiceError(
+                            f"Scholarly service returned {response.status_code}",
+                            {"url": url, "status_code": response.status_code}
+                        )
+                    return response.json()
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    async def _fetch(self, key: str, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        body = await self._request(url, params)
+        try:
+            entry = json.dumps({"fetched_at": time.time(), "body": body})
+            await self.cache.set(key, entry, ex=settings.SCHOLARLY_CACHE_TTL + settings.SCHOLARLY_STALE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache scholarly response: {e}")
+        return body
+
+    def _shared_fetch(self, key: str, url: str, params: Optional[Dict[str, Any]]) -> "asyncio.Task[Any]":
+        """Start a fetch for a key unless one is already running"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, url, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _revalidate(self, key: str, url: str, params: Optional[Dict[str, Any]]) -> None:
+        def log_failure(task: "asyncio.Task[Any]") -> None:
+            if not task.cancelled() and task.exception():
+                logger.warning(f"Failed to refresh stale scholarly response: {task.exception()}")
+        self._shared_fetch(key, url, params).add_done_callback(log_failure)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Return the JSON body of a GET request, from cache when possible.
+
+        Raises:
+            ExternalServiceError: If the upstream call fails and nothing is cached
+        """
+        key = self.cache_key(url, params)
+        try:
+            cached = await self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Scholarly response cache unavailable: {e}")
+            cached = None
+
+        if cached:
+            entry = json.loads(cached)
+            age = time.time() - entry["fetched_at"]
+            if age >= settings.SCHOLARLY_CACHE_TTL:
+                self._revalidate(key, url, params)
+            return entry["body"]
+
+        # Shielded so one caller's cancellation does not fail the others
+        return await asyncio.shield(self._shared_fetch(key, url, params))
+
+    async def close(self) -> None:
+        """Cancel background refreshes and close pooled connections"""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        await self._client.aclose()
+
+_client: Optional[ScholarlyClient] = None
+
+def get_scholarly_client() -> ScholarlyClient:
+    """Return the process-wide scholarly client"""
+    global _client
+    if _client is None:
+        _client = ScholarlyClient()
+    return _client
+
+async def close_scholarly_client() -> None:
+    """Close the process-wide scholarly client, if it was created"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
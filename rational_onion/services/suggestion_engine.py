@@ -0,0 +1,190 @@
+# rational_onion/services/suggestion_engine.py
+
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from rational_onion.config import get_settings
+from rational_onion.services.corpus_stats import CorpusStats, get_corpus_stats
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Span
+    from spacy.vocab import Vocab
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Bump whenever rules, messages or weights change, so stored analyses and
+# cached results are recomputed
+RULES_VERSION = "2"
+
+FALLBACK_SUGGESTION = "Ensure clarity, logical consistency, and sufficient support for claims."
+SHORT_TEXT_SUGGESTION = "Consider expanding the argument for better clarity and depth."
+SHORT_TEXT_TOKENS = 10
+SHORT_TEXT_WEIGHT = 0.6
+
+CAUSAL_VERBS = ["cause", "lead", "result", "drive", "trigger", "increase", "reduce", "prevent"]
+
+# Token rules: (rule id, weight, message template, Matcher patterns).
+# Higher weights rank first; {text} is the matched span.
+TOKEN_RULES: List[Tuple[str, float, str, List[List[Dict]]]] = [
+    ("HEDGE", 0.9,
+     "Hedged wording '{text}' weakens the claim; state it precisely or qualify it with evidence.",
+     [[{"LOWER": {"IN": ["might", "may", "possibly", "perhaps", "probably", "arguably"]}}]]),
+    ("ABSOLUTE", 0.85,
+     "Absolute term '{text}' invites counterexamples; consider qualifying it.",
+     [[{"LOWER": {"IN": ["always", "never", "every", "everyone", "nobody", "everything", "nothing"]}}]]),
+    ("VAGUE_QUANTIFIER", 0.8,
+     "Quantify '{text}' with concrete figures.",
+     [[{"LOWER": {"IN": ["many", "several", "most", "often", "significantly", "substantially"]}}],
+      [{"LOWER": "a"}, {"LOWER": "lot"}]]),
+    ("CONTENT_TERM", 0.3,
+     "Ensure '{text}' is well-supported by evidence.",
+     [[{"POS": {"IN": ["NOUN", "VERB"]}, "DEP": {"NOT_IN": ["aux", "det"]}}]]),
+]
+
+# Content terms whose lemma recurs get this suggestion instead, once the
+# corpus shows the lemma is commonplace rather than specific to the topic
+REPEATED_TERM_WEIGHT = 0.5
+REPEATED_TERM_MESSAGE = "Consider using synonyms for '{text}' to improve lexical diversity."
+
+# Dependency rules: (rule id, weight, message template, anchor node, patterns).
+# {text} is the anchor token.
+DEPENDENCY_RULES: List[Tuple[str, float, str, str, List[List[Dict]]]] = [
+    ("CAUSAL_CLAIM", 0.95,
+     "Support the causal link expressed by '{text}' with evidence or a mechanism.",
+     "verb",
+     [[{"RIGHT_ID": "verb", "RIGHT_ATTRS": {"LEMMA": {"IN": CAUSAL_VERBS}, "POS": "VERB"}},
+       {"LEFT_ID": "verb", "REL_OP": ">", "RIGHT_ID": "subject",
+        "RIGHT_ATTRS": {"DEP": {"IN": ["nsubj", "nsubjpass"]}}}]]),
+]
+
+class SuggestionEngine:
+    """
+    Improvement-suggestion rules compiled once into spaCy matchers.
+
+    Matches are grouped by rule and lemma so repeated terms yield one
+    suggestion, ranked by rule weight and frequency, and cut to top_k.
+    With corpus statistics, content terms are weighted by IDF so terms
+    specific to the argument rank first.
+    """
+
+    def __init__(self, vocab: "Vocab", top_k: int, corpus_stats: Optional[CorpusStats] = None) -> None:
+        from spacy.matcher import DependencyMatcher, Matcher
+        self.vocab = vocab
+        self.top_k = top_k
+        self.corpus_stats = corpus_stats
+        self._rules: Dict[str, Tuple[float, str]] = {}
+        self._anchors: Dict[str, str] = {}
+
+        self._matcher = Matcher(vocab)
+        for rule_id, weight, message, patterns in TOKEN_RULES:
+            self._matcher.add(rule_id, patterns)
+            self._rules[rule_id] = (weight, message)
+
+        self._dependency_matcher = DependencyMatcher(vocab)
+        self._dependency_nodes: Dict[str, List[str]] = {}
+        for rule_id, weight, message, anchor, patterns in DEPENDENCY_RULES:
+            self._dependency_matcher.add(rule_id, patterns)
+            self._rules[rule_id] = (weight, message)
+            self._anchors[rule_id] = anchor
+            self._dependency_nodes[rule_id] = [node["RIGHT_ID"] for node in patterns[0]]
+
+    def suggest(self, doc: "Doc") -> List[str]:
+        """Return the ranked, deduplicated suggestions for one parsed text"""
+        from spacy.attrs import LEMMA
+        lemma_counts = doc.count_by(LEMMA)
+        # (rule id, lemma) -> [weight, occurrences, first position, message]
+        found: Dict[Tuple[str, str], List] = {}
+
+        def record(rule_id: str, weight: float, message: str, span: "Span") -> None:
+            key = (rule_id, span.lemma_.lower())
+            if key in found:
+                found[key][1] += 1
+            else:
+                found[key] = [weight, 1, span.start, message.format(text=span.text)]
+
+        content_terms = []
+        for match_id, start, end in self._matcher(doc):
+            rule_id = self.vocab.strings[match_id]
+            if rule_id == "CONTENT_TERM":
+                content_terms.append(doc[start:end])
+            else:
+                record(rule_id, *self._rules[rule_id], doc[start:end])
+        self._record_content_terms(content_terms, lemma_counts, record)
+
+        if doc.has_annotation("DEP"):
+            for match_id, token_ids in self._dependency_matcher(doc):
+                rule_id = self.vocab.strings[match_id]
+                anchor = token_ids[self._dependency_nodes[rule_id].index(self._anchors[rule_id])]
+                record(rule_id, *self._rules[rule_id], doc[anchor:anchor + 1])
+
+        if len(doc) < SHORT_TEXT_TOKENS:
+            found[("SHORT_TEXT", "")] = [SHORT_TEXT_WEIGHT, 1, len(doc), SHORT_TEXT_SUGGESTION]
+
+        # Recurring findings rank slightly higher within a rule's weight
+        ranked = sorted(found.values(), key=lambda entry: (-entry[0] * (1 + 0.1 * (entry[1] - 1)), entry[2]))
+        return [entry[3] for entry in ranked[:self.top_k]] or [FALLBACK_SUGGESTION]
+
+    def _record_content_terms(
+        self,
+        spans: List["Span"],
+        lemma_counts: Dict[int, int],
+        record: Callable[[str, float, str, "Span"], None]
+    ) -> None:
+        """Record content terms, using corpus IDF when enough documents are counted"""
+        weight, message = self._rules["CONTENT_TERM"]
+        corpus = self._specificity([span.lemma_.lower() for span in spans])
+        for position, span in enumerate(spans):
+            repeated = lemma_counts.get(span[0].lemma, 0) > 1
+            if corpus is None:
+                # No usable corpus statistics, so judge the text on its own
+                if repeated:
+                    record("REPEATED_TERM", REPEATED_TERM_WEIGHT, REPEATED_TERM_MESSAGE, span)
+                else:
+                    record("CONTENT_TERM", weight, message, span)
+            elif repeated and corpus[0][position] <= corpus[1]:
+                record("REPEATED_TERM", REPEATED_TERM_WEIGHT, REPEATED_TERM_MESSAGE, span)
+            else:
+                record("CONTENT_TERM", weight * float(corpus[0][position]), message, span)
+
+    def _specificity(self, lemmas: Sequence[str]) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        IDF of each lemma scaled to [0, 1], with the value at or below which
+        a lemma counts as commonplace; None without enough corpus data.
+        """
+        if self.corpus_stats is None or not lemmas:
+            return None
+        try:
+            frequencies, total = self.corpus_stats.document_frequencies(lemmas)
+        except Exception as e:
+            logger.warning(f"Corpus statistics unavailable: {e}")
+            return None
+        if total < settings.CORPUS_MIN_DOCUMENTS:
+            return None
+        scale = np.log(total + 1)
+        common = float(np.log((total + 1) / (settings.COMMON_TERM_DOC_FRACTION * total + 1)) / scale)
+        frequencies = np.minimum(frequencies, total)
+        return np.log((total + 1) / (frequencies + 1)) / scale, common
+
+    def suggest_many(self, docs: Iterable["Doc"]) -> Iterator[List[str]]:
+        """Return suggestions for a stream of parsed texts, in order"""
+        for doc in docs:
+            yield self.suggest(doc)
+
+_engines: Dict[int, SuggestionEngine] = {}
+_engines_lock = threading.Lock()
+
+def get_suggestion_engine(vocab: "Vocab") -> SuggestionEngine:
+    """Return the engine compiled for a pipeline's vocab, compiling it on first use"""
+    engine: Optional[SuggestionEngine] = _engines.get(id(vocab))
+    if engine is None or engine.vocab is not vocab:
+        with _engines_lock:
+            engine = _engines.get(id(vocab))
+            if engine is None or engine.vocab is not vocab:
+                engine = SuggestionEngine(vocab, settings.SUGGESTION_TOP_K, get_corpus_stats())
+                _engines[id(vocab)] = engine
+    return engine
@@ -11,6 +11,7 @@ from fastapi.testclient import TestClient
 import os
 from neo4j.addressing import Address  # Use public API
 from rational_onion.api.main import app
+from rational_onion.services import caching_service
 import warnings
 
 # Configure logging
@@ -158,6 +159,9 @@ def configure_test_env() -> None:
     
     # Override app settings with test settings
     app.state.settings = test_settings
+    
+    # Tests write the graph directly, bypassing response cache invalidation
+    caching_service.caching_enabled = False
 
 @pytest.fixture(autouse=True)
 async def cleanup_test_data(neo4j_test_session: AsyncSession) -> AsyncGenerator[None, None]:
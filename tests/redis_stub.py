@@ -0,0 +1,162 @@
+# tests/redis_stub.py
+
+import asyncio
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+class InMemoryRedis:
+    """
+    Async in-memory stand-in for the Redis commands the services use.
+
+    Strings, sets and hashes are plain dicts so tests can inspect and
+    seed them. calls counts every command by name; round_trips counts
+    direct commands and pipeline executions, like the network would.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.ttls: Dict[str, Optional[int]] = {}
+        self.sets: Dict[str, Set[str]] = defaultdict(set)
+        self.hashes: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self.subscribers: Dict[str, List["asyncio.Queue[Dict[str, Any]]"]] = defaultdict(list)
+        self.calls: Counter = Counter()
+        self.round_trips = 0
+        self._pipelined = False
+
+    def _command(self, name: str) -> None:
+        self.calls[name] += 1
+        if not self._pipelined:
+            self.round_trips += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        self._command("get")
+        return self.values.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        self._command("mget")
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        self._command("set")
+        self.values[key] = value
+        self.ttls[key] = ex
+        return True
+
+    async def incr(self, key: str) -> int:
+        self._command("incr")
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self._command("expire")
+        self.ttls[key] = seconds
+        return True
+
+    async def smembers(self, key: str) -> Set[str]:
+        self._command("smembers")
+        return set(self.sets.get(key, set()))
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self._command("sadd")
+        added = set(members) - self.sets[key]
+        self.sets[key].update(members)
+        return len(added)
+
+    async def srem(self, key: str, *members: str) -> int:
+        self._command("srem")
+        removed = set(members) & self.sets[key]
+        self.sets[key].difference_update(members)
+        return len(removed)
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        self._command("hget")
+        return self.hashes.get(key, {}).get(field)
+
+    async def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        self._command("hmget")
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    async def hset(
+        self,
+        key: str,
+        field: Optional[str] = None,
+        value: Optional[Any] = None,
+        mapping: Optional[Dict[str, Any]] = None
+    ) -> int:
+        self._command("hset")
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        new = len(set(items) - set(self.hashes[key]))
+        self.hashes[key].update({name: str(item) for name, item in items.items()})
+        return new
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        self._command("hdel")
+        return sum(self.hashes[key].pop(field, None) is not None for field in fields)
+
+    async def publish(self, channel: str, data: str) -> int:
+        self._command("publish")
+        for queue in self.subscribers[channel]:
+            queue.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(self.subscribers[channel])
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+    def pubsub(self) -> "InMemoryPubSub":
+        return InMemoryPubSub(self)
+
+class InMemoryPipeline:
+    """Queues commands until execute(), like a Redis pipeline"""
+
+    def __init__(self, redis: InMemoryRedis) -> None:
+        self.redis = redis
+        self.commands: List[Any] = []
+
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        command = getattr(self.redis, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "InMemoryPipeline":
+            self.commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self.redis.round_trips += 1
+        commands, self.commands = self.commands, []
+        self.redis._pipelined = True
+        try:
+            return [await command(*args, **kwargs) for command, args, kwargs in commands]
+        finally:
+            self.redis._pipelined = False
+
+class InMemoryPubSub:
+    """Subscription delivering what InMemoryRedis publishes"""
+
+    def __init__(self, redis: InMemoryRedis) -> None:
+        self.redis = redis
+        self.channels: List[str] = []
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.redis.subscribers[channel].append(self.queue)
+            self.channels.append(channel)
+            self.queue.put_nowait({"type": "subscribe", "channel": channel, "data": len(self.channels)})
+
+    async def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            yield await self.queue.get()
+
+    async def close(self) -> None:
+        for channel in self.channels:
+            if self.queue in self.redis.subscribers[channel]:
+                self.redis.subscribers[channel].remove(self.queue)
+        self.channels = []
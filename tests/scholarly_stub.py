@@ -0,0 +1,52 @@
+# tests/scholarly_stub.py
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict
+
+import httpx
+from fastapi import FastAPI, Response
+
+STUB_BASE_URL = "http://scholarly.test"
+
+class ScholarlyStub:
+    """
+    Local stand-in for an external scholarly API.
+
+    Serve it to a client through transport() so tests never leave the
+    process. Hits are counted per path, failures can be injected per path
+    and the peak number of concurrent requests is recorded.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.hits: Counter = Counter()
+        self.failures: Dict[str, int] = {}
+        self.failure_status = 503
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.app = FastAPI()
+        self.app.add_api_route("/works/{doi:path}", self.work)
+
+    async def work(self, doi: str, response: Response) -> Dict[str, Any]:
+        path = f"/works/{doi}"
+        self.hits[path] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if doi.startswith("missing"):
+            response.status_code = 404
+            return {"status": "not found"}
+        if self.failures.get(path, 0) > 0:
+            self.failures[path] -= 1
+            response.status_code = self.failure_status
+            response.headers["Retry-After"] = "0"
+            return {"status": "unavailable"}
+        return {"doi": doi, "title": f"Work {doi}", "citation_count": 42, "version": self.hits[path]}
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return httpx.ASGITransport(app=self.app)
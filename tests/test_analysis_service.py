@@ -0,0 +1,129 @@
+# tests/test_analysis_service.py
+
+import pytest
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+from unittest.mock import MagicMock
+
+from rational_onion.services import analysis_service, nlp_service
+from rational_onion.services.analysis_service import (
+    ARGUMENT_COMPONENTS,
+    analyse_components,
+    analysis_model_version,
+    analysis_text_hash,
+    find_missing_components,
+    is_analysis_current,
+    precompute_argument_analysis
+)
+
+ARGUMENT: Dict[str, Optional[str]] = {
+    "claim": "Renewable energy is more sustainable than fossil fuels.",
+    "grounds": "Solar and wind energy do not deplete natural resources.",
+    "warrant": "Sustainability means meeting present needs without compromising future generations.",
+    "rebuttal": None
+}
+
+class FakeResult:
+    def __init__(self, record: Optional[Dict[str, Any]] = None, properties_set: int = 0) -> None:
+        self.record = record
+        self.properties_set = properties_set
+
+    async def single(self) -> Optional[Dict[str, Any]]:
+        return self.record
+
+    async def consume(self) -> Any:
+        return SimpleNamespace(counters=SimpleNamespace(properties_set=self.properties_set))
+
+class FakeSession:
+    """An argument node whose text can be edited between the read and the write"""
+
+    def __init__(self, node: Dict[str, Optional[str]]) -> None:
+        self.node = dict(node)
+        self.writes = 0
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    async def run(self, query: str, params: Dict[str, Any]) -> FakeResult:
+        if "SET" not in query:
+            return FakeResult(dict(self.node))
+        if params["texts"] != [self.node.get(name) or "" for name in ARGUMENT_COMPONENTS]:
+            return FakeResult()
+        self.writes += 1
+        self.node.update(params["analysis"])
+        return FakeResult(properties_set=len(params["analysis"]) + 1)
+
+class TestAnalysisService:
+    """Test suite for write-time argument analysis helpers"""
+
+    def test_text_hash_tracks_component_changes(self) -> None:
+        """Test that the hash changes with any component text"""
+        original = analysis_text_hash(ARGUMENT)
+        assert analysis_text_hash(dict(ARGUMENT)) == original
+        assert analysis_text_hash({**ARGUMENT, "warrant": "Changed warrant"}) != original
+        assert analysis_text_hash({**ARGUMENT, "rebuttal": "New rebuttal"}) != original
+
+    def test_find_missing_components(self) -> None:
+        """Test detection of blank or absent grounds and warrant"""
+        assert find_missing_components(ARGUMENT) == []
+        assert find_missing_components({"claim": "Claim", "grounds": "  "}) == ["ground", "warrant"]
+
+    def test_is_analysis_current(self) -> None:
+        """Test that stored analyses are only reused for the same text and models"""
+        node = {
+            **ARGUMENT,
+            "analysis_suggestions": ["Ensure 'energy' is well-supported by evidence."],
+            "analysis_components": "{}",
+            "analysis_hash": analysis_text_hash(ARGUMENT),
+            "analysis_model_version": analysis_model_version()
+        }
+        assert is_analysis_current(node)
+        assert not is_analysis_current({**node, "claim": "Edited claim"})
+        assert not is_analysis_current({**node, "analysis_model_version": "outdated"})
+        assert not is_analysis_current({**node, "analysis_suggestions": None})
+        assert not is_analysis_current({**node, "analysis_components": None})
+
+    def test_analyse_components_single_pass(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that all component texts are analysed in one batch and mapped back"""
+        calls: List[List[str]] = []
+
+        def fake_process_batch(texts: Iterable[str]) -> List[List[str]]:
+            texts = list(texts)
+            calls.append(texts)
+            return [[f"suggestion for {text}"] for text in texts]
+
+        monkeypatch.setattr(nlp_service, "process_batch", fake_process_batch)
+        results = analyse_components([ARGUMENT, {"claim": "Second claim", "grounds": "  "}])
+
+        assert len(calls) == 1
+        assert len(calls[0]) == 4
+        assert set(results[0]) == {"claim", "grounds", "warrant"}
+        assert results[0]["warrant"] == [f"suggestion for {ARGUMENT['warrant']}"]
+        assert results[1] == {"claim": ["suggestion for Second claim"]}
+
+    @pytest.mark.parametrize("edited, written", [(False, True), (True, False)])
+    async def test_precompute_writes_only_unchanged_text(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        edited: bool,
+        written: bool
+    ) -> None:
+        """Test that an analysis of text edited since it was read is discarded, embedding included"""
+        session = FakeSession(ARGUMENT)
+        store = MagicMock()
+
+        def fake_analysis(node: Dict[str, Any]) -> Dict[str, Any]:
+            if edited:
+                session.node["claim"] = "An edited claim"
+            return {"analysis_hash": analysis_text_hash(node), "analysis_embedding": [0.1, 0.2]}
+
+        monkeypatch.setattr(analysis_service, "driver", SimpleNamespace(session=lambda **kwargs: session))
+        monkeypatch.setattr(analysis_service, "compute_argument_analysis", fake_analysis)
+        monkeypatch.setattr(analysis_service, "get_embedding_store", lambda: store)
+        await precompute_argument_analysis("argument-1")
+
+        assert session.writes == int(written)
+        assert store.add.called is written
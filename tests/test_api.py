@@ -6,6 +6,7 @@ from rational_onion.api.main import app
 from rational_onion.config import get_test_settings, get_settings
 from typing import Dict, Any
 from fastapi import Request
+from unittest.mock import patch
 
 settings = get_test_settings()
 
@@ -121,4 +122,24 @@ async def test_api_database_connection(neo4j_test_session: Any, valid_api_key: s
     record = await result.single()
     assert record["n"] == 1
 
+@pytest.mark.parametrize("nlp_status, warmup, status_code", [
+    ("loading", True, 503),
+    ("failed", True, 503),
+    ("ready", True, 200),
+    ("not_loaded", False, 200)
+])
+def test_readiness_probe(
+    test_client: TestClient,
+    nlp_status: str,
+    warmup: bool,
+    status_code: int
+) -> None:
+    """Test that readiness waits for the NLP models only when they are warmed up at startup"""
+    from rational_onion.api import main
+    with patch.object(main, "model_status", return_value=nlp_status), \
+            patch.object(main.settings, "NLP_WARMUP_ON_STARTUP", warmup):
+        response = test_client.get("/health/ready")
+    assert response.status_code == status_code
+    assert response.json() == {"ready": status_code == 200, "components": {"nlp": nlp_status}}
+
 # ... rest of tests using test_client fixture
\ No newline at end of file
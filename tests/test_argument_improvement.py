@@ -129,7 +129,140 @@ class TestArgumentImprovement:
             suggestion = data["improvement_suggestions"][0]
             assert suggestion["claim"] == "Climate change is primarily caused by human activities."
             assert len(suggestion["improvement_suggestions"]) == 2
-    
+
+    @pytest.mark.asyncio
+    async def test_suggest_improvements_all_components(
+        self,
+        test_client: TestClient,
+        neo4j_test_session: AsyncSession,
+        valid_api_key: str
+    ) -> None:
+        """Test that grounds, warrant and rebuttal are analysed alongside the claim"""
+        result = await neo4j_test_session.run("""
+            CREATE (a:Argument {
+                claim: 'Public transit reduces urban congestion.',
+                grounds: 'Cities with dense transit networks report shorter commute times.',
+                warrant: 'Shorter commutes indicate less congestion.',
+                rebuttal: 'Some cities may always have congestion regardless of transit.'
+            })
+            RETURN elementId(a) AS id
+        """)
+        record = await result.single()
+
+        response = test_client.get(
+            f"/suggest-improvements?argument_id={record['id']}",
+            headers={"X-API-Key": valid_api_key}
+        )
+
+        assert response.status_code == 200
+        suggestion = response.json()["improvement_suggestions"][0]
+        components = suggestion["component_suggestions"]
+        assert set(components) == {"claim", "grounds", "warrant", "rebuttal"}
+        for suggestions in components.values():
+            assert isinstance(suggestions, list)
+            assert len(suggestions) > 0
+        assert suggestion["missing_components"] == []
+
+    def test_suggest_improvements_pagination(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test that cursor pages cover every claim exactly once"""
+        claims = []
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = test_client.get(
+                "/suggest-improvements",
+                headers={"X-API-Key": valid_api_key},
+                params=params
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["improvement_suggestions"]) <= 2
+            claims.extend(entry["claim"] for entry in data["improvement_suggestions"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert cursor is None
+        assert sorted(claims) == sorted([
+            "Climate change is primarily caused by human activities.",
+            "Renewable energy is more sustainable than fossil fuels.",
+            "Electric vehicles reduce carbon emissions."
+        ])
+
+    @pytest.mark.asyncio
+    async def test_suggest_improvements_pagination_is_read_only(
+        self,
+        test_client: TestClient,
+        valid_api_key: str,
+        neo4j_test_session: AsyncSession
+    ) -> None:
+        """Test that claims written without a page_key are paged without being keyed"""
+        response = test_client.get(
+            "/suggest-improvements",
+            headers={"X-API-Key": valid_api_key},
+            params={"limit": 2}
+        )
+        assert response.status_code == 200
+        assert response.json()["next_cursor"].startswith("Claim-unkeyed:")
+
+        result = await neo4j_test_session.run("MATCH (c:Claim) WHERE c.page_key IS NOT NULL RETURN count(c) AS keyed")
+        assert (await result.single())["keyed"] == 0
+
+    def test_suggest_improvements_invalid_cursor(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test that cursors not issued by the endpoint are rejected"""
+        for cursor in ("4:abc:12", "Claim:", "Ground:0b3e"):
+            response = test_client.get(
+                "/suggest-improvements",
+                headers={"X-API-Key": valid_api_key},
+                params={"limit": 2, "cursor": cursor}
+            )
+            assert response.status_code == 422
+
+    def test_suggestion_cache_tags(self) -> None:
+        """Test that single-argument suggestions depend on their argument's tag only"""
+        from fastapi import Request
+        from rational_onion.api.argument_improvement import suggestion_tags
+        from rational_onion.services.caching_service import ARGUMENTS_TAG, CITATIONS_TAG, argument_tag
+
+        def request(query: bytes) -> Request:
+            return Request({
+                "type": "http",
+                "method": "GET",
+                "path": "/suggest-improvements",
+                "query_string": query,
+                "headers": []
+            })
+
+        assert suggestion_tags(request(b"argument_id=4:abc:12")) == [argument_tag("4:abc:12")]
+        assert suggestion_tags(request(b"limit=2")) == [ARGUMENTS_TAG, CITATIONS_TAG]
+
+    def test_suggest_improvements_stream(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test streamed whole-graph suggestions emit one line per claim"""
+        response = test_client.get(
+            "/suggest-improvements",
+            headers={"X-API-Key": valid_api_key},
+            params={"stream": "true", "limit": 2}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = [json.loads(line) for line in response.text.splitlines() if line]
+        assert len(results) == 3
+        assert len({result["argument_id"] for result in results}) == 3
+        for result in results:
+            assert len(result["improvement_suggestions"]) > 0
+
+    def test_suggest_improvements_invalid_page_size(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test that non-positive page sizes are rejected"""
+        response = test_client.get(
+            "/suggest-improvements",
+            headers={"X-API-Key": valid_api_key},
+            params={"limit": 0}
+        )
+        assert response.status_code == 422
+
     @pytest.mark.asyncio
     async def test_suggest_improvements_invalid_argument_id(
         self,
@@ -231,4 +364,49 @@ class TestArgumentImprovement:
         # Verify response structure
         assert "quality_score" in data
         assert "improvement_suggestions" in data
-        assert isinstance(data["improvement_suggestions"], list) 
\ No newline at end of file
+        assert isinstance(data["improvement_suggestions"], list)
+
+    def test_analyze_batch(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test streamed batch analysis returns one result per text in order"""
+        texts = [
+            "Climate change is a serious issue.",
+            "Renewable energy is more sustainable than fossil fuels.",
+            "Electric vehicles reduce carbon emissions."
+        ]
+        response = test_client.post(
+            "/analyze-batch",
+            headers={"X-API-Key": valid_api_key},
+            json={"texts": texts, "batch_size": 2}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = [json.loads(line) for line in response.text.splitlines() if line]
+        assert [result["index"] for result in results] == [0, 1, 2]
+        for result in results:
+            assert isinstance(result["improvement_suggestions"], list)
+            assert len(result["improvement_suggestions"]) > 0
+    
+    def test_analyze_batch_validation(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test batch analysis rejects empty input and invalid tuning"""
+        response = test_client.post(
+            "/analyze-batch",
+            headers={"X-API-Key": valid_api_key},
+            json={"texts": []}
+        )
+        assert response.status_code == 422
+        
+        response = test_client.post(
+            "/analyze-batch",
+            headers={"X-API-Key": valid_api_key},
+            json={"texts": ["Claim"], "n_process": 0}
+        )
+        assert response.status_code == 422
+        
+        for n_process in (-1, settings.NLP_N_PROCESS + 1 if settings.NLP_N_PROCESS > 0 else 10 ** 6):
+            response = test_client.post(
+                "/analyze-batch",
+                headers={"X-API-Key": valid_api_key},
+                json={"texts": ["Claim"], "n_process": n_process}
+            )
+            assert response.status_code == 422
@@ -7,6 +7,7 @@ from rational_onion.config import get_test_settings
 from neo4j import AsyncDriver, AsyncSession
 from typing import AsyncGenerator, Dict, Any, List
 import logging
+from unittest.mock import AsyncMock, patch
 
 settings = get_test_settings()
 
@@ -73,6 +74,85 @@ class TestArgumentProcessing:
         data = response.json()
         assert "argument_id" in data
 
+    @pytest.mark.asyncio(scope="function")
+    async def test_insert_near_duplicate_argument(
+        self,
+        test_client: TestClient,
+        valid_api_key: str
+    ) -> None:
+        """Test near-duplicate handling modes on insert"""
+        original = {
+            "claim": "Offshore wind farms are cheaper to run than coal plants over their lifetime",
+            "grounds": "Test grounds",
+            "warrant": "Test warrant"
+        }
+        reworded = dict(original, claim="Offshore wind farms are cheaper to run than coal plants over their full lifetime.")
+
+        first = test_client.post("/insert-argument", headers={"X-API-Key": valid_api_key}, json=original)
+        assert first.status_code == 200
+        original_id = first.json()["argument_id"]
+
+        existing = test_client.post(
+            "/insert-argument?on_duplicate=return_existing",
+            headers={"X-API-Key": valid_api_key},
+            json=reworded
+        )
+        assert existing.status_code == 200
+        data = existing.json()
+        assert data["argument_id"] == original_id
+        assert data["duplicate_of"] == original_id
+        assert data["duplicate_similarity"] >= 0.8
+
+        flagged = test_client.post(
+            "/insert-argument?on_duplicate=flag",
+            headers={"X-API-Key": valid_api_key},
+            json=reworded
+        )
+        assert flagged.status_code == 200
+        data = flagged.json()
+        assert data["argument_id"] != original_id
+        assert data["duplicate_of"] == original_id
+
+        invalid = test_client.post(
+            "/insert-argument?on_duplicate=merge",
+            headers={"X-API-Key": valid_api_key},
+            json=reworded
+        )
+        assert invalid.status_code == 422
+
+    @pytest.mark.asyncio(scope="function")
+    async def test_insert_argument_dedup(
+        self,
+        test_client: TestClient,
+        neo4j_test_session: AsyncSession,
+        valid_api_key: str
+    ) -> None:
+        """Test that dedup mode turns repeat submissions into lookups"""
+        test_data = {
+            "claim": "Dedup claim",
+            "grounds": "Dedup grounds",
+            "warrant": "Dedup warrant"
+        }
+        
+        first = test_client.post("/insert-argument?dedup=true", headers={"X-API-Key": valid_api_key}, json=test_data)
+        assert first.status_code == 200
+        assert first.json()["message"] == "Argument created successfully"
+        
+        retry = test_client.post(
+            "/insert-argument?dedup=true",
+            headers={"X-API-Key": valid_api_key},
+            json=dict(test_data, claim="  dedup   CLAIM")
+        )
+        assert retry.status_code == 200
+        assert retry.json()["argument_id"] == first.json()["argument_id"]
+        assert retry.json()["message"] == "Argument already exists"
+        
+        result = await neo4j_test_session.run(
+            "MATCH (a:Argument {grounds: 'Dedup grounds'}) RETURN count(a) AS count"
+        )
+        record = await result.single()
+        assert record["count"] == 1
+
     @pytest.mark.asyncio(scope="function")
     async def test_insert_argument_validation(
         self,
@@ -477,6 +557,32 @@ class TestArgumentProcessing:
         assert record is not None
         assert record["relationship_type"] == "CHALLENGES"
 
+    def test_create_relationship_invalidates_affected_tags(
+        self,
+        test_client: TestClient,
+        valid_api_key: str
+    ) -> None:
+        """Test that a relationship invalidates its endpoints' cache tags and whole-graph views only"""
+        from rational_onion.api import argument_processing
+        from rational_onion.services.caching_service import ARGUMENTS_TAG, argument_tag
+
+        ids = [
+            test_client.post(
+                "/insert-argument",
+                headers={"X-API-Key": valid_api_key},
+                json={"claim": f"Claim {i}", "grounds": "Grounds", "warrant": "Warrant"}
+            ).json()["argument_id"]
+            for i in range(2)
+        ]
+        with patch.object(argument_processing, "invalidate_tags", new_callable=AsyncMock) as invalidate:
+            response = test_client.post(
+                "/create-relationship",
+                headers={"X-API-Key": valid_api_key},
+                json={"source_id": ids[0], "target_id": ids[1], "relationship_type": "SUPPORTS"}
+            )
+        assert response.status_code == 200
+        invalidate.assert_awaited_once_with(ARGUMENTS_TAG, argument_tag(ids[0]), argument_tag(ids[1]))
+
     @pytest.mark.asyncio(scope="function")
     async def test_invalid_relationship_type(
         self,
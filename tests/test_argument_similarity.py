@@ -0,0 +1,75 @@
+# tests/test_argument_similarity.py
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from neo4j import AsyncSession
+
+from rational_onion.api import argument_similarity
+from rational_onion.config import get_test_settings
+from rational_onion.services.embedding_store import EmbeddingStore
+
+settings = get_test_settings()
+
+class TestArgumentSimilarity:
+    """Test suite for similar-argument search"""
+
+    def test_similar_arguments_requires_query(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test that either argument_id or text must be given"""
+        response = test_client.get(
+            "/similar-arguments",
+            headers={"X-API-Key": valid_api_key}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"]["error_type"] == "VALIDATION_ERROR"
+
+    def test_similar_arguments_unknown_argument(self, test_client: TestClient, valid_api_key: str) -> None:
+        """Test searching from an argument that does not exist"""
+        response = test_client.get(
+            "/similar-arguments?argument_id=missing",
+            headers={"X-API-Key": valid_api_key}
+        )
+        assert response.status_code == 422
+
+    async def test_similar_arguments_by_text(
+        self,
+        test_client: TestClient,
+        valid_api_key: str,
+        neo4j_test_session: AsyncSession,
+        tmp_path: Path
+    ) -> None:
+        """Test that text queries rank stored arguments by similarity, skipping deleted ones"""
+        result = await neo4j_test_session.run("""
+            UNWIND ['Humans cause climate change', 'The climate changes naturally', 'Cats are mammals'] AS claim
+            CREATE (a:Argument {claim: claim})
+            RETURN elementId(a) AS id
+        """)
+        ids = [record["id"] for record in await result.data()]
+        store = EmbeddingStore(str(tmp_path), 4)
+        store.add_many(["deleted", *ids], np.array([
+            [1.0, 0.0, 0.0, 0.0],
+            [0.9, 0.1, 0.0, 0.0],
+            [0.6, 0.6, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0]
+        ], dtype=np.float32))
+        query = np.array([[1.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+
+        with patch.object(argument_similarity, "get_embedding_store", return_value=store), \
+                patch.object(argument_similarity, "encode_texts", return_value=(query, np.array([0]))):
+            response = test_client.get(
+                "/similar-arguments?text=Climate+change+is+caused+by+humans&k=2",
+                headers={"X-API-Key": valid_api_key}
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert [result["argument_id"] for result in data["results"]] == ids[:2]
+        assert data["results"][0]["claim"] == "Humans cause climate change"
+        assert data["results"][0]["score"] > data["results"][1]["score"]
+
+    def test_unauthorized_access(self, test_client: TestClient) -> None:
+        """Test unauthorized access to similar-argument search"""
+        response = test_client.get("/similar-arguments?text=test")
+        assert response.status_code == 401
@@ -0,0 +1,240 @@
+# tests/test_caching_service.py
+
+import asyncio
+import pytest
+from typing import Any, AsyncGenerator, List
+from unittest.mock import patch
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from rational_onion.services import caching_service
+from rational_onion.services.caching_service import LocalCache, ResponseCache
+from tests.redis_stub import InMemoryRedis
+
+def make_request(path: str = "/items", query: bytes = b"", method: str = "GET") -> Request:
+    return Request({"type": "http", "method": method, "path": path, "query_string": query, "headers": []})
+
+class TestResponseCache:
+    """Test suite for the tag-invalidated response cache"""
+
+    @pytest.fixture(autouse=True)
+    def enable_caching(self) -> Any:
+        with patch.object(caching_service, "caching_enabled", True):
+            yield
+
+    @pytest.fixture
+    def cache(self) -> ResponseCache:
+        return ResponseCache(cache=InMemoryRedis(), ttl=60)
+
+    def endpoint(self, cache: ResponseCache, tags: List[str], result: Any = None) -> Any:
+        calls: List[int] = []
+
+        @cache.cached("items", lambda request: [*tags, f"item:{request.query_params.get('id')}"])
+        async def handler(request: Request, response: Response) -> Any:
+            calls.append(1)
+            return result if result is not None else {"calls": len(calls)}
+
+        handler.calls = calls
+        return handler
+
+    async def test_hits_until_a_tag_is_invalidated(self, cache: ResponseCache) -> None:
+        """Test that responses are reused until a tag they depend on changes"""
+        handler = self.endpoint(cache, ["arguments"])
+        request = make_request(query=b"id=1")
+
+        assert await handler(request=request, response=Response()) == {"calls": 1}
+        hit = Response()
+        assert await handler(request=request, response=hit) == {"calls": 1}
+        assert hit.headers["X-Cache"] == "HIT"
+
+        await cache.invalidate("references")
+        assert await handler(request=request, response=Response()) == {"calls": 1}
+
+        await cache.invalidate("item:1")
+        assert await handler(request=request, response=Response()) == {"calls": 2}
+        await cache.invalidate("arguments")
+        assert await handler(request=request, response=Response()) == {"calls": 3}
+
+    async def test_entries_are_keyed_by_query(self, cache: ResponseCache) -> None:
+        """Test that different query parameters are cached separately"""
+        handler = self.endpoint(cache, [])
+        await handler(request=make_request(query=b"id=1&b=2"), response=Response())
+        await handler(request=make_request(query=b"b=2&id=1"), response=Response())
+        await handler(request=make_request(query=b"id=2"), response=Response())
+        assert len(handler.calls) == 2
+
+        await cache.invalidate("item:2")
+        await handler(request=make_request(query=b"id=1&b=2"), response=Response())
+        assert len(handler.calls) == 2
+
+    async def test_uncacheable_responses(self, cache: ResponseCache) -> None:
+        """Test that POSTs, errors, streams and no-store responses are never cached"""
+        for result, method in [
+            ({"ok": True}, "POST"),
+            (JSONResponse(status_code=500, content={"detail": "error"}), "GET"),
+            (StreamingResponse(iter([b"{}\n"])), "GET"),
+            (JSONResponse(content={"mock": True}, headers={"Cache-Control": "no-store"}), "GET")
+        ]:
+            handler = self.endpoint(cache, [], result)
+            await handler(request=make_request(method=method), response=Response())
+            await handler(request=make_request(method=method), response=Response())
+            assert len(handler.calls) == 2
+
+    async def test_json_responses_are_replayed(self, cache: ResponseCache) -> None:
+        """Test that endpoints returning JSONResponse get an equivalent response back"""
+        handler = self.endpoint(cache, [], JSONResponse(content={"nodes": [1, 2]}))
+        await handler(request=make_request(), response=Response())
+        replayed = await handler(request=make_request(), response=Response())
+        assert len(handler.calls) == 1
+        assert replayed.body == b'{"nodes":[1,2]}'
+        assert replayed.media_type == "application/json"
+
+    async def test_disabled_cache_bypasses(self, cache: ResponseCache) -> None:
+        """Test that nothing is cached while caching is toggled off"""
+        handler = self.endpoint(cache, [])
+        with patch.object(caching_service, "caching_enabled", False):
+            await handler(request=make_request(), response=Response())
+            await handler(request=make_request(), response=Response())
+        assert len(handler.calls) == 2
+
+class TestLocalCache:
+    """Test suite for the in-process cache tier"""
+
+    def test_evicts_least_recently_used_by_count(self) -> None:
+        """Test that the least recently used entry goes once max_entries is exceeded"""
+        local = LocalCache(max_entries=2, max_bytes=1000, ttl=60)
+        local.set("a", 1, 10, ["t"])
+        local.set("b", 2, 10, ["t"])
+        assert local.get("a") == 1
+        local.set("c", 3, 10, ["t"])
+        assert local.get("b") is None
+        assert (local.get("a"), local.get("c")) == (1, 3)
+
+    def test_evicts_by_memory(self) -> None:
+        """Test that entries are evicted to stay under max_bytes, and oversized ones skipped"""
+        local = LocalCache(max_entries=100, max_bytes=100, ttl=60)
+        local.set("a", 1, 60, ["t"])
+        local.set("b", 2, 30, ["t"])
+        local.set("c", 3, 30, ["t"])
+        assert local.get("a") is None
+        assert local.size == 60
+        local.set("huge", 4, 101, ["t"])
+        assert local.get("huge") is None
+        assert len(local) == 2
+
+    def test_entries_expire(self) -> None:
+        """Test that entries are not served past their TTL"""
+        now = [0.0]
+        local = LocalCache(max_entries=10, max_bytes=1000, ttl=5, clock=lambda: now[0])
+        local.set("a", 1, 10, ["t"])
+        now[0] = 4.9
+        assert local.get("a") == 1
+        now[0] = 5.0
+        assert local.get("a") is None
+        assert local.size == 0
+
+    def test_invalidation_by_tag(self) -> None:
+        """Test that invalidating a tag drops exactly the entries depending on it"""
+        local = LocalCache(max_entries=10, max_bytes=1000, ttl=60)
+        local.set("dag", 1, 10, ["all", "arguments"])
+        local.set("refs", 2, 10, ["all", "references"])
+        local.invalidate(["arguments"])
+        assert local.get("dag") is None
+        assert local.get("refs") == 2
+
+    def test_entries_computed_before_an_invalidation_are_rejected(self) -> None:
+        """Test that an entry is not stored if anything was invalidated while it was computed"""
+        local = LocalCache(max_entries=10, max_bytes=1000, ttl=60)
+        generation = local.generation
+        local.invalidate(["arguments"])
+        local.set("dag", 1, 10, ["all", "arguments"], generation)
+        assert local.get("dag") is None
+        local.set("dag", 1, 10, ["all", "arguments"], local.generation)
+        assert local.get("dag") == 1
+
+    def test_invalidation_state_is_bounded(self) -> None:
+        """Test that invalidating many distinct tags leaves no per-tag state behind"""
+        local = LocalCache(max_entries=10, max_bytes=1000, ttl=60)
+        local.set("argument", 1, 10, ["all", "argument:0"])
+        for i in range(1000):
+            local.invalidate([f"argument:{i}"])
+        assert len(local) == 0
+        assert local._keys_by_tag == {}
+
+class TestTwoTierResponseCache:
+    """Test suite for the local tier in front of Redis, across workers"""
+
+    @pytest.fixture(autouse=True)
+    def enable_caching(self) -> Any:
+        with patch.object(caching_service, "caching_enabled", True):
+            yield
+
+    @pytest.fixture
+    def redis(self) -> InMemoryRedis:
+        return InMemoryRedis()
+
+    @pytest.fixture
+    async def workers(self, redis: InMemoryRedis) -> AsyncGenerator[List[ResponseCache], None]:
+        """Two workers sharing one Redis, each with its own subscribed local tier"""
+        workers = [ResponseCache(cache=redis, ttl=60, local=LocalCache(ttl=60)) for _ in range(2)]
+        listeners = [asyncio.create_task(worker.listen()) for worker in workers]
+        while not all(worker.local_active for worker in workers):
+            await asyncio.sleep(0)
+        yield workers
+        for listener in listeners:
+            listener.cancel()
+        await asyncio.gather(*listeners, return_exceptions=True)
+
+    @staticmethod
+    def endpoint(worker: ResponseCache) -> Any:
+        calls: List[int] = []
+
+        @worker.cached("dag", lambda request: ["arguments"])
+        async def handler(request: Request, response: Response) -> Any:
+            calls.append(1)
+            return {"nodes": len(calls)}
+
+        handler.calls = calls
+        return handler
+
+    async def test_hot_entries_are_served_locally(self, workers: List[ResponseCache], redis: InMemoryRedis) -> None:
+        """Test that repeated reads skip Redis once an entry is in the local tier"""
+        handler = self.endpoint(workers[0])
+        await handler(request=make_request(), response=Response())
+        reads = redis.calls["get"]
+        hit = Response()
+        assert await handler(request=make_request(), response=hit) == {"nodes": 1}
+        assert hit.headers["X-Cache"] == "LOCAL"
+        assert redis.calls["get"] == reads
+
+    async def test_other_workers_fill_from_redis(self, workers: List[ResponseCache]) -> None:
+        """Test that an entry computed by one worker is a Redis hit for another"""
+        first, second = self.endpoint(workers[0]), self.endpoint(workers[1])
+        await first(request=make_request(), response=Response())
+        hit = Response()
+        assert await second(request=make_request(), response=hit) == {"nodes": 1}
+        assert hit.headers["X-Cache"] == "HIT"
+        assert second.calls == []
+
+    async def test_invalidation_reaches_every_worker(self, workers: List[ResponseCache]) -> None:
+        """Test that an invalidation published by one worker drops the other's local entries"""
+        reader = self.endpoint(workers[0])
+        await reader(request=make_request(), response=Response())
+        await reader(request=make_request(), response=Response())
+        assert len(workers[0].local) == 1
+
+        await workers[1].invalidate("arguments")
+        await asyncio.sleep(0)
+        assert len(workers[0].local) == 0
+        assert await reader(request=make_request(), response=Response()) == {"nodes": 2}
+
+    async def test_local_tier_unused_without_subscription(self, redis: InMemoryRedis) -> None:
+        """Test that nothing is served locally while invalidations cannot be received"""
+        worker = ResponseCache(cache=redis, ttl=60, local=LocalCache(ttl=60))
+        handler = self.endpoint(worker)
+        await handler(request=make_request(), response=Response())
+        hit = Response()
+        await handler(request=make_request(), response=hit)
+        assert hit.headers["X-Cache"] == "HIT"
+        assert len(worker.local) == 0
@@ -0,0 +1,88 @@
+# tests/test_citation_analytics.py
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from rational_onion.services.citation_analytics import (
+    _affected_rows,
+    cocitation_matrix,
+    incidence_matrix,
+    related_scores,
+    top_k_per_row
+)
+
+# a1 and a2 share r1; a3 cites r2, which a2 co-cites with r1; a4 stands alone
+CITATIONS = [
+    ("a1", "r1"),
+    ("a2", "r1"), ("a2", "r2"),
+    ("a3", "r2"),
+    ("a4", "r3"),
+    ("a1", "r1")
+]
+
+class TestCitationAnalytics:
+    """Test suite for co-citation and bibliographic coupling analytics"""
+
+    @pytest.fixture
+    def incidence(self) -> sp.csr_matrix:
+        matrix, arguments, references = incidence_matrix(CITATIONS)
+        assert arguments == ["a1", "a2", "a3", "a4"]
+        assert references == ["r1", "r2", "r3"]
+        return matrix
+
+    def test_incidence_matrix_is_binary(self, incidence: sp.csr_matrix) -> None:
+        """Test that repeated citations count once"""
+        assert incidence.shape == (4, 3)
+        assert incidence.nnz == 5
+        assert set(incidence.data) == {1.0}
+
+    def test_cocitation_matrix(self, incidence: sp.csr_matrix) -> None:
+        """Test that references cited together are similar and self-similarity is dropped"""
+        cocitation = cocitation_matrix(incidence).toarray()
+        assert np.allclose(np.diag(cocitation), 0.0)
+        # r1 is cited twice, r2 twice, together once
+        assert cocitation[0, 1] == pytest.approx(0.5)
+        assert cocitation[0, 2] == 0.0
+
+    def test_related_scores(self, incidence: sp.csr_matrix) -> None:
+        """Test coupling through shared references and co-citation through co-cited ones"""
+        rows = np.arange(4)
+        coupling, cocitation = related_scores(incidence, cocitation_matrix(incidence), rows)
+        coupling, cocitation = coupling.toarray(), cocitation.toarray()
+
+        assert np.allclose(np.diag(coupling), 0.0)
+        assert coupling[0, 1] == pytest.approx(1 / np.sqrt(2))
+        # a1 and a3 share no reference but r1 and r2 are co-cited
+        assert coupling[0, 2] == 0.0
+        assert cocitation[0, 2] == pytest.approx(0.5)
+        assert not coupling[3].any() and not cocitation[3].any()
+
+    def test_scores_for_a_subset_of_rows(self, incidence: sp.csr_matrix) -> None:
+        """Test that scoring some rows matches the same rows of the full result"""
+        cocitation = cocitation_matrix(incidence)
+        full_coupling, full_cocitation = related_scores(incidence, cocitation, np.arange(4))
+        coupling, cocited = related_scores(incidence, cocitation, np.array([2, 0]))
+        assert np.allclose(coupling.toarray(), full_coupling.toarray()[[2, 0]])
+        assert np.allclose(cocited.toarray(), full_cocitation.toarray()[[2, 0]])
+
+    def test_top_k_per_row(self) -> None:
+        """Test that rows keep their k best entries, ties broken by column"""
+        scores = sp.csr_matrix(np.array([
+            [0.0, 0.2, 0.9, 0.2, 0.5],
+            [0.0, 0.0, 0.0, 0.0, 0.0],
+            [0.3, 0.3, 0.3, 0.0, 0.0]
+        ]))
+        assert top_k_per_row(scores, 3) == [
+            [(2, 0.9), (4, 0.5), (1, 0.2)],
+            [],
+            [(0, 0.3), (1, 0.3), (2, 0.3)]
+        ]
+        assert top_k_per_row(scores, 1)[2] == [(0, 0.3)]
+
+    def test_affected_rows(self, incidence: sp.csr_matrix) -> None:
+        """Test that a citation change reaches coupled and co-cited arguments only"""
+        cocitation = cocitation_matrix(incidence)
+        assert list(_affected_rows(incidence, cocitation, np.array([2]))) == [0, 1, 2]
+        assert list(_affected_rows(incidence, cocitation, np.array([3]))) == [3]
+        assert len(_affected_rows(incidence, cocitation, np.array([], dtype=np.int64))) == 0
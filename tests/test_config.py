@@ -148,6 +148,17 @@ def test_settings_validation() -> None:
         Settings(NEO4J_URI="invalid://localhost:7687")
     with pytest.raises(ValueError):
         Settings(NEO4J_URI="http://localhost:7687")
+    
+    # Test unknown default spaCy pipeline profile
+    with pytest.raises(ValueError):
+        Settings(SPACY_DEFAULT_PROFILE="unknown")
+
+def test_spacy_pipeline_profiles() -> None:
+    """Test that the suggestion profile trims components it does not use"""
+    settings = Settings()
+    assert settings.SPACY_DEFAULT_PROFILE in settings.SPACY_PIPELINE_PROFILES
+    assert settings.SPACY_PIPELINE_PROFILES["full"]["exclude"] == []
+    assert "ner" in settings.SPACY_PIPELINE_PROFILES["suggestions"]["exclude"]
 
 def test_settings_env_override_extended() -> None:
     """Test extended environment variable override scenarios"""
@@ -0,0 +1,102 @@
+# tests/test_contradiction_service.py
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from rational_onion.services import contradiction_service
+from rational_onion.services.caching_service import ARGUMENTS_TAG, argument_tag
+from rational_onion.services.contradiction_service import (
+    NEGATION_WEIGHT, _suggest_challenges, cue_features, score_contradictions, tokenize
+)
+
+class FakeResult:
+    def __init__(self, rows: List[Dict[str, Any]], created: int = 0) -> None:
+        self.rows = rows
+        self.created = created
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+    async def consume(self) -> Any:
+        return SimpleNamespace(counters=SimpleNamespace(relationships_created=self.created))
+
+class FakeSession:
+    """Answers the claim lookup from a dict and reports every suggested edge as created"""
+
+    def __init__(self, claims: Dict[str, str]) -> None:
+        self.claims = claims
+
+    async def run(self, query: str, params: Dict[str, Any]) -> FakeResult:
+        if "ids" in params:
+            return FakeResult([{"id": i, "claim": self.claims[i]} for i in params["ids"] if i in self.claims])
+        return FakeResult([], created=len(params["suggestions"]))
+
+class TestContradictionService:
+    """Test suite for contradiction scoring heuristics"""
+
+    def test_tokenize_expands_contractions(self) -> None:
+        """Test that contracted negations become negation cues"""
+        assert tokenize("Vaccines don't cause autism.") == ["vaccines", "do", "not", "cause", "autism"]
+
+    def test_cue_features(self) -> None:
+        """Test negation parity and polarity signs"""
+        negations, polarity = cue_features([
+            "Emissions are not falling",
+            "It is not untrue that we never lose",
+            "Emissions are rising"
+        ])
+        assert negations.tolist() == [1, 0, 0]
+        assert polarity[0].min() == -1
+        assert polarity[2].max() == 1
+
+    def test_score_contradictions(self) -> None:
+        """Test that negation flips and opposite polarities score, and their combination cancels"""
+        first = [
+            "Nuclear power is safe",
+            "Carbon taxes increase energy prices",
+            "Carbon taxes increase energy prices",
+            "Nuclear power is safe"
+        ]
+        second = [
+            "Nuclear power is not safe",
+            "Carbon taxes reduce energy prices",
+            "Carbon taxes do not reduce energy prices",
+            "Nuclear power is cheap"
+        ]
+        similarities = np.full(len(first), 0.9, dtype=np.float32)
+        scores = score_contradictions(first, second, similarities)
+
+        assert scores[0] == pytest.approx(0.9 * NEGATION_WEIGHT)
+        assert 0.7 <= scores[1] < scores[0]
+        assert scores[2] == 0.0
+        assert scores[3] == 0.0
+
+    def test_scores_scale_with_similarity(self) -> None:
+        """Test that loosely related pairs score lower"""
+        scores = score_contradictions(
+            ["Nuclear power is safe"] * 2,
+            ["Nuclear power is not safe"] * 2,
+            np.array([0.9, 0.5], dtype=np.float32)
+        )
+        assert scores[0] > scores[1]
+
+    async def test_suggested_edges_invalidate_caches(self) -> None:
+        """Test that written suggestions invalidate the joined arguments and bump the graph version"""
+        session = FakeSession({
+            "a": "Nuclear power is safe",
+            "b": "Nuclear power is not safe",
+            "c": "Nuclear power is cheap"
+        })
+        with patch.object(contradiction_service, "invalidate_tags", new_callable=AsyncMock) as invalidate, \
+                patch.object(contradiction_service, "bump_graph_version", new_callable=AsyncMock) as bump:
+            assert await _suggest_challenges(session, {("a", "c"): 0.9}) == 0
+            invalidate.assert_not_awaited()
+            bump.assert_not_awaited()
+
+            assert await _suggest_challenges(session, {("a", "b"): 0.9, ("a", "c"): 0.9}) == 1
+        bump.assert_awaited_once()
+        invalidate.assert_awaited_once_with(ARGUMENTS_TAG, argument_tag("a"), argument_tag("b"))
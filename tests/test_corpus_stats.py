@@ -0,0 +1,63 @@
+# tests/test_corpus_stats.py
+
+import spacy
+from pathlib import Path
+from spacy.tokens import Doc
+from unittest.mock import patch
+
+from rational_onion.services.corpus_stats import CorpusStats
+from rational_onion.services.suggestion_engine import SuggestionEngine
+
+VOCAB = spacy.blank("en").vocab
+
+class TestCorpusStats:
+    """Test suite for incremental lemma document frequencies"""
+
+    def test_document_frequencies(self, tmp_path: Path) -> None:
+        """Test that each document counts a lemma once"""
+        stats = CorpusStats(str(tmp_path / "df.u32"), buckets=1024)
+        stats.add_document(["energy", "solar", "energy"])
+        stats.add_document(["energy", "wind"])
+
+        frequencies, total = stats.document_frequencies(["energy", "solar", "coal"])
+        assert total == 2
+        assert frequencies.tolist() == [2, 1, 0]
+
+    def test_workers_share_counts(self, tmp_path: Path) -> None:
+        """Test that counts written by one instance are visible to another"""
+        writer = CorpusStats(str(tmp_path / "df.u32"), buckets=1024)
+        reader = CorpusStats(str(tmp_path / "df.u32"), buckets=1024)
+        assert reader.document_count() == 0
+        writer.add_document(["energy"])
+        assert reader.document_count() == 1
+        assert reader.document_frequencies(["energy"])[0].tolist() == [1]
+
+    def test_idf_weighted_suggestions(self, tmp_path: Path) -> None:
+        """Test that only commonplace repeated terms get synonym suggestions"""
+        stats = CorpusStats(str(tmp_path / "df.u32"), buckets=1024)
+        for _ in range(100):
+            stats.add_document(["policy", "need"])
+        stats.add_document(["geothermal"])
+
+        doc = Doc(
+            VOCAB,
+            words=["policy", "needs", "policy", "and", "geothermal", "geothermal", "plants", "everywhere", "now", "."],
+            pos=["NOUN", "VERB", "NOUN", "CCONJ", "NOUN", "NOUN", "NOUN", "ADV", "ADV", "PUNCT"],
+            lemmas=["policy", "need", "policy", "and", "geothermal", "geothermal", "plant", "everywhere", "now", "."]
+        )
+        with patch("rational_onion.services.suggestion_engine.settings.CORPUS_MIN_DOCUMENTS", 50):
+            suggestions = SuggestionEngine(VOCAB, top_k=10, corpus_stats=stats).suggest(doc)
+
+        assert "Consider using synonyms for 'policy' to improve lexical diversity." in suggestions
+        assert "Ensure 'geothermal' is well-supported by evidence." in suggestions
+        # Specific terms rank above commonplace ones
+        assert suggestions.index("Ensure 'plants' is well-supported by evidence.") < \
+            suggestions.index("Ensure 'needs' is well-supported by evidence.")
+
+    def test_small_corpus_falls_back(self, tmp_path: Path) -> None:
+        """Test that text-only signals are used until the corpus is large enough"""
+        stats = CorpusStats(str(tmp_path / "df.u32"), buckets=1024)
+        stats.add_document(["policy"])
+        doc = Doc(VOCAB, words=["geothermal", "geothermal"], pos=["NOUN", "NOUN"], lemmas=["geothermal", "geothermal"])
+        suggestions = SuggestionEngine(VOCAB, top_k=10, corpus_stats=stats).suggest(doc)
+        assert "Consider using synonyms for 'geothermal' to improve lexical diversity." in suggestions
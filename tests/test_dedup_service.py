@@ -0,0 +1,77 @@
+# tests/test_dedup_service.py
+
+import pytest
+
+from rational_onion.services.dedup_service import (
+    MinHasher, NearDuplicateIndex, band_keys, content_hash, estimate_similarity, shingles
+)
+from tests.redis_stub import InMemoryRedis
+
+CLAIM = "Renewable energy is more sustainable than fossil fuels in the long term"
+REWORDED = "Renewable energy is far more sustainable than fossil fuels in the long term."
+UNRELATED = "Electric vehicles reduce emissions when charged from a clean grid"
+
+class TestDedupService:
+    """Test suite for MinHash near-duplicate detection"""
+
+    def test_shingles_ignore_case_and_punctuation(self) -> None:
+        """Test that formatting differences do not change the shingle set"""
+        assert shingles("Hello, World!", 5) == shingles("hello world", 5)
+        assert shingles("hi", 5) == {"hi"}
+        assert shingles("", 5) == set()
+
+    def test_content_hash_normalisation(self) -> None:
+        """Test that only case and whitespace differences share a content hash"""
+        original = content_hash("Test claim", "Test grounds", "Test warrant")
+        assert content_hash("  test   CLAIM ", "Test grounds", "Test\nwarrant") == original
+        assert content_hash("Test claim!", "Test grounds", "Test warrant") != original
+        # Field boundaries are part of the hash
+        assert content_hash("Test claim Test", "grounds", "Test warrant") != original
+
+    def test_signature_estimates_jaccard(self) -> None:
+        """Test that signature agreement tracks claim similarity"""
+        hasher = MinHasher(num_perm=128, shingle_size=5)
+        claim = hasher.signature(CLAIM)
+
+        assert estimate_similarity(claim, hasher.signature(CLAIM.upper())) == 1.0
+        assert estimate_similarity(claim, hasher.signature(REWORDED)) >= 0.8
+        assert estimate_similarity(claim, hasher.signature(UNRELATED)) < 0.3
+
+    def test_band_keys(self) -> None:
+        """Test that identical signatures share all buckets"""
+        hasher = MinHasher(num_perm=128, shingle_size=5)
+        keys = band_keys(hasher.signature(CLAIM), 32)
+        assert len(keys) == len(set(keys)) == 32
+        assert keys == band_keys(hasher.signature(CLAIM), 32)
+
+    @pytest.mark.asyncio
+    async def test_index_finds_near_duplicates(self) -> None:
+        """Test lookups against the index in a constant number of round trips"""
+        client = InMemoryRedis()
+        index = NearDuplicateIndex(client, num_perm=128, bands=32, shingle_size=5, threshold=0.8)
+        await index.add("claim", CLAIM)
+        await index.add("unrelated", UNRELATED)
+
+        client.round_trips = 0
+        matches = await index.find(REWORDED)
+        assert [match_id for match_id, _ in matches] == ["claim"]
+        assert client.round_trips == 2
+        assert await index.find("Vaccines are safe and effective") == []
+
+    @pytest.mark.asyncio
+    async def test_indexes_are_separate_and_removable(self) -> None:
+        """Test that key prefixes isolate indexes and removed ids stop matching"""
+        client = InMemoryRedis()
+        claims = NearDuplicateIndex(client, num_perm=128, bands=32, shingle_size=5, threshold=0.8)
+        titles = NearDuplicateIndex(
+            client, num_perm=128, bands=32, shingle_size=3, threshold=0.8, key_prefix="lsh:test-titles"
+        )
+        await claims.add("claim", CLAIM)
+        assert await titles.find(CLAIM) == []
+
+        await titles.add("title", CLAIM)
+        assert [match_id for match_id, _ in await titles.find(REWORDED)] == ["title"]
+        await titles.remove("title")
+        await titles.remove("missing")
+        assert await titles.find(REWORDED) == []
+        assert [match_id for match_id, _ in await claims.find(REWORDED)] == ["claim"]
@@ -0,0 +1,85 @@
+# tests/test_embedding_store.py
+
+import pytest
+import numpy as np
+from pathlib import Path
+from unittest.mock import patch
+
+from rational_onion.services import embedding_store
+from rational_onion.services.embedding_store import EmbeddingStore
+
+DIMENSION = 16
+
+def random_vectors(count: int, seed: int = 0) -> np.ndarray:
+    """Random unit vectors"""
+    vectors = np.random.default_rng(seed).normal(size=(count, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+class TestEmbeddingStore:
+    """Test suite for the shared embedding store and its ANN index"""
+
+    def test_exact_search(self, tmp_path: Path) -> None:
+        """Test that small stores return the exact nearest neighbours"""
+        store = EmbeddingStore(str(tmp_path), DIMENSION)
+        vectors = random_vectors(50)
+        store.add_many([f"arg-{i}" for i in range(50)], vectors)
+        
+        results = store.search(vectors[7], k=3)
+        assert len(results) == 3
+        assert results[0][0] == "arg-7"
+        assert results[0][1] == pytest.approx(1.0, abs=1e-2)
+        assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+        
+        excluded = store.search(vectors[7], k=3, exclude={"arg-7"})
+        assert "arg-7" not in [item_id for item_id, _ in excluded]
+        assert len(excluded) == 3
+
+    def test_readd_supersedes_previous_vector(self, tmp_path: Path) -> None:
+        """Test that re-adding an id replaces its embedding"""
+        store = EmbeddingStore(str(tmp_path), DIMENSION)
+        first, second = random_vectors(2)
+        store.add("arg", first)
+        store.add("arg", second)
+        
+        assert len(store) == 1
+        assert np.allclose(store.get("arg"), second, atol=1e-2)
+        assert store.search(first, k=5) == [("arg", pytest.approx(float(first @ second), abs=1e-2))]
+
+    def test_workers_share_store(self, tmp_path: Path) -> None:
+        """Test that rows appended by one instance are visible to another"""
+        writer = EmbeddingStore(str(tmp_path), DIMENSION)
+        reader = EmbeddingStore(str(tmp_path), DIMENSION)
+        vectors = random_vectors(3)
+        writer.add_many(["a", "b"], vectors[:2])
+        assert len(reader) == 2
+        
+        writer.add("c", vectors[2])
+        assert "c" in reader
+        assert reader.search(vectors[2], k=1)[0][0] == "c"
+
+    def test_batch_lookups(self, tmp_path: Path) -> None:
+        """Test that missing ids and stored vectors are read for many ids at once"""
+        store = EmbeddingStore(str(tmp_path), DIMENSION)
+        vectors = random_vectors(2)
+        store.add_many(["a", "b"], vectors)
+
+        assert store.missing(["c", "a", "d", "b"]) == ["c", "d"]
+        found = store.get_many(["b", "c"])
+        assert np.allclose(found[0], vectors[1], atol=1e-2)
+        assert found[1] is None
+
+    def test_ivf_index_recall(self, tmp_path: Path) -> None:
+        """Test that the IVF index finds stored vectors once trained"""
+        with patch.object(embedding_store.settings, "ANN_MIN_TRAIN_SIZE", 100):
+            store = EmbeddingStore(str(tmp_path), DIMENSION)
+            vectors = random_vectors(400, seed=1)
+            store.add_many([f"arg-{i}" for i in range(400)], vectors)
+            assert store._index is not None
+            
+            hits = sum(store.search(vectors[i], k=1)[0][0] == f"arg-{i}" for i in range(0, 400, 10))
+            assert hits >= 36
+            
+            # Rows added after training are assigned to buckets incrementally
+            extra = random_vectors(1, seed=2)[0]
+            store.add("late", extra)
+            assert store.search(extra, k=1)[0][0] == "late"
@@ -0,0 +1,243 @@
+# tests/test_nlp_service.py
+
+import pytest
+import numpy as np
+from typing import Any, Generator, List
+from unittest.mock import patch
+
+from rational_onion.services import nlp_service
+
+class FakeEncoder:
+    """Deterministic stand-in for the sentence transformer that records calls"""
+
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    def encode(self, texts: Any, **kwargs: Any) -> np.ndarray:
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        self.calls.append(batch)
+        vectors = np.array(
+            [[len(text), text.count("o"), text.count(" ") + 1] for text in batch],
+            dtype=np.float32
+        )
+        if kwargs.get("normalize_embeddings"):
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+class TestSemanticSimilarity:
+    """Test suite for batched, cached semantic similarity"""
+
+    @pytest.fixture
+    def encoder(self) -> Generator[FakeEncoder, None, None]:
+        """Patch in a fake encoder and start from an empty embedding cache"""
+        fake = FakeEncoder()
+        nlp_service._embedding_cache.clear()
+        with patch.object(nlp_service, "get_transformer_model", return_value=fake):
+            yield fake
+        nlp_service._embedding_cache.clear()
+
+    def test_encode_texts_deduplicates_and_caches(self, encoder: FakeEncoder) -> None:
+        """Test that each distinct text is encoded once across calls"""
+        embeddings, rows = nlp_service.encode_texts(["claim", "grounds", "claim"])
+        assert embeddings.shape[0] == 2
+        assert rows.tolist() == [0, 1, 0]
+        assert encoder.calls == [["claim", "grounds"]]
+        
+        nlp_service.encode_texts(["grounds", "warrant"])
+        assert encoder.calls[-1] == ["warrant"]
+
+    def test_pairwise_similarities(self, encoder: FakeEncoder) -> None:
+        """Test pair scores match individual cosine similarities"""
+        pairs = [("same text", "same text"), ("short", "a much longer sentence here")]
+        scores = nlp_service.pairwise_similarities(pairs)
+        
+        assert len(scores) == 2
+        assert scores[0] == pytest.approx(1.0)
+        assert scores[1] == pytest.approx(nlp_service.calculate_semantic_similarity(*pairs[1]))
+        assert nlp_service.pairwise_similarities([]) == []
+
+    def test_one_to_many_similarity(self, encoder: FakeEncoder) -> None:
+        """Test one-vs-many scores keep candidate order"""
+        candidates = ["query text", "other", "query text"]
+        scores = nlp_service.one_to_many_similarity("query text", candidates)
+        
+        assert len(scores) == 3
+        assert scores[0] == pytest.approx(1.0)
+        assert scores[2] == pytest.approx(1.0)
+        assert scores[1] < 1.0
+        assert encoder.calls == [["query text", "other"]]
+
+    def test_embedding_cache_is_bounded(self, encoder: FakeEncoder) -> None:
+        """Test that the least recently used embeddings are evicted"""
+        with patch.object(nlp_service.settings, "EMBEDDING_CACHE_SIZE", 2):
+            nlp_service.encode_texts(["a", "b", "c"])
+        assert list(nlp_service._embedding_cache) == ["b", "c"]
+
+class TestParseCache:
+    """Test suite for persisted spaCy parses"""
+
+    @pytest.fixture
+    def parsed(self, tmp_path: Any) -> Generator[List[str], None, None]:
+        """Patch in a blank pipeline with an empty cache; yields the texts it parses"""
+        import spacy
+        from rational_onion.services.doc_cache import DocCache
+        nlp = spacy.blank("en")
+        seen: List[str] = []
+        original_pipe = nlp.pipe
+
+        def recording_pipe(texts: Any, **kwargs: Any) -> Any:
+            def record() -> Any:
+                for text in texts:
+                    seen.append(text)
+                    yield text
+            return original_pipe(record(), **kwargs)
+
+        with patch.object(nlp_service, "get_nlp", return_value=nlp), \
+             patch.object(nlp, "pipe", side_effect=recording_pipe), \
+             patch.dict(nlp_service._doc_caches, {"suggestions": DocCache(str(tmp_path), nlp)}):
+            yield seen
+
+    def test_parse_texts_reuses_cached_docs(self, parsed: List[str]) -> None:
+        """Test that only unseen texts reach the parser and order is kept"""
+        first = [doc.text for doc in nlp_service.parse_texts(["alpha", "beta"], "suggestions")]
+        assert first == ["alpha", "beta"]
+        assert parsed == ["alpha", "beta"]
+
+        texts = ["beta", "gamma", "alpha", "delta", "beta"]
+        second = [doc.text for doc in nlp_service.parse_texts(texts, "suggestions", batch_size=2)]
+        assert second == texts
+        assert parsed[2:] == ["gamma", "delta"]
+
+    def test_doc_cache_round_trip(self, tmp_path: Any) -> None:
+        """Test that cached parses keep their annotations and are keyed by pipeline"""
+        import spacy
+        from spacy.tokens import Doc
+        from rational_onion.services.doc_cache import DocCache
+        nlp = spacy.blank("en")
+        cache = DocCache(str(tmp_path), nlp)
+        doc = Doc(nlp.vocab, words=["Emissions", "rise"], pos=["NOUN", "VERB"], lemmas=["emission", "rise"])
+        cache.put(doc)
+
+        restored = cache.get("Emissions rise ")
+        assert restored is not None
+        assert [t.pos_ for t in restored] == ["NOUN", "VERB"]
+        assert [t.lemma_ for t in restored] == ["emission", "rise"]
+        assert cache.get("unseen") is None
+
+        other_pipeline = spacy.blank("en")
+        other_pipeline.add_pipe("sentencizer")
+        assert DocCache(str(tmp_path), other_pipeline).get("Emissions rise ") is None
+
+    def test_parse_texts_streams_cached_docs(self, parsed: List[str]) -> None:
+        """Test that hits are yielded as they are read rather than held for the next miss"""
+        list(nlp_service.parse_texts(["alpha", "beta", "gamma"], "suggestions"))
+        read: List[str] = []
+
+        def texts() -> Any:
+            for text in ["alpha", "beta", "gamma", "delta", "alpha", "beta", "gamma", "alpha"]:
+                read.append(text)
+                yield text
+
+        docs = nlp_service.parse_texts(texts(), "suggestions", batch_size=2)
+        assert next(docs).text == "alpha"
+        assert read == ["alpha"]
+        assert [doc.text for doc in docs] == ["beta", "gamma", "delta", "alpha", "beta", "gamma", "alpha"]
+        assert parsed[3:] == ["delta"]
+
+    def test_doc_cache_is_bounded(self, tmp_path: Any) -> None:
+        """Test that least recently used parses are evicted and old pipeline versions removed"""
+        import os
+        import spacy
+        from rational_onion.services.doc_cache import DocCache
+        nlp = spacy.blank("en")
+        stale = tmp_path / "0123456789abcdef"
+        stale.mkdir()
+        cache = DocCache(str(tmp_path), nlp, max_entries=3)
+        assert not stale.exists()
+
+        for mtime, text in enumerate(["one", "two", "three", "four"]):
+            cache.put(nlp(text))
+            os.utime(cache._path(text), (mtime, mtime))
+        cache.get("one")
+
+        assert cache.prune() == 2
+        assert [text for text in ["one", "two", "three", "four"] if cache.get(text)] == ["one", "four"]
+
+        sizes = [size for _, size, _ in cache._entries()]
+        DocCache(str(tmp_path), nlp, max_bytes=int(max(sizes) * 1.5))
+        assert len(cache._entries()) == 1
+
+class TestPipelineProfiles:
+    """Test suite for the spaCy profile shared by suggestions and readiness"""
+
+    def test_suggestions_use_the_profile_readiness_checks(self) -> None:
+        """Test that batch suggestions load the configured default profile, which readiness reports"""
+        import spacy
+        from unittest.mock import MagicMock
+        loaded: List[str] = []
+
+        def fake_get_nlp(profile: Any = None) -> Any:
+            loaded.append(profile)
+            nlp_service._nlp_profiles[profile] = spacy.blank("en")
+            return nlp_service._nlp_profiles[profile]
+
+        with patch.object(nlp_service.settings, "SPACY_DEFAULT_PROFILE", "full"), \
+                patch.object(nlp_service.settings, "DOC_CACHE_ENABLED", False), \
+                patch.dict(nlp_service._nlp_profiles, clear=True), \
+                patch.object(nlp_service, "_transformer_model", MagicMock()), \
+                patch.object(nlp_service, "get_nlp", fake_get_nlp), \
+                patch.object(nlp_service, "get_suggestion_engine") as engine:
+            assert not nlp_service.models_ready()
+            engine.return_value.suggest_many.side_effect = lambda docs: [[] for _ in docs]
+            assert list(nlp_service.process_batch(["Emissions rise"])) == [[]]
+            assert set(loaded) == {"full"}
+            assert nlp_service.models_ready()
+
+CANDIDATES = [
+    {"title": "Ocean warming and sea level rise", "relevance_score": 2.0, "citation_count": 10, "year": 2000, "url": "a"},
+    {"title": "Sea level rise projections", "relevance_score": 4.0, "citation_count": 0, "year": 2020, "url": "b"},
+    {"title": "Coastal adaptation", "relevance_score": 1.0, "citation_count": 50, "year": None, "url": None}
+]
+
+class TestReferenceRanking:
+    """Test suite for hybrid reference ranking"""
+
+    def test_reference_rank_scores(self) -> None:
+        """Test signal blending, recency decay and renormalisation without embeddings"""
+        lexical = np.array([2.0, 4.0], dtype=np.float32)
+        citations = np.zeros(2, dtype=np.float32)
+        years = np.array([2024 - int(nlp_service.settings.REFERENCE_RECENCY_HALF_LIFE), 2024], dtype=np.float32)
+
+        lexical_only = nlp_service.reference_rank_scores(lexical, None, citations, years, 2024)
+        weights = nlp_service.REFERENCE_RANK_WEIGHTS
+        expected = (weights[0] * np.array([0.5, 1.0]) + weights[3] * np.array([0.5, 1.0])) / (weights.sum() - weights[1])
+        assert np.allclose(lexical_only, expected)
+
+        semantic = nlp_service.reference_rank_scores(lexical, np.array([1.0, 0.0]), citations, years, 2024)
+        assert semantic[0] > lexical_only[0] * (weights.sum() - weights[1]) / weights.sum()
+        assert len(nlp_service.reference_rank_scores(lexical[:0], None, citations[:0], years[:0], 2024)) == 0
+
+    def test_top_k_indices(self) -> None:
+        """Test partial top-k selection returns the best scores in order"""
+        scores = np.array([0.1, 0.9, 0.4, 0.7, 0.2])
+        assert nlp_service.top_k_indices(scores, 2).tolist() == [1, 3]
+        assert nlp_service.top_k_indices(scores, 10).tolist() == [1, 3, 2, 4, 0]
+
+    async def test_rank_references_falls_back_within_budget(self) -> None:
+        """Test that a slow re-rank stage is dropped in favour of lexical and prior scores"""
+        import time
+
+        async def fake_search(*args: Any, **kwargs: Any) -> Any:
+            return [dict(candidate) for candidate in CANDIDATES], len(CANDIDATES)
+
+        def slow_similarity(query: str, titles: List[str]) -> List[float]:
+            time.sleep(0.2)
+            return [1.0] * len(titles)
+
+        with patch.object(nlp_service, "search_references", fake_search), \
+                patch.object(nlp_service, "one_to_many_similarity", slow_similarity), \
+                patch.object(nlp_service.settings, "REFERENCE_RANK_BUDGET_MS", 50):
+            ranked = await nlp_service.rank_references_with_embeddings("sea level rise", top_k=2)
+
+        assert [title for title, _, _, _ in ranked] == ["Sea level rise projections", "Ocean warming and sea level rise"]
+        assert ranked[0][2] == 0 and ranked[0][3] == "b"
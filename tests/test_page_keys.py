@@ -0,0 +1,56 @@
+# tests/test_page_keys.py
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from rational_onion.services import page_keys
+from rational_onion.services.page_keys import PAGED_LABELS, backfill_page_keys, iter_pages
+
+class FakeResult:
+    def __init__(self, rows: List[Dict[str, Any]], properties_set: int = 0) -> None:
+        self.rows = rows
+        self.properties_set = properties_set
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+    async def consume(self) -> Any:
+        return SimpleNamespace(counters=SimpleNamespace(properties_set=self.properties_set))
+
+class FakeSession:
+    """Serves page_key range scans over a sorted list of keys and records each query"""
+
+    def __init__(self, keys: List[str], unkeyed: int = 0) -> None:
+        self.keys = sorted(keys)
+        self.unkeyed = unkeyed
+        self.queries: List[str] = []
+
+    async def run(self, query: str, params: Optional[Dict[str, Any]] = None) -> FakeResult:
+        self.queries.append(query)
+        if "IS NULL" in query:
+            keyed, self.unkeyed = self.unkeyed, 0
+            return FakeResult([], properties_set=keyed)
+        if "page_key >" not in query:
+            return FakeResult([])
+        rows = [{"id": key.upper(), "page_key": key} for key in self.keys if key > params["after"]]
+        return FakeResult(rows[:params["limit"]])
+
+class TestPageKeys:
+    """Test suite for page_key backfill and paging"""
+
+    async def test_iter_pages_covers_every_node_once(self) -> None:
+        """Test that pages follow the page_key index and stop after the last node"""
+        session = FakeSession(["c", "a", "e", "b", "d"])
+        pages = iter_pages(session, "Argument", "n.claim AS claim", "AND n.claim IS NOT NULL", batch_size=2)
+        ids = [[record["id"] for record in records] async for records in pages]
+        assert ids == [["A", "B"], ["C", "D"], ["E"]]
+        assert all("ORDER BY n.page_key" in query and "AND n.claim IS NOT NULL" in query for query in session.queries)
+
+    async def test_backfill_keys_both_labels_once(self) -> None:
+        """Test that constraints are created once per process and keyless nodes are counted"""
+        page_keys._page_key_constraints_ready = False
+        session = FakeSession([], unkeyed=3)
+        assert await backfill_page_keys(session) == 3
+        assert await backfill_page_keys(session) == 0
+        constraints = [query for query in session.queries if "CREATE CONSTRAINT" in query]
+        assert len(constraints) == len(PAGED_LABELS)
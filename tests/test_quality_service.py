@@ -0,0 +1,87 @@
+# tests/test_quality_service.py
+
+import pytest
+import numpy as np
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from rational_onion.services import quality_service
+from rational_onion.services.quality_service import QUALITY_FEATURES, quality_features, score_features
+from tests.redis_stub import InMemoryRedis
+
+COMPLETE = {
+    "id": "complete",
+    "claim": "Renewable energy is more sustainable than fossil fuels.",
+    "grounds": "Solar and wind energy do not deplete natural resources. " * 4,
+    "warrant": "Sustainability means meeting present needs without compromising future generations.",
+    "rebuttal": "Unless storage costs remain prohibitive.",
+    "reference_count": 3,
+    "in_degree": 2,
+    "out_degree": 1
+}
+BARE = {"id": "bare", "claim": "Taxes are bad.", "grounds": None, "warrant": "", "rebuttal": None}
+
+class FakeResult:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+class FakeSession:
+    """Returns the stored rows requested by id and records each query"""
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = {row["id"]: row for row in rows}
+        self.requested: List[List[str]] = []
+
+    async def run(self, query: str, params: Dict[str, Any]) -> FakeResult:
+        self.requested.append(params["ids"])
+        return FakeResult([self.rows[i] for i in params["ids"] if i in self.rows])
+
+def fake_similarities(pairs: List[Any]) -> List[float]:
+    return [0.8] * len(pairs)
+
+class TestQualityService:
+    """Test suite for feature-based argument quality scoring"""
+
+    def test_quality_features(self) -> None:
+        """Test feature extraction for complete and bare arguments"""
+        with patch.object(quality_service, "pairwise_similarities", side_effect=fake_similarities) as similarities:
+            features = quality_features([COMPLETE, BARE])
+
+        assert features.shape == (2, len(QUALITY_FEATURES))
+        assert np.all((features >= 0) & (features <= 1))
+        complete = dict(zip(QUALITY_FEATURES, features[0]))
+        bare = dict(zip(QUALITY_FEATURES, features[1]))
+        assert complete["has_grounds"] == complete["has_warrant"] == complete["has_rebuttal"] == 1
+        assert complete["coherence"] == pytest.approx(0.8)
+        assert bare["has_grounds"] == bare["has_warrant"] == bare["coherence"] == 0
+        # Only arguments with grounds are embedded, in one batch
+        similarities.assert_called_once()
+        assert len(similarities.call_args[0][0]) == 1
+
+    def test_score_features(self) -> None:
+        """Test that scores are bounded and rank complete arguments higher"""
+        with patch.object(quality_service, "pairwise_similarities", side_effect=fake_similarities):
+            scores = score_features(quality_features([COMPLETE, BARE]))
+        assert 0 <= scores[1] < scores[0] <= 1
+        assert score_features(np.ones((1, len(QUALITY_FEATURES)), dtype=np.float32))[0] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_scores_cached_per_graph_version(self) -> None:
+        """Test that cached scores are reused until the graph version changes"""
+        redis = InMemoryRedis()
+        session = FakeSession([COMPLETE, BARE])
+        with patch.object(quality_service, "redis", redis), \
+             patch.object(quality_service, "pairwise_similarities", side_effect=fake_similarities):
+            first = await quality_service.score_arguments(session, ["complete", "bare", "missing"])
+            assert set(first) == {"complete", "bare"}
+
+            again = await quality_service.score_arguments(session, ["complete", "bare"])
+            assert again == first
+            assert session.requested == [["complete", "bare", "missing"]]
+
+            await redis.incr(quality_service.GRAPH_VERSION_KEY)
+            await quality_service.score_arguments(session, ["complete"])
+            assert session.requested[-1] == ["complete"]
@@ -0,0 +1,15 @@
+# tests/test_reference_search.py
+
+from rational_onion.services.reference_search import lucene_query
+
+class TestReferenceSearch:
+    """Test suite for reference full-text query building"""
+
+    def test_lucene_query_keeps_words(self) -> None:
+        """Test that queries become lowercase word terms"""
+        assert lucene_query("Climate Change 2021") == "climate change 2021"
+
+    def test_lucene_query_strips_syntax(self) -> None:
+        """Test that Lucene operators and special characters cannot be injected"""
+        assert lucene_query('title:"warming" AND (IPCC)*~') == "title warming and ipcc"
+        assert lucene_query("  +-&&||!^ ") is None
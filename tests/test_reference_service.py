@@ -0,0 +1,80 @@
+# tests/test_reference_service.py
+
+from rational_onion.services.reference_service import (
+    _confirm_duplicates, group_duplicates, normalize_doi, normalize_url, reference_key, title_similarity
+)
+
+class TestReferenceKeys:
+    """Test suite for reference identity normalization"""
+
+    def test_doi_forms_share_a_key(self) -> None:
+        """Test that bare, prefixed and resolver DOIs normalize alike"""
+        expected = "doi:10.1017/cbo9780511817434"
+        assert reference_key("A", doi="10.1017/CBO9780511817434") == expected
+        assert reference_key("B", doi="doi:10.1017/cbo9780511817434.") == expected
+        assert reference_key("C", url="https://doi.org/10.1017/CBO9780511817434") == expected
+        assert normalize_doi("no identifier here") is None
+
+    def test_url_normalization(self) -> None:
+        """Test that scheme, www., fragments, tracking and parameter order are ignored"""
+        assert normalize_url("HTTPS://www.IPCC.ch/sr15/?utm_source=feed&b=2&a=1#top") == "ipcc.ch/sr15?a=1&b=2"
+        assert reference_key("X", url="http://ipcc.ch/sr15") == reference_key("Y", url="https://www.ipcc.ch/sr15/")
+        assert reference_key("X", url="https://ipcc.ch/sr15") != reference_key("X", url="https://ipcc.ch/sr14")
+
+    def test_title_fallback(self) -> None:
+        """Test that references without DOI or URL are keyed on title and year"""
+        assert reference_key("The Economics of Climate-Change!", year=2007) == \
+            reference_key("the economics of climate change", year=2007)
+        assert reference_key("Same Title", year=2007) != reference_key("Same Title", year=2008)
+
+class TestReferenceDuplicates:
+    """Test suite for fuzzy duplicate reference detection"""
+
+    def test_title_similarity(self) -> None:
+        """Test that casing, punctuation and a missing subtitle still match"""
+        assert title_similarity("Global Warming of 1.5°C", "Global warming of 1.5 °C") == 1.0
+        assert title_similarity(
+            "The Economics of Climate Change",
+            "The economics of climate change: the Stern review"
+        ) == 1.0
+        assert title_similarity(
+            "Climate Change 2021: The Physical Science Basis",
+            "Climate Change 2022: Impacts, Adaptation and Vulnerability"
+        ) < 0.5
+        assert title_similarity("Global Warming of 1.5°C", "Electric vehicles") == 0.0
+
+    def test_group_duplicates(self) -> None:
+        """Test that pairs are grouped transitively onto the smallest id"""
+        groups = group_duplicates({("b", "c"): 0.9, ("a", "b"): 0.8, ("x", "y"): 0.75})
+        assert groups == {"b": ("a", 0.9), "c": ("a", 0.9), "y": ("x", 0.75)}
+        assert group_duplicates({}) == {}
+
+    def test_reports_sharing_a_prefix_are_distinct(self) -> None:
+        """Test that a short shared main title does not make distinct reports duplicates"""
+        wg1 = "Climate Change 2021: The Physical Science Basis"
+        wg2 = "Climate Change 2021: Impacts, Adaptation and Vulnerability"
+        assert title_similarity(wg1, wg2) < 0.5
+        assert title_similarity("Climate Change 2021", wg1) < 0.7
+        assert title_similarity("Climate Change 2021", wg2) < 0.7
+        assert title_similarity("Introduction", "Introduction: Special Issue on Ethics") < 0.7
+
+    def test_conflicting_dois_are_not_duplicates(self) -> None:
+        """Test that candidates with another DOI are rejected like conflicting years"""
+        stored = {
+            "wg1": {
+                "title": "Climate Change 2021: The Physical Science Basis",
+                "year": 2021,
+                "doi": "10.1017/9781009157896"
+            },
+            "copy": {"title": "Climate change 2021 - the physical science basis", "year": 2021, "doi": None}
+        }
+        matches = _confirm_duplicates(
+            "Climate Change 2021: The Physical Science Basis", 2021, "10.1017/9781009325844", ["wg1", "copy"], stored
+        )
+        assert [candidate_id for candidate_id, _ in matches] == ["copy"]
+
+    def test_merges_require_a_direct_match(self) -> None:
+        """Test that chained matches are grouped but only direct matches are merged"""
+        pairs = {("a", "b"): 0.9, ("b", "c"): 0.8}
+        assert group_duplicates(pairs) == {"b": ("a", 0.9), "c": ("a", 0.8)}
+        assert group_duplicates(pairs, direct_only=True) == {"b": ("a", 0.9)}
@@ -0,0 +1,129 @@
+# tests/test_reference_validation.py
+
+import json
+import pytest
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from rational_onion.api.errors import ExternalServiceError
+from rational_onion.services.reference_validation import (
+    VALIDATION_CACHE_PREFIX,
+    check_reference,
+    credibility_score,
+    validate_references
+)
+from tests.redis_stub import InMemoryRedis
+
+ATTENTION = {
+    "title": ["Attention Is All You Need"],
+    "type": "proceedings-article",
+    "is-referenced-by-count": 90000
+}
+
+class FakeCrossref:
+    """Answers Crossref lookups from a dict of works by DOI and counts calls"""
+
+    def __init__(self, works: Dict[str, Dict[str, Any]], available: bool = True) -> None:
+        self.works = works
+        self.available = available
+        self.calls: Counter = Counter()
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        self.calls[url] += 1
+        if not self.available:
+            raise ExternalServiceError("Scholarly service unreachable", {"url": url})
+        if params:
+            matches = [work for work in self.works.values() if work["title"][0] == params["query.bibliographic"]]
+            return {"message": {"items": matches}}
+        doi = url.rsplit("/works/", 1)[1]
+        if doi not in self.works:
+            raise ExternalServiceError("Scholarly service returned 404", {"url": url, "status_code": 404})
+        return {"message": self.works[doi]}
+
+class TestReferenceValidation:
+    """Test suite for batch reference validation"""
+
+    @pytest.fixture
+    def cache(self) -> InMemoryRedis:
+        return InMemoryRedis()
+
+    @pytest.fixture
+    def crossref(self) -> FakeCrossref:
+        return FakeCrossref({"10.5555/attention": ATTENTION})
+
+    def test_check_reference(self) -> None:
+        """Test that malformed fields are reported by name"""
+        assert check_reference({"title": "A title", "year": 2020, "url": "https://example.org/a"}) == {}
+        errors = check_reference({"title": " ", "year": 3000, "url": "example.org", "doi": "not-a-doi"})
+        assert set(errors) == {"title", "year", "url", "doi"}
+
+    def test_credibility_score(self) -> None:
+        """Test that peer review, citations and metadata agreement raise the score"""
+        assert credibility_score(True, 5000, 1.0) == 1.0
+        assert credibility_score(False, 0, 0.0) == 0.0
+        assert credibility_score(True, 10, 1.0) > credibility_score(False, 10, 1.0)
+        assert credibility_score(False, 500, 1.0) > credibility_score(False, 5, 1.0)
+
+    async def test_batch_scores_and_caches(self, cache: InMemoryRedis, crossref: FakeCrossref) -> None:
+        """Test that each distinct reference is looked up once and then served from cache"""
+        references = [
+            {"title": "Attention is all you need", "doi": "https://doi.org/10.5555/ATTENTION"},
+            {"title": "Attention Is All You Need.", "url": "https://doi.org/10.5555/attention"},
+            {"title": "Attention Is All You Need"},
+            {"title": "An unpublished note", "year": 2021},
+            {"title": "Bad year", "year": 3000}
+        ]
+        results, cached = await validate_references(references, cache=cache, client=crossref)
+
+        assert cached == 0
+        assert [r["validated"] for r in results] == [True, True, True, False, False]
+        assert results[0]["reference_key"] == results[1]["reference_key"] == "doi:10.5555/attention"
+        assert results[0]["peer_reviewed"] is True
+        assert results[0]["citation_count"] == 90000
+        assert results[3]["credibility_score"] == 0.0
+        assert results[4]["errors"] == {"year": "Year 3000 is out of range"}
+        assert sum(crossref.calls.values()) == 3
+
+        results_again, cached = await validate_references(references, cache=cache, client=crossref)
+        assert cached == 4
+        assert results_again == results
+        assert sum(crossref.calls.values()) == 3
+        assert len(cache.values) == 3
+
+    async def test_field_checks_are_never_cached(self, cache: InMemoryRedis, crossref: FakeCrossref) -> None:
+        """Test that a reference's own fields are checked even when its work's lookup is cached"""
+        invalid = {"title": "Attention Is All You Need", "doi": "10.5555/attention", "year": 3000}
+        valid = {"title": "Attention Is All You Need", "doi": "10.5555/attention", "year": 2017}
+
+        results, _ = await validate_references([invalid, valid], cache=cache, client=crossref)
+        assert results[0]["errors"] == {"year": "Year 3000 is out of range"}
+        assert results[1]["validated"] is True
+
+        results, cached = await validate_references([valid], cache=cache, client=crossref)
+        assert cached == 1
+        assert results[0]["is_valid"] is True
+        assert "errors" not in results[0]
+        results, cached = await validate_references([invalid], cache=cache, client=crossref)
+        assert cached == 0
+        assert results[0]["is_valid"] is False
+
+    async def test_expired_entries_are_recomputed(self, cache: InMemoryRedis, crossref: FakeCrossref) -> None:
+        """Test that results are cached with a TTL and recomputed once gone"""
+        reference = {"title": "Attention Is All You Need", "doi": "10.5555/attention"}
+        await validate_references([reference], cache=cache, client=crossref)
+        key = f"{VALIDATION_CACHE_PREFIX}:doi:10.5555/attention"
+        assert cache.ttls[key] > 0
+
+        del cache.values[key]
+        _, cached = await validate_references([reference], cache=cache, client=crossref)
+        assert cached == 0
+        assert sum(crossref.calls.values()) == 2
+        assert json.loads(cache.values[key])["work"]["type"] == "proceedings-article"
+
+    async def test_unavailable_service_is_not_cached(self, cache: InMemoryRedis) -> None:
+        """Test that failed lookups are reported but retried on the next request"""
+        crossref = FakeCrossref({}, available=False)
+        results, _ = await validate_references([{"title": "Any title"}], cache=cache, client=crossref)
+        assert results[0]["validated"] is None
+        assert results[0]["message"] == "Scholarly service unavailable"
+        assert cache.values == {}
@@ -0,0 +1,98 @@
+# tests/test_scholarly_client.py
+
+import asyncio
+import json
+import time
+import pytest
+from typing import AsyncGenerator
+from unittest.mock import patch
+
+from rational_onion.api.errors import ExternalServiceError
+from rational_onion.services.scholarly_client import ScholarlyClient, settings
+from tests.redis_stub import InMemoryRedis
+from tests.scholarly_stub import STUB_BASE_URL, ScholarlyStub
+
+class TestScholarlyClient:
+    """Test suite for the pooled, cached scholarly API client"""
+
+    @pytest.fixture
+    def stub(self) -> ScholarlyStub:
+        return ScholarlyStub(delay=0.01)
+
+    @pytest.fixture
+    def cache(self) -> InMemoryRedis:
+        return InMemoryRedis()
+
+    @pytest.fixture
+    async def client(self, stub: ScholarlyStub, cache: InMemoryRedis) -> AsyncGenerator[ScholarlyClient, None]:
+        """Client talking to the stand-in server with near-instant backoff"""
+        with patch.object(settings, "SCHOLARLY_BACKOFF_BASE", 0.001):
+            client = ScholarlyClient(cache=cache, transport=stub.transport())
+            yield client
+            await client.close()
+
+    async def test_responses_are_cached(self, client: ScholarlyClient, stub: ScholarlyStub) -> None:
+        """Test that repeated lookups are served from the cache"""
+        first = await client.get_json(f"{STUB_BASE_URL}/works/10.1/abc")
+        second = await client.get_json(f"{STUB_BASE_URL}/works/10.1/abc")
+        assert first == second
+        assert first["title"] == "Work 10.1/abc"
+        assert stub.hits["/works/10.1/abc"] == 1
+
+    async def test_concurrent_misses_share_one_request(self, client: ScholarlyClient, stub: ScholarlyStub) -> None:
+        """Test that simultaneous lookups of one resource hit upstream once"""
+        results = await asyncio.gather(*[client.get_json(f"{STUB_BASE_URL}/works/shared") for _ in range(5)])
+        assert all(result == results[0] for result in results)
+        assert stub.hits["/works/shared"] == 1
+
+    async def test_transient_failures_are_retried(self, client: ScholarlyClient, stub: ScholarlyStub) -> None:
+        """Test that retryable statuses are retried until the call succeeds"""
+        stub.failures["/works/flaky"] = 2
+        result = await client.get_json(f"{STUB_BASE_URL}/works/flaky")
+        assert result["doi"] == "flaky"
+        assert stub.hits["/works/flaky"] == 3
+
+    async def test_errors_are_not_retried_or_cached(
+        self,
+        client: ScholarlyClient,
+        stub: ScholarlyStub,
+        cache: InMemoryRedis
+    ) -> None:
+        """Test that client errors fail fast and persistent failures give up"""
+        with pytest.raises(ExternalServiceError):
+            await client.get_json(f"{STUB_BASE_URL}/works/missing")
+        assert stub.hits["/works/missing"] == 1
+
+        stub.failures["/works/down"] = 100
+        with pytest.raises(ExternalServiceError):
+            await client.get_json(f"{STUB_BASE_URL}/works/down")
+        assert stub.hits["/works/down"] == settings.SCHOLARLY_MAX_RETRIES + 1
+        assert cache.values == {}
+
+    async def test_per_host_concurrency_limit(self, client: ScholarlyClient, stub: ScholarlyStub) -> None:
+        """Test that no more than SCHOLARLY_MAX_PER_HOST requests reach one host at once"""
+        with patch.object(settings, "SCHOLARLY_MAX_PER_HOST", 2):
+            await asyncio.gather(*[client.get_json(f"{STUB_BASE_URL}/works/{i}") for i in range(8)])
+        assert sum(stub.hits.values()) == 8
+        assert stub.peak_in_flight <= 2
+
+    async def test_stale_while_revalidate(
+        self,
+        client: ScholarlyClient,
+        stub: ScholarlyStub,
+        cache: InMemoryRedis
+    ) -> None:
+        """Test that stale entries are served at once and refreshed in the background"""
+        url = f"{STUB_BASE_URL}/works/stale"
+        key = ScholarlyClient.cache_key(url)
+        fetched_at = time.time() - settings.SCHOLARLY_CACHE_TTL - 1
+        cache.values[key] = json.dumps({"fetched_at": fetched_at, "body": {"title": "Old"}})
+
+        assert (await client.get_json(url))["title"] == "Old"
+        await asyncio.gather(*client._inflight.values())
+
+        refreshed = json.loads(cache.values[key])
+        assert refreshed["body"]["title"] == "Work stale"
+        assert refreshed["fetched_at"] > fetched_at
+        assert (await client.get_json(url))["title"] == "Work stale"
+        assert stub.hits["/works/stale"] == 1
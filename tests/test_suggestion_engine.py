@@ -0,0 +1,64 @@
+# tests/test_suggestion_engine.py
+
+import spacy
+from spacy.tokens import Doc
+from typing import List
+
+from rational_onion.services.suggestion_engine import (
+    FALLBACK_SUGGESTION, SHORT_TEXT_SUGGESTION, SuggestionEngine, get_suggestion_engine
+)
+
+VOCAB = spacy.blank("en").vocab
+
+def annotated_doc(words: List[str], pos: List[str], deps: List[str], heads: List[int]) -> Doc:
+    """Build a parsed Doc without a trained pipeline"""
+    return Doc(VOCAB, words=words, pos=pos, deps=deps, heads=heads, lemmas=[w.lower() for w in words])
+
+# "Emissions cause warming and emissions may cause many floods ." with emissions repeated
+CAUSAL = annotated_doc(
+    ["Emissions", "cause", "warming", "and", "emissions", "may", "cause", "many", "floods", "."],
+    ["NOUN", "VERB", "NOUN", "CCONJ", "NOUN", "AUX", "VERB", "ADJ", "NOUN", "PUNCT"],
+    ["nsubj", "ROOT", "dobj", "cc", "nsubj", "aux", "conj", "amod", "dobj", "punct"],
+    [1, 1, 1, 1, 6, 6, 1, 8, 6, 1]
+)
+
+class TestSuggestionEngine:
+    """Test suite for the rule-compiled suggestion engine"""
+
+    def test_rules_ranked_and_deduplicated(self) -> None:
+        """Test that each finding appears once, in weight order"""
+        suggestions = SuggestionEngine(VOCAB, top_k=10).suggest(CAUSAL)
+
+        assert len(suggestions) == len(set(suggestions))
+        assert suggestions[0] == "Support the causal link expressed by 'cause' with evidence or a mechanism."
+        assert suggestions[1].startswith("Hedged wording 'may'")
+        assert suggestions[2] == "Quantify 'many' with concrete figures."
+        assert "Consider using synonyms for 'Emissions' to improve lexical diversity." in suggestions
+        assert "Ensure 'warming' is well-supported by evidence." in suggestions
+        # The repeated lemma is reported once, not per occurrence
+        assert sum("emissions" in s.lower() for s in suggestions) == 1
+
+    def test_top_k(self) -> None:
+        """Test that only the highest ranked suggestions are kept"""
+        full = SuggestionEngine(VOCAB, top_k=10).suggest(CAUSAL)
+        assert SuggestionEngine(VOCAB, top_k=2).suggest(CAUSAL) == full[:2]
+
+    def test_short_and_empty_texts(self) -> None:
+        """Test the expansion hint for short texts and the fallback"""
+        engine = SuggestionEngine(VOCAB, top_k=10)
+        assert engine.suggest(Doc(VOCAB, words=["Yes"])) == [SHORT_TEXT_SUGGESTION]
+
+        long_unannotated = Doc(VOCAB, words=["x"] * 12)
+        assert engine.suggest(long_unannotated) == [FALLBACK_SUGGESTION]
+
+    def test_engine_compiled_once_per_vocab(self) -> None:
+        """Test that engines are reused for the same pipeline"""
+        assert get_suggestion_engine(VOCAB) is get_suggestion_engine(VOCAB)
+        other = spacy.blank("en").vocab
+        assert get_suggestion_engine(other) is not get_suggestion_engine(VOCAB)
+
+    def test_suggest_many(self) -> None:
+        """Test batched suggestions keep input order"""
+        engine = SuggestionEngine(VOCAB, top_k=10)
+        docs = [CAUSAL, Doc(VOCAB, words=["Yes"])]
+        assert list(engine.suggest_many(docs)) == [engine.suggest(doc) for doc in docs]
@@ -333,6 +333,34 @@ class TestVerification:
         assert data["detail"]["error_type"] == "VALIDATION_ERROR"
         assert "relationship" in data["detail"]["message"].lower()
 
+    @pytest.mark.asyncio(scope="function")
+    async def test_suggested_challenges_are_valid(
+        self,
+        neo4j_test_session: AsyncSession,
+        test_client: TestClient,
+        valid_api_key: str
+    ) -> None:
+        """Test that CHALLENGES edges suggested by the contradiction scan pass verification"""
+        result = await neo4j_test_session.run("""
+            CREATE (a1:Argument {claim: 'Nuclear power is safe'})
+            CREATE (a2:Argument {claim: 'Energy policy should be evidence based'})
+            CREATE (a3:Argument {claim: 'Nuclear power is not safe'})
+            CREATE (a1)-[:SUPPORTS]->(a2)
+            CREATE (a3)-[:SUPPORTS]->(a2)
+            CREATE (a1)-[:CHALLENGES {suggested: true, confidence: 0.9}]->(a3)
+            RETURN elementId(a1) as argument_id
+        """)
+        record = await result.single()
+        await result.consume()
+        
+        response = test_client.post(
+            "/verify-argument-structure",
+            headers={"X-API-Key": valid_api_key},
+            json={"argument_id": str(record["argument_id"])}
+        )
+        assert response.status_code == 200
+        assert response.json()["is_valid"] is True
+
     def test_validation_error_handling(
         self,
         test_client: TestClient,